@@ -0,0 +1,224 @@
+"""
+Seeded synthetic data shaped like the Bilyoner tables.
+
+- Scores: home / away goal rates drawn per match (Gamma around 1.5 / 1.2),
+  full-time goals Poisson, first-half goals Binomial(FT, 0.45), corners Poisson
+- Odds: every label of src/markets.py priced from the match's score distribution
+  (exact over a 0-7 goal grid) with a per-match bookmaker margin, rounded to
+  two decimals like the real feed
+- Sparsity: per-market offer rates (MS almost always, correct scores about half
+  the time) times a per-match coverage factor (small leagues get fewer markets);
+  correct-score odds use either the "1-0" or the "1:0" spelling, as in the dumps;
+  a few near-empty and constant columns exist for detect_useless_columns
+- Chunks are generated from independent child seeds, so any n is reproducible
+  in bounded memory (iter_wide_chunks / write_wide_csv)
+"""
+
+import os
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+from src.markets import MARKETS, Goals
+
+KEY_COLS = [
+    "match_date", "match_time", "tournament", "match_id", "homeTeam", "awayTeam",
+    "firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal",
+    "homeCorner", "awayCorner",
+]
+SCORE_COLS = KEY_COLS[6:]
+SEP = " :: "
+CHUNK_ROWS = 5_000
+MAX_GOALS = 7                     # fiyatlama ızgarası: 0-7 gol
+HALF_SHARE = 0.45                 # golün ilk yarıda atılma olasılığı
+MATCHES_PER_DAY = 40
+OFFER_RATES = {                   # market adı → sunulma oranı (varsayılan DEFAULT_OFFER_RATE)
+    "Maç Sonucu": 0.995,
+    "Çifte Şans": 0.95,
+    "Karşılıklı Gol": 0.92,
+    "Toplam Gol Alt/Üst": 0.9,
+    "İlk Yarı / Maç Sonucu": 0.85,
+    "Maç Skoru": 0.5,
+}
+DEFAULT_OFFER_RATE = 0.7
+JUNK_COLS = {                     # detect_useless_columns için: (dolu oranı, sabit mi)
+    "Özel Bahis :: Evet": (0.004, False),
+    "Özel Bahis :: Hayır": (0.004, False),
+    "Devre Arası Korner :: Tek": (0.0, False),
+    "Sabit Market :: Evet": (1.0, True),
+}
+TOURNAMENTS = [f"Lig {i}" for i in range(60)]
+TEAMS = [f"Takım {i}" for i in range(1200)]
+
+# FT skorundan türeyen tüm (hg, ag, ihg, iag) kombinasyonları ve market sonuç matrisi
+_PAIRS = np.array([(g, i) for g in range(MAX_GOALS + 1) for i in range(g + 1)])          # (36, 2)
+_COMBO = np.array([(h, a) for h in range(len(_PAIRS)) for a in range(len(_PAIRS))])      # (1296, 2)
+
+
+def _outcome_matrix():
+    hg, ihg = _PAIRS[_COMBO[:, 0]].T
+    ag, iag = _PAIRS[_COMBO[:, 1]].T
+    g = Goals(hg.astype(float), ag.astype(float), ihg.astype(float), iag.astype(float))
+    return np.stack([np.asarray(pred(g), dtype=float) for _, pred in MARKETS], axis=1)
+
+
+_OUTCOMES = _outcome_matrix()                                                             # (1296, N_markets)
+MARKET_LABELS = [label for label, _ in MARKETS]
+_SCORE_DASH = [j for j, c in enumerate(MARKET_LABELS) if c.startswith("Maç Skoru ::") and "-" in c.split(SEP)[1]]
+SCORE_COLON_LABELS = [MARKET_LABELS[j].replace("-", ":") for j in _SCORE_DASH]   # alias yazım (ayrı sütun)
+
+
+def _poisson_pmf(lam, n_max):
+    k = np.arange(n_max + 1)
+    log_fact = np.cumsum(np.r_[0.0, np.log(np.arange(1, n_max + 1))])
+    return np.exp(k * np.log(lam[:, None]) - lam[:, None] - log_fact[None, :])
+
+
+def _pair_probs(lam):
+    """(n, 36): P(FT gol = g, İY gol = i) — Poisson × Binomial."""
+    pmf = _poisson_pmf(lam, MAX_GOALS)
+    g, i = _PAIRS[:, 0], _PAIRS[:, 1]
+    binom = np.array([comb(int(a), int(b)) for a, b in _PAIRS]) * HALF_SHARE ** i * (1.0 - HALF_SHARE) ** (g - i)
+    return pmf[:, g] * binom[None, :]
+
+
+def market_probabilities(lam_h, lam_a):
+    """(n, N_markets) market olasılıkları (skor ızgarası üzerinde kesin)."""
+    ph, pa = _pair_probs(lam_h), _pair_probs(lam_a)
+    joint = (ph[:, :, None] * pa[:, None, :]).reshape(len(lam_h), -1)
+    return joint @ _OUTCOMES
+
+
+def _chunk(rng, n, start, start_id, start_date):
+    lam_h = rng.gamma(6.0, 1.5 / 6.0, n)
+    lam_a = rng.gamma(6.0, 1.2 / 6.0, n)
+    hg, ag = rng.poisson(lam_h), rng.poisson(lam_a)
+    ihg, iag = rng.binomial(hg, HALF_SHARE), rng.binomial(ag, HALF_SHARE)
+
+    prob = market_probabilities(lam_h, lam_a)
+    margin = rng.uniform(0.04, 0.10, n)[:, None]
+    with np.errstate(divide="ignore"):
+        odds = np.round(np.clip(1.0 / (prob * (1.0 + margin)), 1.01, 100.0), 2)
+    coverage = rng.beta(4.0, 1.2, n)[:, None]
+    rates = np.array([OFFER_RATES.get(c.split(SEP)[0], DEFAULT_OFFER_RATE) for c in MARKET_LABELS])
+    offered = (rng.random(odds.shape) < np.minimum(1.0, rates[None, :] * (0.4 + 0.8 * coverage))) & (prob > 0.004)
+    odds[~offered] = np.nan
+
+    # doğru skor: maç başına tek yazım ("1-0" ya da "1:0"), diğeri boş
+    colon = rng.random(n) < 0.5
+    dash_block = odds[:, _SCORE_DASH]
+    colon_block = np.where(colon[:, None], dash_block, np.nan)
+    odds[:, _SCORE_DASH] = np.where(colon[:, None], np.nan, dash_block)
+
+    day = (start + np.arange(n)) // MATCHES_PER_DAY
+    out = pd.DataFrame(np.hstack([odds, colon_block]), columns=MARKET_LABELS + SCORE_COLON_LABELS)
+    for c, (fill, constant) in JUNK_COLS.items():
+        out[c] = np.where(rng.random(n) < fill, 1.5 if constant else np.round(rng.uniform(1.2, 9.0, n), 2), np.nan)
+    home = rng.integers(0, len(TEAMS), n)
+    keys = pd.DataFrame({
+        "match_date": (pd.Timestamp(start_date) + pd.to_timedelta(day, unit="D")).strftime("%Y-%m-%d"),
+        "match_time": pd.Series(rng.choice(["13:00:00", "15:00:00", "17:30:00", "20:00:00", "21:45:00"], n)),
+        "tournament": np.asarray(TOURNAMENTS)[rng.integers(0, len(TOURNAMENTS), n)],
+        "match_id": (start_id + np.arange(n)).astype(str),
+        "homeTeam": np.asarray(TEAMS)[home],
+        "awayTeam": np.asarray(TEAMS)[(home + rng.integers(1, len(TEAMS), n)) % len(TEAMS)],
+        "firstHalfHomeGoal": ihg, "firstHalfAwayGoal": iag,
+        "totalHomeGoal": hg, "totalAwayGoal": ag,
+        "homeCorner": rng.poisson(5.2, n), "awayCorner": rng.poisson(4.3, n),
+    })
+    return pd.concat([out, keys], axis=1)
+
+
+def iter_wide_chunks(n, seed=0, chunk_rows=CHUNK_ROWS, scored_frac=1.0, start_id=1_000_000,
+                     start_date="2024-08-01"):
+    """
+    n maçlık geniş tabloyu parça parça üretir (her parça bağımsız alt tohumla).
+    scored_frac < 1 ise son maçların skorları boş (predict_gpt.py'deki test satırları).
+    """
+    n_chunks = -(-n // chunk_rows) if n else 0
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    n_scored = int(round(n * scored_frac))
+    for c, ss in enumerate(seeds):
+        start = c * chunk_rows
+        size = min(chunk_rows, n - start)
+        df = _chunk(np.random.default_rng(ss), size, start, start_id + start, start_date)
+        unscored = np.arange(start, start + size) >= n_scored
+        df[SCORE_COLS] = df[SCORE_COLS].astype("Int64").mask(np.repeat(unscored[:, None], len(SCORE_COLS), axis=1))
+        yield df
+
+
+def make_wide_table(n, seed=0, **kwargs):
+    """n maçlık geniş oran tablosu (KEY_COLS + market sütunları)."""
+    frames = list(iter_wide_chunks(n, seed=seed, **kwargs))
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLS + MARKET_LABELS + SCORE_COLON_LABELS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_wide_csv(path, n, seed=0, **kwargs):
+    """Tabloyu parça parça CSV'ye yazar (bellek parça boyutuyla sınırlı)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    first = True
+    for df in iter_wide_chunks(n, seed=seed, **kwargs):
+        df.to_csv(path, index=False, header=first, mode="w" if first else "a")
+        first = False
+    return path
+
+
+def to_odds_payload(row, excluded=True):
+    """
+    Geniş tablo satırı → match-card/{id}/odds JSON'u ("Tümü" sekmesi, market başına oddList).
+    excluded=True ise scraper'ın elediği marketlerden (oyuncu/kart) örnekler de eklenir.
+    """
+    markets = {}
+    for label, val in row.items():
+        if SEP not in label or pd.isna(val):
+            continue
+        name, sel = label.split(SEP, 1)
+        markets.setdefault(name, []).append({"n": sel, "val": float(val)})
+    tab = [{"name": name, "oddList": odds} for name, odds in markets.items()]
+    if excluded:
+        tab += [{"name": "Oyuncu Gol Atar", "oddList": [{"n": "Oyuncu 9", "val": 3.4}]},
+                {"name": "Kart Sayısı Alt/Üst", "oddList": [{"n": "4,5 Alt", "val": 1.8}]}]
+    return {
+        "homeTeam": row.get("homeTeam"),
+        "awayTeam": row.get("awayTeam"),
+        "oddGroupTabs": [{"title": "Popüler", "matchCardOdds": tab[:3]},
+                         {"title": "Tümü", "matchCardOdds": tab}],
+    }
+
+
+def make_odds_payloads(n, seed=0):
+    """n maçlık (match_id, event meta, odds JSON) listesi — src.bilyoner_api._build_row girdisi."""
+    out = []
+    for df in iter_wide_chunks(n, seed=seed, scored_frac=0.0):
+        for row in df.to_dict("records"):
+            meta = {"match_date": row["match_date"], "match_time": row["match_time"],
+                    "tournament": row["tournament"]}
+            out.append((row["match_id"], meta, to_odds_payload(row)))
+    return out
+
+
+def make_value_bets(n, seed=0, bets_per_match=1):
+    """
+    n maçlık value-bet listesi (value_bets_by_*.csv / kuponcu.ipynb girdisi):
+    maç başına bets_per_match bahis, olasılık yüzde, oran > 1.
+    """
+    rng = np.random.default_rng(seed)
+    m = n * bets_per_match
+    match = np.repeat(np.arange(n), bets_per_match)
+    odds = np.round(1.0 + rng.gamma(1.6, 0.9, m), 2)
+    # çoğu bahis sınırda, bir kısmı belirgin pozitif EV
+    prob = np.clip(100.0 / odds * rng.lognormal(0.03, 0.08, m), 1.0, 99.0).round(0)
+    home = rng.integers(0, len(TEAMS), n)
+    return pd.DataFrame({
+        "match_date": "2025-10-10",
+        "match_time": rng.choice(["15:00:00", "17:30:00", "20:00:00"], n)[match],
+        "match_id": (2_000_000 + match).astype(str),
+        "hometeam": np.asarray(TEAMS)[home][match],
+        "awayteam": np.asarray(TEAMS)[(home + 1) % len(TEAMS)][match],
+        "bet_name": np.asarray(MARKET_LABELS, dtype=object)[rng.integers(0, len(MARKET_LABELS), m)],
+        "probability": prob,
+        "odds": odds,
+    })
@@ -0,0 +1,261 @@
+"""
+Benchmark runner: hot paths of the scraper / cleaner / predictor on synthetic
+data from benchmarks/generator.py.
+
+- Sizes: 1k / 10k / 100k / 1M matches (--sizes); a size whose estimated peak
+  memory exceeds --mem-budget-mb, or the benchmark's own max_n, is recorded as
+  skipped instead of being run
+- Results go to benchmarks/results/<timestamp>_<commit>.json (commit, versions,
+  machine, seconds per benchmark and size); --compare prints the speed ratio
+  against an earlier results file so regressions between commits are visible
+
+Usage:
+    python -m benchmarks.run --sizes 1k,10k
+    python -m benchmarks.run --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import (MARKET_LABELS, make_odds_payloads, make_value_bets, make_wide_table,
+                                  write_wide_csv)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+TOP_K = 100
+TEST_ROWS = 200           # nan_euclidean_topk: sabit test satırı, train = n
+APPEND_ROWS = 100         # append_matches_to_csv: n maçlık master'a eklenen maç
+PAYLOAD_CHUNK = 5_000     # extract_odds_rows: payload'lar parça parça üretilir (bellek)
+COUNT_CHUNK_ROWS = 256    # market_counts: predict_gpt.py SINK_CHUNK_ROWS ile aynı
+REGRESSION_RATIO = 1.2
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+D = len(MARKET_LABELS)
+
+BENCHMARKS = []
+
+
+def benchmark(name, mem_mb, max_n=None, covers=None):
+    """
+    Kayıt dekoratörü. Fonksiyon (n, seed, workdir) alır ve ölçülecek sıfır argümanlı
+    bir fonksiyon döner; o fonksiyon süre döndürürse (hazırlığı kendisi yapıyorsa) o süre kullanılır.
+    mem_mb(n): tahmini tepe bellek (MB).
+    """
+    def register(setup):
+        BENCHMARKS.append({"name": name, "setup": setup, "mem_mb": mem_mb, "max_n": max_n,
+                           "covers": covers or name})
+        return setup
+    return register
+
+
+def _features(df):
+    X = df[MARKET_LABELS].to_numpy(dtype=float, copy=True)
+    return X, np.isnan(X)
+
+
+@benchmark("nan_euclidean_topk", mem_mb=lambda n: n * D * 33 / 2**20 + 200,
+           covers="src/predict.predict neighbour search (src/distance.nan_euclidean_topk)")
+def _bench_topk(n, seed, workdir):
+    from src.distance import nan_euclidean_topk
+    T, T_nan = _features(make_wide_table(n, seed=seed))
+    X, X_nan = _features(make_wide_table(TEST_ROWS, seed=seed + 1, start_id=9_000_000))
+    return lambda: nan_euclidean_topk(X, X_nan, T, T_nan, TOP_K)
+
+
+@benchmark("market_counts", mem_mb=lambda n: n * D * 8 * 2 / 2**20 + 200,
+           covers="src/predict.predict market evaluation (src/markets market_counts + value_bet_rows)")
+def _bench_market_counts(n, seed, workdir):
+    from src.markets import market_counts, market_odds, neighbor_goals, value_bet_rows
+    from src.neighbor_index import GOAL_COLS
+    train = make_wide_table(5_000, seed=seed)
+    goals = train[GOAL_COLS].to_numpy(dtype=float)
+    test = make_wide_table(n, seed=seed + 1, scored_frac=0.0, start_id=9_000_000)
+    rng = np.random.default_rng(seed)
+    top_idx = rng.integers(0, len(train), (n, TOP_K))
+    n_valid = np.full(n, TOP_K)
+
+    def run():
+        for start in range(0, n, COUNT_CHUNK_ROWS):
+            rows = slice(start, start + COUNT_CHUNK_ROWS)
+            part = test.iloc[rows]
+            g, valid = neighbor_goals(goals, top_idx[rows], n_valid[rows])
+            value_bet_rows(part, market_counts(g, valid), market_odds(part))
+    return run
+
+
+@benchmark("extract_odds_rows", mem_mb=lambda n: 300, covers="src.bilyoner_api._extract_odds_rows")
+def _bench_extract(n, seed, workdir):
+    from src.bilyoner_api import _extract_odds_rows
+
+    def run():
+        elapsed = 0.0
+        for c, start in enumerate(range(0, n, PAYLOAD_CHUNK)):
+            payloads = make_odds_payloads(min(PAYLOAD_CHUNK, n - start), seed=seed + c)
+            t0 = time.perf_counter()
+            for _, _, odds in payloads:
+                _extract_odds_rows(odds)
+            elapsed += time.perf_counter() - t0
+        return elapsed
+    return run
+
+
+@benchmark("append_matches_to_csv", mem_mb=lambda n: 300, covers="claude_scraper.append_matches_to_csv (CSV)")
+def _bench_append(n, seed, workdir):
+    import claude_scraper as cs
+    from src.bilyoner_api import _build_row
+    master = write_wide_csv(os.path.join(workdir, "master.csv"), n, seed=seed)
+    rows = [_build_row(mid, meta, odds) for mid, meta, odds in make_odds_payloads(APPEND_ROWS, seed=seed + 1)]
+    rows = [dict(r, match_id=f"new-{r['match_id']}") for r in rows]
+    target = os.path.join(workdir, "append.csv")
+
+    def run():
+        shutil.copyfile(master, target)
+        for path in (target + ".markets.json",):
+            if os.path.exists(path):
+                os.remove(path)
+        fetch = cs._fetch_odds_rows
+        cs._fetch_odds_rows = lambda ids, **kw: rows       # ağ yok: üretilmiş payload'lar
+        try:
+            t0 = time.perf_counter()
+            cs.append_matches_to_csv([r["match_id"] for r in rows], target)
+            return time.perf_counter() - t0
+        finally:
+            cs._fetch_odds_rows = fetch
+    return run
+
+
+@benchmark("detect_useless_columns", mem_mb=lambda n: n * (D + 16) * 8 * 3 / 2**20 + 200,
+           covers="src/processor.detect_useless_columns")
+def _bench_detect(n, seed, workdir):
+    from src.processor import detect_useless_columns
+    df = make_wide_table(n, seed=seed)
+    return lambda: detect_useless_columns(df)
+
+
+@benchmark("coupon_search", mem_mb=lambda n: 200, max_n=10_000, covers="kuponcu coupon search (src/coupons)")
+def _bench_coupons(n, seed, workdir):
+    from src.coupons import search_coupons
+    bets = make_value_bets(n, seed=seed)
+    return lambda: search_coupons(bets, legs=3, top_n=100)
+
+
+# ------------------------------- runner ---------------------------------- #
+
+def _git(*args):
+    try:
+        return subprocess.check_output(["git", *args], cwd=os.path.dirname(__file__) or ".",
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(names=None, sizes=SIZES, seed=0, repeat=3, mem_budget_mb=4096, verbose=True):
+    """Dönüş: sonuç kayıtları listesi (benchmark, n, durum, süreler)."""
+    results = []
+    for bench in BENCHMARKS:
+        if names and bench["name"] not in names:
+            continue
+        for n in sizes:
+            rec = {"benchmark": bench["name"], "covers": bench["covers"], "n": int(n)}
+            est = bench["mem_mb"](n)
+            if bench["max_n"] is not None and n > bench["max_n"]:
+                rec.update(status="skipped", reason=f"n > max_n ({bench['max_n']})")
+            elif est > mem_budget_mb:
+                rec.update(status="skipped", reason=f"estimated {est:.0f} MB > budget {mem_budget_mb} MB")
+            else:
+                with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+                    fn = bench["setup"](n, seed, workdir)
+                    times = []
+                    for _ in range(repeat if n <= 10_000 else 1):
+                        t0 = time.perf_counter()
+                        own = fn()
+                        elapsed = time.perf_counter() - t0
+                        times.append(own if isinstance(own, float) else elapsed)
+                rec.update(status="ok", seconds=min(times), seconds_median=float(np.median(times)),
+                           repeats=len(times), per_match_us=min(times) / n * 1e6)
+            results.append(rec)
+            if verbose:
+                if rec["status"] == "ok":
+                    print(f"⏱️ {rec['benchmark']:<24} n={n:>9,}  {rec['seconds']:.4f} s")
+                else:
+                    print(f"⏭️ {rec['benchmark']:<24} n={n:>9,}  atlandı: {rec['reason']}")
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_RATIO):
+    """Önceki sonuç dosyasına göre süre oranı (yeni / eski); threshold üstü regresyon sayılır."""
+    old = {(r["benchmark"], r["n"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    regressions = 0
+    print(f"📊 Karşılaştırma: {str(baseline['environment'].get('commit'))[:10]} → şimdiki")
+    for r in results:
+        prev = old.get((r["benchmark"], r["n"]))
+        if r.get("status") != "ok" or prev is None:
+            continue
+        ratio = r["seconds"] / prev["seconds"]
+        flag = "⚠️ regresyon" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"   {r['benchmark']:<24} n={r['n']:>9,}  {prev['seconds']:.4f} → {r['seconds']:.4f} s  x{ratio:.2f} {flag}")
+    return regressions
+
+
+def _size(text):
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks on seeded synthetic Bilyoner-shaped data.")
+    parser.add_argument("--sizes", default="1k,10k,100k,1m", help="Match counts, e.g. 1k,10k,100k,1m.")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names: "
+                        + ",".join(b["name"] for b in BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats for n <= 10k (best time is kept).")
+    parser.add_argument("--mem-budget-mb", type=int, default=4096)
+    parser.add_argument("--out", default=None, help="Results JSON (default benchmarks/results/<time>_<commit>.json).")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against.")
+    args = parser.parse_args(argv)
+
+    env = environment()
+    results = run_benchmarks(names=[s for s in args.only.split(",") if s] or None,
+                             sizes=[_size(s) for s in args.sizes.split(",") if s], seed=args.seed,
+                             repeat=args.repeat, mem_budget_mb=args.mem_budget_mb)
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}_{(env['commit'] or 'nogit')[:10]}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "seed": args.seed, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"💾 Sonuçlar kaydedildi → {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return 1 if compare(results, json.load(f)) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
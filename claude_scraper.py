@@ -11,6 +11,11 @@ Key improvements:
 - Atomic CSV writes, idempotent appends, column reindexing
 - Timeouts everywhere, explicit error logging, graceful backoff
 - CLI options for flexibility
+- Optional asyncio/HTTP2 collector with a global rate limiter (--async, src/async_collector.py);
+  endpoints and payload parsing shared with it live in src/bilyoner_api.py
+- Market registry: alias labels (1:0 / 1-0) share one column, appends without new
+  markets only append rows (src/market_registry.py)
+- Per-stage timing of fetch / parse / write (--timing-log JSONL, --timing-prom; src/utils.py)
 """
 
 from __future__ import annotations
@@ -32,6 +37,15 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from tqdm import tqdm
 
+from src.bilyoner_api import (BASE, DEFAULT_TIMEOUT, EVENT_INFO_PATH, GAMELIST_PARAMS, GAMELIST_PATH, ODDS_PATH,
+                              STATUS_PARAMS, STATUS_PATH, USER_AGENT, _build_row, _event_meta, _meta_complete,
+                              _odds_params, _parse_catalog, _parse_scores)
+from src.compact import compact_frame
+from src.http_cache import DEFAULT_MAX_MB, ResponseCache, cached_get
+from src.market_registry import MarketRegistry
+from src.storage import append_data, is_dataset, load_data, update_partitions
+from src.utils import Timer, configure_timing, timing_logger
+
 # ------------------------------- Config -------------------------------- #
 
 CSV_PATH = "data/processed/match_odds_cleaned_20250801.csv"
@@ -41,13 +55,8 @@ KEY_COLS = [
     "homeCorner", "awayCorner",
 ]
 
-USER_AGENT = "Mozilla/5.0 (compatible; OddsCollector/1.0; +https://example.local)"
-BASE = "https://www.bilyoner.com"
-
-DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
 MAX_WORKERS = max(4, os.cpu_count() or 4)
-
-ODD_FILTER_EXCLUDES = ("oyuncu", "kart", "korner", "penaltı", "özel", "dakikalar", "nasıl", "aralığ")
+SCORE_COLS = ["firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal", "homeCorner", "awayCorner"]
 
 # ------------------------------- HTTP ---------------------------------- #
 
@@ -68,8 +77,17 @@ def make_session() -> requests.Session:
     return s
 
 SESSION = make_session()
+CACHE: Optional[ResponseCache] = None
+
+def enable_cache(cache_dir: str, *, replay: bool = False, max_mb: int = DEFAULT_MAX_MB) -> ResponseCache:
+    """Route every _get through an on-disk response cache (replay=True → offline, cache only)."""
+    global CACHE
+    CACHE = ResponseCache(cache_dir, replay=replay, max_bytes=max_mb * 1024 * 1024)
+    return CACHE
 
 def _get(url: str, *, params: Optional[dict] = None, timeout=DEFAULT_TIMEOUT) -> Optional[dict]:
+    if CACHE is not None:
+        return cached_get(CACHE, SESSION, url, params=params, timeout=timeout)
     try:
         r = SESSION.get(url, params=params, timeout=timeout)
         if r.status_code == 200:
@@ -80,72 +98,30 @@ def _get(url: str, *, params: Optional[dict] = None, timeout=DEFAULT_TIMEOUT) ->
 
 # ------------------------------- Core ---------------------------------- #
 
-def get_match_ids(shuffle_ids: bool = True) -> List[str]:
+def get_event_catalog() -> Dict[str, Dict[str, Any]]:
     """
-    Günlük maç bülteninden match_id listesi döner.
+    Günlük bülteni tek istekte çekip {match_id: {match_date, match_time, tournament, homeTeam, awayTeam}} döner.
     """
-    url = f"{BASE}/api/v3/mobile/aggregator/gamelist/all/v1"
-    params = {"tabType": 1, "bulletinType": 2, "liveEventsEnabledForPreBulletin": "true"}
-    data = _get(url, params=params)
-    events = (data or {}).get("events", {})
-    ids = list(events.keys())
-    if shuffle_ids:
-        shuffle(ids)
-    return [str(x) for x in ids]
+    return _parse_catalog(_get(BASE + GAMELIST_PATH, params=GAMELIST_PARAMS))
 
-def _extract_odds_rows(odds_json: dict) -> Dict[str, Any]:
+def get_match_ids(shuffle_ids: bool = True, catalog: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
     """
-    Pulls columns from 'Tümü' tab and filters irrelevant markets.
-    Returns a dict of { "Market :: Selection": odd_value }.
+    Günlük maç bülteninden match_id listesi döner.
     """
-    out: Dict[str, Any] = {}
-    for tab in (odds_json or {}).get("oddGroupTabs", []):
-        if tab.get("title") != "Tümü":
-            continue
-        for market in tab.get("matchCardOdds", []):
-            mname = (market.get("name") or "").strip()
-            if any(ex in mname.lower() for ex in ODD_FILTER_EXCLUDES):
-                continue
-            for odd in market.get("oddList", []):
-                name, val = odd.get("n"), odd.get("val")
-                if name is None or val is None:
-                    continue
-                out[f"{mname} :: {name}"] = val
-    return out
-
-def fetch_match_odds(match_id: str, *, is_live: bool = True, is_popular: bool = False) -> Optional[Dict[str, Any]]:
-    info_url = f"{BASE}/api/v3/mobile/aggregator/gamelist/events/{match_id}"
-    odds_url = f"{BASE}/api/v3/mobile/aggregator/match-card/{match_id}/odds"
-    params = {"isLiveEvent": str(is_live).lower(), "isPopular": str(is_popular).lower()}
-
-    info = _get(info_url)
-    odds = _get(odds_url, params=params)
-    if not info or not odds:
-        return None
-
-    odds_dict = _extract_odds_rows(odds)
-    if not odds_dict:
-        return None
-
-    esd: str = info.get("esd") or ""
-    date, time_str = (esd.split("T") + [None])[:2]
-
-    row: Dict[str, Any] = {
-        **odds_dict,
-        "match_date": date,
-        "match_time": time_str,
-        "tournament": info.get("lgn"),
-        "match_id": str(match_id),
-        "homeTeam": odds.get("homeTeam"),
-        "awayTeam": odds.get("awayTeam"),
-        "firstHalfHomeGoal": pd.NA,
-        "firstHalfAwayGoal": pd.NA,
-        "totalHomeGoal": pd.NA,
-        "totalAwayGoal": pd.NA,
-        "homeCorner": pd.NA,
-        "awayCorner": pd.NA,
-    }
-    return row
+    ids = list((catalog if catalog is not None else get_event_catalog()).keys())
+    if shuffle_ids:
+        shuffle(ids)
+    return ids
+
+def fetch_match_odds(match_id: str, *, is_live: bool = True, is_popular: bool = False,
+                     event: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """`event`: catalog entry from get_event_catalog(); when complete, the event-info request is skipped."""
+    meta = event
+    if not _meta_complete(meta):
+        info = _get(BASE + EVENT_INFO_PATH.format(match_id=match_id))
+        meta = _event_meta(info) if info else None
+    odds = _get(BASE + ODDS_PATH.format(match_id=match_id), params=_odds_params(is_live, is_popular))
+    return _build_row(match_id, meta, odds)
 
 def _atomic_write_csv(df: pd.DataFrame, path: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -154,32 +130,40 @@ def _atomic_write_csv(df: pd.DataFrame, path: str) -> None:
         df.to_csv(tmp_path, index=False)
     os.replace(tmp_path, path)
 
-def _read_master(csv_path: str) -> pd.DataFrame:
-    if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path, dtype={"match_id": "string"})
+def _read_master(csv_path: str, columns: Optional[List[str]] = None, compact: bool = False) -> pd.DataFrame:
+    """
+    Single CSV or match_date-partitioned dataset dir (only `columns` are loaded).
+    compact=True → float32 odds, categorical teams, Int8 scores (src/compact.py).
+    """
+    if is_dataset(csv_path):
+        df = load_data(csv_path, columns=columns)
+        df = df.reindex(columns=list(dict.fromkeys(df.columns.tolist() + (columns or KEY_COLS))))
+        df["match_id"] = df["match_id"].astype("string")
+    elif os.path.exists(csv_path):
+        usecols = None if columns is None else (lambda c: c in set(columns))
+        df = pd.read_csv(csv_path, usecols=usecols, dtype={"match_id": "string"})
     else:
         df = pd.DataFrame(columns=KEY_COLS)
         df["match_id"] = df["match_id"].astype("string")
     # enforce nullable integer for score columns
-    for c in ["firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal", "homeCorner", "awayCorner"]:
+    for c in SCORE_COLS:
         if c in df.columns:
             df[c] = df[c].astype("Int64")
         else:
             df[c] = pd.Series([pd.NA] * len(df), dtype="Int64")
-    return df
-
-def append_matches_to_csv(match_ids: List[str], csv_path: str = CSV_PATH, *, max_workers: int = MAX_WORKERS) -> None:
-    master = _read_master(csv_path)
-    existing = set(master["match_id"].astype("string").dropna().tolist())
+    return compact_frame(df) if compact else df
 
-    new_ids = [mid for mid in map(str, match_ids) if mid not in existing]
-    if not new_ids:
-        print("ℹ️ Eklenebilecek yeni maç bulunamadı.")
-        return
+@timing_logger("scraper.fetch", rows=len)
+def _fetch_odds_rows(match_ids: List[str], *, max_workers: int = MAX_WORKERS, use_async: bool = False,
+                     catalog: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    catalog = catalog or {}
+    if use_async:
+        from src.async_collector import collect_odds_rows
+        return collect_odds_rows(match_ids, catalog=catalog, cache=CACHE)
 
     rows: List[Dict[str, Any]] = []
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = {ex.submit(fetch_match_odds, mid): mid for mid in new_ids}
+        futures = {ex.submit(fetch_match_odds, mid, event=catalog.get(mid)): mid for mid in match_ids}
         for fut in tqdm(as_completed(futures), total=len(futures), desc="Odds fetch"):
             mid = futures[fut]
             try:
@@ -189,63 +173,111 @@ def append_matches_to_csv(match_ids: List[str], csv_path: str = CSV_PATH, *, max
             except Exception:
                 # swallow to keep going
                 continue
+    return rows
+
+def append_matches_to_csv(match_ids: List[str], csv_path: str = CSV_PATH, *, max_workers: int = MAX_WORKERS,
+                          method: str = "auto", use_async: bool = False,
+                          catalog: Optional[Dict[str, Dict[str, Any]]] = None,
+                          snapshot_dir: Optional[str] = None, compact: bool = False) -> None:
+    dataset = is_dataset(csv_path)
+    existing = set(_read_master(csv_path, columns=["match_id"])["match_id"].astype("string").dropna().tolist())
+
+    new_ids = [mid for mid in map(str, match_ids) if mid not in existing]
+    if snapshot_dir:
+        # line movement: every listed match is re-scraped and recorded as a snapshot;
+        # the master table still only gets the first-seen row
+        from src.odds_snapshots import SnapshotStore
+        rows = _fetch_odds_rows(list(map(str, match_ids)), max_workers=max_workers,
+                                use_async=use_async, catalog=catalog)
+        written = SnapshotStore(snapshot_dir, method=method).record(rows)
+        print(f"📈 {written} oran değişikliği kaydedildi → {snapshot_dir}")
+        rows = [r for r in rows if r["match_id"] not in existing]
+    elif new_ids:
+        rows = _fetch_odds_rows(new_ids, max_workers=max_workers, use_async=use_async, catalog=catalog)
+    if not new_ids:
+        print("ℹ️ Eklenebilecek yeni maç bulunamadı.")
+        return
 
     if not rows:
         print("ℹ️ Yeni veriler alınamadı.")
         return
 
-    new_df = pd.DataFrame(rows)
-    # unify columns (schema evolution)
+    # market labels → canonical registry labels (1:0 / 1-0 aliases land in one column);
+    # a new market is an append to the registry, not a new spelling of an old column
+    with Timer("scraper.parse", rows=len(rows)):
+        registry = MarketRegistry.for_data(csv_path)
+        header = [] if dataset or not os.path.exists(csv_path) else pd.read_csv(csv_path, nrows=0).columns.tolist()
+        new_df = pd.DataFrame(registry.canonicalize_rows(rows, header))
     all_cols = list(dict.fromkeys(KEY_COLS + sorted([c for c in new_df.columns if c not in KEY_COLS])))
+
+    if dataset:
+        # partitioned store: only new part files are written, nothing is re-read
+        new_df = new_df.reindex(columns=all_cols)
+        new_df["match_id"] = new_df["match_id"].astype("string")
+        for c in SCORE_COLS:
+            new_df[c] = new_df[c].astype("Int64")
+        with Timer("scraper.write", rows=len(new_df)):
+            append_data(new_df, csv_path, method=method)
+            registry.save()
+        print(f"✅ {len(new_df)} yeni maç eklendi → {csv_path}")
+        return
+
+    if header and set(all_cols) <= set(header):
+        # no new columns: rows are appended in header order, the master is not re-read or rewritten
+        new_df = new_df.reindex(columns=header)
+        new_df["match_id"] = new_df["match_id"].astype("string")
+        for c in header:
+            if c in SCORE_COLS:
+                new_df[c] = new_df[c].astype("Int64")
+            elif pd.api.types.is_integer_dtype(new_df[c]):
+                new_df[c] = new_df[c].astype(float)      # same text as after concat with float odds
+        with Timer("scraper.write", rows=len(new_df)):
+            new_df.to_csv(csv_path, mode="a", header=False, index=False)
+            registry.save()
+        print(f"✅ {len(new_df)} yeni maç eklendi → {csv_path}")
+        return
+
+    with Timer("scraper.write", rows=len(new_df)):
+        _rewrite_master(csv_path, new_df, all_cols, compact)
+        registry.save()
+    print(f"✅ {len(new_df)} yeni maç eklendi → {csv_path}")
+
+def _rewrite_master(csv_path: str, new_df: pd.DataFrame, all_cols: List[str], compact: bool) -> None:
+    """New columns: master is re-read, widened and rewritten atomically."""
+    master = _read_master(csv_path, compact=compact)
     master = master.reindex(columns=list(dict.fromkeys(master.columns.tolist() + all_cols)))
     new_df = new_df.reindex(columns=master.columns)
+    if compact:
+        # same dtypes on both sides, otherwise concat upcasts float32 odds back to float64
+        new_df = compact_frame(new_df)
 
     combined = pd.concat([master, new_df], ignore_index=True)
     # ensure dtypes for IDs/scores
     combined["match_id"] = combined["match_id"].astype("string")
-    for c in ["firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal", "homeCorner", "awayCorner"]:
+    for c in SCORE_COLS:
         if c in combined.columns:
             combined[c] = combined[c].astype("Int64")
 
     _atomic_write_csv(combined, csv_path)
-    print(f"✅ {len(new_df)} yeni maç eklendi → {csv_path}")
-
-def _parse_scores(score_json: dict) -> Optional[Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]]:
-    if not score_json:
-        return None
-    scores = {s.get("scoreName"): s for s in (score_json.get("score") or [])}
-    try:
-        fh = scores.get("SOCCER_FIRST_HALF")
-        ft = scores.get("SOCCER_END_SCORE")
-        fh_h = int(fh["homeScore"]) if fh and fh.get("homeScore") is not None else None
-        fh_a = int(fh["awayScore"]) if fh and fh.get("awayScore") is not None else None
-        ft_h = int(ft["homeScore"]) if ft and ft.get("homeScore") is not None else None
-        ft_a = int(ft["awayScore"]) if ft and ft.get("awayScore") is not None else None
-        return fh_h, fh_a, ft_h, ft_a
-    except Exception:
-        return None
 
 def _fetch_score_for_id(match_id: str) -> Optional[Tuple[str, Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]]]:
-    url = f"{BASE}/api/mobile/match-card/v2/{match_id}/status"
     # explicit param per original code: sgSportTypeId=1 (soccer)
-    data = _get(url, params={"sgSportTypeId": 1})
+    data = _get(BASE + STATUS_PATH.format(match_id=match_id), params=STATUS_PARAMS)
     parsed = _parse_scores(data or {})
     if parsed is None:
         return None
     return str(match_id), parsed
 
-def update_scores_in_csv(csv_path: str = CSV_PATH, *, max_workers: int = MAX_WORKERS) -> None:
-    df = _read_master(csv_path)
-    # rows missing either first-half pair or full-time pair
-    need_mask = df["firstHalfHomeGoal"].isna() | df["firstHalfAwayGoal"].isna() | df["totalHomeGoal"].isna() | df["totalAwayGoal"].isna()
-    todo = df.loc[need_mask, "match_id"].astype("string").dropna().unique().tolist()
-    if not todo:
-        print("ℹ️ Güncellenecek skor yok.")
-        return
+@timing_logger("scraper.fetch_scores", rows=len)
+def _fetch_scores(match_ids: List[str], *, max_workers: int = MAX_WORKERS,
+                  use_async: bool = False) -> Dict[str, Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]]:
+    if use_async:
+        from src.async_collector import collect_scores
+        return collect_scores(match_ids, cache=CACHE)
 
     results: Dict[str, Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]] = {}
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = {ex.submit(_fetch_score_for_id, mid): mid for mid in todo}
+        futures = {ex.submit(_fetch_score_for_id, mid): mid for mid in match_ids}
         for fut in tqdm(as_completed(futures), total=len(futures), desc="Score fetch"):
             try:
                 r = fut.result()
@@ -254,6 +286,35 @@ def update_scores_in_csv(csv_path: str = CSV_PATH, *, max_workers: int = MAX_WOR
                     results[mid] = vals
             except Exception:
                 continue
+    return results
+
+def update_scores_in_csv(csv_path: str = CSV_PATH, *, max_workers: int = MAX_WORKERS,
+                         index_dir: Optional[str] = None, method: str = "auto", use_async: bool = False,
+                         poll_state: Optional[str] = None, compact: bool = False) -> None:
+    dataset = is_dataset(csv_path)
+    df = _read_master(csv_path, columns=["match_id", "match_date", "match_time"] + SCORE_COLS if dataset else None,
+                      compact=compact)
+    scheduler = None
+    if poll_state:
+        # only matches past kickoff + 2h, with exponential backoff on misses
+        from src.score_scheduler import ScorePollScheduler, has_final_score
+        scheduler = ScorePollScheduler(poll_state)
+        scheduler.prune(df)
+        todo = scheduler.due(df)
+    else:
+        # rows missing either first-half pair or full-time pair
+        need_mask = df["firstHalfHomeGoal"].isna() | df["firstHalfAwayGoal"].isna() | df["totalHomeGoal"].isna() | df["totalAwayGoal"].isna()
+        todo = df.loc[need_mask, "match_id"].astype("string").dropna().unique().tolist()
+    if not todo:
+        if scheduler is not None:
+            scheduler.save()
+        print("ℹ️ Güncellenecek skor yok.")
+        return
+
+    results = _fetch_scores(todo, max_workers=max_workers, use_async=use_async)
+    if scheduler is not None:
+        scheduler.record(todo, [mid for mid, v in results.items() if has_final_score(v)])
+        scheduler.save()
 
     if not results:
         print("ℹ️ Skor güncellenemedi.")
@@ -273,9 +334,31 @@ def update_scores_in_csv(csv_path: str = CSV_PATH, *, max_workers: int = MAX_WOR
         df.loc[missing, name] = ser.reindex(df.index)[missing]
 
     df = df.reset_index()
-    _atomic_write_csv(df, csv_path)
+    if dataset:
+        # rewrite only the date partitions that received a score
+        updated = df[df["match_id"].isin(list(results.keys()))]
+        with Timer("scraper.write_scores", rows=len(updated)):
+            n_parts = update_partitions(csv_path, updated, SCORE_COLS[:4], method=method)
+        print(f"✅ Skorlar güncellendi: {n_parts} bölüm yeniden yazıldı → {csv_path}")
+        if index_dir:
+            _append_scored_to_index(load_data(csv_path, dates=updated["match_date"].dropna().unique()), index_dir)
+        return
+
+    with Timer("scraper.write_scores", rows=len(df)):
+        _atomic_write_csv(df, csv_path)
     print("✅ Skorlar güncellendi ve CSV’ye yazıldı.")
 
+    if index_dir:
+        _append_scored_to_index(df, index_dir)
+
+def _append_scored_to_index(df: pd.DataFrame, index_dir: str) -> None:
+    """Newly scored rows → persistent neighbor index (only a new segment is written)."""
+    from src.neighbor_index import NeighborIndex
+
+    feature_cols = [c for c in df.columns if c not in KEY_COLS and pd.api.types.is_numeric_dtype(df[c])]
+    index = NeighborIndex.open_or_build(index_dir, df, feature_cols)
+    index.append(df)
+
 # ------------------------------- CLI ----------------------------------- #
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -296,16 +379,55 @@ def main(argv: Optional[List[str]] = None) -> int:
     p_sc.add_argument("--csv", default=CSV_PATH)
     p_sc.add_argument("--workers", type=int, default=MAX_WORKERS)
 
+    for p in (p_all, p_odds, p_sc):
+        p.add_argument("--method", choices=["auto", "csv", "parquet"], default="auto",
+                       help="File format when --csv points to a partitioned dataset dir.")
+        p.add_argument("--async", dest="use_async", action="store_true",
+                       help="Use the asyncio/HTTP2 collector (rate-limited) instead of the thread pool.")
+        p.add_argument("--cache", default=None, help="On-disk HTTP response cache dir (ETag/TTL aware).")
+        p.add_argument("--cache-mb", type=int, default=DEFAULT_MAX_MB, help="Cache size limit (LRU eviction).")
+        p.add_argument("--replay", action="store_true", help="Serve every request from --cache only (offline).")
+        p.add_argument("--compact", action="store_true",
+                       help="Hold the master table with float32 odds / categoricals / Int8 scores (less memory).")
+        p.add_argument("--timing-log", default=None, help="Append per-stage timings (JSON lines) to this file.")
+        p.add_argument("--timing-prom", default=None, help="Write per-stage totals as a Prometheus text file.")
+    for p in (p_all, p_odds):
+        p.add_argument("--snapshots", default=None,
+                       help="Odds snapshot dir; re-scrape listed matches and store changed prices (line movement).")
+    for p in (p_all, p_sc):
+        p.add_argument("--index", default=None, help="Neighbor index dir to extend with newly scored matches.")
+        p.add_argument("--poll-state", default=None,
+                       help="Score-poll state file; only poll matches past kickoff + 2h, with backoff on misses.")
+
     args = parser.parse_args(argv)
 
     cmd = args.cmd or "run"
+    if getattr(args, "timing_log", None) or getattr(args, "timing_prom", None):
+        configure_timing(log_path=args.timing_log, prom_path=args.timing_prom)
+    if getattr(args, "cache", None):
+        enable_cache(args.cache, replay=args.replay, max_mb=args.cache_mb)
+    elif getattr(args, "replay", False):
+        parser.error("--replay needs --cache DIR")
+
     if cmd in ("run", "odds"):
-        ids = get_match_ids(shuffle_ids=not getattr(args, "no_shuffle", False))
-        append_matches_to_csv(ids, csv_path=args.csv, max_workers=args.workers)
+        if args.use_async:
+            from src.async_collector import collect_event_catalog
+            catalog = collect_event_catalog(cache=CACHE)
+        else:
+            catalog = get_event_catalog()
+        ids = get_match_ids(shuffle_ids=not getattr(args, "no_shuffle", False), catalog=catalog)
+        append_matches_to_csv(ids, csv_path=args.csv, max_workers=args.workers, method=args.method,
+                              use_async=args.use_async, catalog=catalog, snapshot_dir=args.snapshots,
+                              compact=args.compact)
 
     if cmd in ("run", "scores"):
-        update_scores_in_csv(csv_path=getattr(args, "csv", CSV_PATH), max_workers=getattr(args, "workers", MAX_WORKERS))
+        update_scores_in_csv(csv_path=getattr(args, "csv", CSV_PATH), max_workers=getattr(args, "workers", MAX_WORKERS),
+                             index_dir=getattr(args, "index", None), method=getattr(args, "method", "auto"),
+                             use_async=getattr(args, "use_async", False), poll_state=getattr(args, "poll_state", None),
+                             compact=getattr(args, "compact", False))
 
+    if CACHE is not None:
+        print(f"🗄️ {CACHE.stats()}")
     return 0
 
 if __name__ == "__main__":
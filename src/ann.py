@@ -0,0 +1,323 @@
+"""
+Approximate nearest-neighbour mode for the odds similarity search (IVF).
+
+- The nan-aware squared distance is an exact inner product of mask-aware
+  embeddings: d²(x, t) = [x², m_x, -2x]·[m_t, t², t] with NaN cells zeroed (the
+  three products nan_euclidean_topk multiplies). Both sides are projected onto
+  the top `rank` right singular vectors of a sample of training embeddings
+- Inverted lists: k-means in that sketch space splits the training rows into
+  `n_lists` buckets. Because d² is linear in the training embedding, query ·
+  centroid is the (approximate) mean distance from the query to a bucket, so rows
+  are assigned and buckets are probed by the same score
+- Search scores only the `nprobe` closest buckets per match: each probed bucket
+  runs nan_euclidean_topk over its own rows for the matches that probe it, and the
+  per-bucket top-k lists are merged. Distances are exact (same values and tie
+  rule as the brute force), so only true neighbours in unprobed buckets can be
+  missed; work per match is ~nprobe / n_lists of the exact scan, and the index
+  keeps only the centroids and one bucket id per row (no prepared (N, D) matrices)
+- Speed/recall knob: `nprobe` (nprobe >= n_lists → exact result) and, at build
+  time, `n_lists` / `rank`; `python -m src.ann` reports recall@K against brute
+  force, value-bet agreement and realised ROI of both paths on held-out scored
+  matches (roi_z: ROI difference over its standard error, |roi_z| < 2 →
+  indistinguishable)
+- New training rows are only assigned to their closest bucket (add), the
+  centroids are not re-fitted
+- Mean-imputing NaN odds does not work for bucketing here: the distance only sums
+  the features both rows share, so a row's NaN pattern drives its neighbours as
+  much as its odds do (the imputed-space top 10% held ~10% of the exact top-100
+  on benchmark data)
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.distance import (DEFAULT_BLOCK_MEM_MB, _select_topk, approx_sq_dist, block_rows_for_budget,
+                          nan_euclidean_rows, nan_euclidean_topk, prepare_train)
+from src.utils import timing_logger
+
+DEFAULT_RANK = 64
+DEFAULT_NPROBE = 8
+FIT_SAMPLE_ROWS = 20_000      # SVD ve k-means en fazla bu kadar satırlık örnekle
+KMEANS_ITERS = 8
+SKETCH_BLOCK_ROWS = 50_000
+
+
+def default_n_lists(n_train):
+    """Kova sayısı ≈ √N / 4 (benchmark verisinde aynı taranan oranda en yüksek recall)."""
+    return max(1, int(round(np.sqrt(n_train) / 4)))
+
+
+class IVFIndex:
+    """
+    Train satırlarının k-means kovaları (inverted lists). T matrisini tutmaz; arama sırasında
+    T / T_nan verilir. basis: (rank, 3·D) — [m_t | t² | t] bloklarına karşılık gelen satırlar;
+    centroids: (n_lists, rank) kova üyelerinin train tarafı izdüşüm ortalaması; assign: satır → kova.
+    """
+
+    def __init__(self, basis, centroids, assign):
+        self.basis = basis                        # (rank, 3D) float64
+        self.centroids = centroids                # (n_lists, rank) float64
+        self.assign = assign                      # (N_train,) int32
+        self._lists = None                        # (sıralı satırlar, kova başlangıçları) önbelleği
+
+    @classmethod
+    def build(cls, T, T_nan, n_lists=None, rank=DEFAULT_RANK, sample_rows=FIT_SAMPLE_ROWS, seed=0, prepared=None):
+        n_lists = min(n_lists or default_n_lists(T.shape[0]), max(1, T.shape[0]))
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(T.shape[0], min(T.shape[0], sample_rows), replace=False))
+        if prepared is not None:
+            MT, AT, AT2 = (m[sample] for m in prepared)
+        else:
+            MT, AT, AT2 = prepare_train(T[sample], T_nan[sample])
+        E = np.hstack([MT, AT2, AT])
+        _, _, Vt = np.linalg.svd(E, full_matrices=False)
+        index = cls(Vt[:rank].copy(), np.empty((0, 0)), np.empty(0, dtype=np.int32))
+
+        # k-means (Lloyd): satır, kendisine ortalama uzaklığı en küçük kovaya gider
+        S = E @ index.basis.T                                  # train tarafı izdüşüm
+        Q = index.query_sketch(T[sample], T_nan[sample]).astype(np.float64)
+        C = S[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(KMEANS_ITERS):
+            a = np.argmin(Q @ C.T, axis=1)
+            cnt = np.bincount(a, minlength=n_lists)
+            sums = np.zeros_like(C)
+            np.add.at(sums, a, S)
+            C = np.where(cnt[:, None] > 0, sums / np.maximum(cnt, 1)[:, None], C)   # boş kova eski yerinde kalır
+        index.centroids = C
+        index.add(T, T_nan)
+        return index
+
+    def __len__(self):
+        return self.assign.shape[0]
+
+    @property
+    def rank(self):
+        return self.basis.shape[0]
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def _blocks(self):
+        D = self.basis.shape[1] // 3
+        return self.basis[:, :D], self.basis[:, D:2 * D], self.basis[:, 2 * D:]
+
+    def add(self, T, T_nan):
+        """Yeni train satırlarını en yakın kovaya atar (satırlar T'nin sonuna eklenmiş olmalı)."""
+        parts = [self.assign]
+        for s in range(0, T.shape[0], SKETCH_BLOCK_ROWS):
+            rows = slice(s, s + SKETCH_BLOCK_ROWS)
+            scores = self.query_sketch(T[rows], T_nan[rows]).astype(np.float64) @ self.centroids.T
+            parts.append(np.argmin(scores, axis=1).astype(np.int32))
+        self.assign = np.concatenate(parts)
+        self._lists = None
+
+    def lists(self):
+        """(rows, offsets): kova b'nin satırları rows[offsets[b]:offsets[b + 1]] (artan train indeksi)."""
+        if self._lists is None:
+            rows = np.argsort(self.assign, kind="stable")
+            offsets = np.r_[0, np.cumsum(np.bincount(self.assign, minlength=self.n_lists))]
+            self._lists = (rows, offsets)
+        return self._lists
+
+    def query_sketch(self, X, X_nan):
+        """Sorgu tarafı izdüşümü: [x², m_x, -2x] · basis (train izdüşümüyle çarpımı ≈ d²)."""
+        B_m, B_sq, B_v = self._blocks()
+        MX = (~X_nan).astype(np.float64)
+        AX = np.where(X_nan, 0.0, X)
+        return ((AX * AX) @ B_m.T + MX @ B_sq.T - 2.0 * (AX @ B_v.T)).astype(np.float32)
+
+    def probe(self, X, X_nan, nprobe):
+        """Her test satırı için ortalama yaklaşık uzaklığı en küçük nprobe kova: (N_test, nprobe)."""
+        scores = self.query_sketch(X, X_nan).astype(np.float64) @ self.centroids.T
+        nprobe = min(nprobe, self.n_lists)
+        if nprobe == self.n_lists:
+            return np.broadcast_to(np.arange(self.n_lists), (X.shape[0], nprobe))
+        return np.argpartition(scores, nprobe - 1, axis=1)[:, :nprobe]
+
+    @timing_logger("distance.ann", rows=lambda out: len(out[0]))
+    def search(self, X, X_nan, T, T_nan, k, nprobe=DEFAULT_NPROBE, block_mem_mb=DEFAULT_BLOCK_MEM_MB,
+               return_dist=False):
+        """
+        nan_euclidean_topk ile aynı dönüş: (idx, n_valid), return_dist=True ise (idx, dist, n_valid).
+        Yalnız yoklanan kovaların satırları skorlanır; kova içi BLAS uzaklığının hata payıyla
+        kesin top-k'ya girebilecek adaylar toplanır ve test satırı başına bir kez kesin uzaklıkla
+        sıralanır (eşitlikte küçük train indeksi önce, brute force ile aynı kural). Yoklanan
+        kovalardaki satırlar için sonuç brute force ile birebir aynıdır. Hazır (MT, AT, AT²)
+        matrisleri gerekmez.
+        """
+        n_test, n_train = X.shape[0], T.shape[0]
+        if nprobe >= self.n_lists or n_test == 0 or n_train == 0 or k <= 0:
+            # tüm kovalar → kesin yol (aynı sonuç, tek BLAS taraması)
+            return nan_euclidean_topk(X, X_nan, T, T_nan, k, block_mem_mb=block_mem_mb, return_dist=return_dist)
+
+        idx_out = np.full((n_test, k), -1, dtype=np.int64)
+        dist_out = np.full((n_test, k), np.inf)
+        n_valid = np.zeros(n_test, dtype=np.int64)
+        rows, offsets = self.lists()
+        # test bloğu başına aday tamponu ≈ nprobe·k satır × 4 dizi
+        outer = max(1, int(block_mem_mb * 1024 * 1024) // (nprobe * k * 8 * 4))
+        for start in range(0, n_test, outer):
+            stop = min(start + outer, n_test)
+            probes = self.probe(X[start:stop], X_nan[start:stop], nprobe)
+            found = [_bucket_candidates(X[start:stop], X_nan[start:stop], T, T_nan,
+                                        rows[offsets[b]:offsets[b + 1]], np.flatnonzero((probes == b).any(axis=1)),
+                                        k, block_mem_mb)
+                     for b in np.unique(probes) if offsets[b + 1] > offsets[b]]
+            if not found:
+                continue
+            test, cand, lo, hi = (np.concatenate(parts) for parts in zip(*found))
+            order = np.argsort(test, kind="stable")
+            test, cand, lo, hi = test[order], cand[order], lo[order], hi[order]
+            bounds = np.searchsorted(test, np.arange(stop - start + 1))
+            for r in range(stop - start):
+                s, e = bounds[r], bounds[r + 1]
+                if s == e:
+                    continue
+                i = start + r
+                kk = min(k, e - s)
+                upper = np.partition(hi[s:e], kk - 1)[kk - 1]
+                c = cand[s:e][lo[s:e] <= upper]
+                dist = nan_euclidean_rows(T[c], T_nan[c], X[i], X_nan[i])
+                idx_out[i, :kk], dist_out[i, :kk] = _select_topk(dist, c, kk)
+                n_valid[i] = kk
+        if return_dist:
+            return idx_out, dist_out, n_valid
+        return idx_out, n_valid
+
+
+def _bucket_candidates(X, X_nan, T, T_nan, members, tests, k, block_mem_mb):
+    # Kovanın kesin top-k'sına girebilecek (test, train satırı, d² alt / üst sınırı) dörtlüleri;
+    # kovanın k. üst sınırından büyük alt sınırlı satır hiçbir birleşik top-k'ya giremez
+    MT, AT, AT2 = prepare_train(T[members], T_nan[members])
+    kk = min(k, len(members))
+    out = []
+    bs = block_rows_for_budget(len(members), block_mem_mb)
+    for s in range(0, len(tests), bs):
+        t = tests[s:s + bs]
+        approx, tol = approx_sq_dist(X[t], X_nan[t], MT, AT, AT2)
+        lo, hi = approx - tol, approx + tol
+        part = np.argpartition(approx, kk - 1, axis=1)[:, :kk]
+        top_hi = np.take_along_axis(hi, part, axis=1)
+        upper = np.where(np.isfinite(top_hi), top_hi, -np.inf).max(axis=1)
+        r, c = np.nonzero((lo <= upper[:, None]) & np.isfinite(approx))
+        out.append((t[r], members[c], lo[r, c], hi[r, c]))
+    return tuple(np.concatenate(parts) for parts in zip(*out))
+
+
+def recall_at_k(approx_idx, exact_idx):
+    """Kesin top-k komşularından yaklaşık aramanın bulduğu oran (geçerli komşular üzerinden)."""
+    hits = total = 0
+    for a, e in zip(approx_idx, exact_idx):
+        e = e[e >= 0]
+        if len(e):
+            hits += np.isin(e, a[a >= 0]).sum()
+            total += len(e)
+    return hits / total if total else 1.0
+
+
+# ------------------------------ evaluation --------------------------------- #
+
+def compare_with_exact(df, nprobes=(1, 2, 4, 8), n_lists=None, rank=DEFAULT_RANK, k=100, holdout=0.1, seed=0,
+                       block_mem_mb=DEFAULT_BLOCK_MEM_MB):
+    """
+    Skoru belli maçların `holdout` kadarı test gibi ayrılır; kalan train ile kesin ve her
+    nprobe değeri için yaklaşık arama yapılır. Satır başına: taranan train oranı, süre, hızlanma,
+    recall@K, olasılık farkı, value bet örtüşmesi (Jaccard), gerçek skorlara göre value bet ROI'si ve
+    kesin yola göre ROI farkının z değeri.
+    """
+    from src.markets import market_counts, market_odds, neighbor_goals, settle_markets
+    from src.neighbor_index import GOAL_COLS
+    from src.predict import TrainSet, feature_columns, feature_matrix
+
+    scored = df[df[GOAL_COLS].notna().all(axis=1)].reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    test_mask = rng.random(len(scored)) < holdout
+    train = TrainSet.from_frame(scored[~test_mask], feature_columns(scored))
+    test = scored[test_mask]
+    X = feature_matrix(test, train.feature_cols)
+    X_nan = np.isnan(X)
+    odds = market_odds(test)
+    won, _ = settle_markets(test[GOAL_COLS].to_numpy(dtype=float))
+    prepared = train.prepared()
+
+    def evaluate(top_idx, n_valid):
+        g, valid = neighbor_goals(train.goals, top_idx, n_valid)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prob = market_counts(g, valid) / n_valid[:, None]
+            value = ~np.isnan(odds) & (prob * odds > 1.0)
+        returns = np.where(won, odds, 0.0)[value] - 1.0      # birim bahis başına net getiri
+        return prob, value, returns
+
+    t0 = time.perf_counter()
+    exact_idx, exact_n = nan_euclidean_topk(X, X_nan, train.T, train.T_nan, k, block_mem_mb=block_mem_mb,
+                                            prepared=prepared)
+    exact_s = time.perf_counter() - t0
+    exact_prob, exact_value, exact_ret = evaluate(exact_idx, exact_n)
+    exact_roi = exact_ret.mean() if len(exact_ret) else np.nan
+
+    t0 = time.perf_counter()
+    index = IVFIndex.build(train.T, train.T_nan, n_lists=n_lists, rank=rank, seed=seed, prepared=prepared)
+    build_s = time.perf_counter() - t0
+
+    priced = ~np.isnan(odds) & (exact_n > 0)[:, None]
+    sizes = np.diff(index.lists()[1])
+    rows = [{"nprobe": "exact", "scanned": 1.0, "seconds": exact_s, "speedup": 1.0, "recall_at_k": 1.0,
+             "mean_abs_prob_diff": 0.0, "value_bet_jaccard": 1.0, "value_bets": int(exact_value.sum()),
+             "roi": exact_roi, "roi_z": 0.0}]
+    for nprobe in nprobes:
+        t0 = time.perf_counter()
+        idx, n_valid = index.search(X, X_nan, train.T, train.T_nan, k, nprobe=nprobe, block_mem_mb=block_mem_mb)
+        seconds = time.perf_counter() - t0
+        prob, value, ret = evaluate(idx, n_valid)
+        roi = ret.mean() if len(ret) else np.nan
+        # iki kümenin ortak bahisleri yüzünden gerçek standart hata daha küçüktür (muhafazakâr z)
+        se = np.sqrt(ret.var() / max(len(ret), 1) + exact_ret.var() / max(len(exact_ret), 1))
+        union = (value | exact_value).sum()
+        rows.append({
+            "nprobe": int(min(nprobe, index.n_lists)),
+            "scanned": float(sizes[index.probe(X, X_nan, nprobe)].sum(axis=1).mean() / len(train)),
+            "seconds": seconds, "speedup": exact_s / seconds,
+            "recall_at_k": recall_at_k(idx, exact_idx),
+            "mean_abs_prob_diff": float(np.nanmean(np.abs(prob - exact_prob)[priced])),
+            "value_bet_jaccard": float((value & exact_value).sum() / union) if union else 1.0,
+            "value_bets": int(value.sum()), "roi": roi, "roi_z": (roi - exact_roi) / se if se > 0 else 0.0,
+        })
+    report = pd.DataFrame(rows)
+    report.attrs.update(n_lists=index.n_lists, rank=index.rank, build_seconds=build_s, n_train=len(train), n_test=len(test))
+    return report
+
+
+def main(argv=None):
+    from src.storage import read_table
+
+    parser = argparse.ArgumentParser(description="Approximate neighbour search: recall@K and value-bet "
+                                                 "agreement against exact search on held-out scored matches.")
+    parser.add_argument("--data", default="data/processed/match_odds_cleaned_20250801.csv",
+                        help="Single CSV or match_date-partitioned dataset dir.")
+    parser.add_argument("--lists", type=int, default=None, help="IVF buckets (default ≈ sqrt(N_train) / 4).")
+    parser.add_argument("--rank", type=int, default=DEFAULT_RANK, help="Sketch dimensions.")
+    parser.add_argument("--nprobe", default="1,2,4,8", help="Comma-separated probed-bucket counts to try.")
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--holdout", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write the report as CSV.")
+    args = parser.parse_args(argv)
+
+    report = compare_with_exact(read_table(args.data), nprobes=[int(c) for c in args.nprobe.split(",") if c],
+                                n_lists=args.lists, rank=args.rank, k=args.top_k, holdout=args.holdout, seed=args.seed)
+    a = report.attrs
+    print(f"🧭 ANN: {a['n_lists']} kova, rank={a['rank']}, kurulum {a['build_seconds']:.2f}s, "
+          f"train {a['n_train']:,} / held-out {a['n_test']:,} maç")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if args.out:
+        report.to_csv(args.out, index=False)
+        print(f"💾 Rapor kaydedildi → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
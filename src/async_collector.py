@@ -0,0 +1,257 @@
+"""
+asyncio + HTTP/2 collector for the Bilyoner endpoints.
+
+- One shared httpx.AsyncClient (HTTP/2 when the `h2` package is installed)
+- Global token-bucket rate limiter + per-host concurrency caps
+- Same retry semantics as claude_scraper.make_session (urllib3 Retry: total=5,
+  backoff_factor=0.6, 429/5xx, Retry-After honoured); a 429 pauses the whole bucket
+- Event meta comes from the bulletin catalog when complete (otherwise the event-info
+  call runs concurrently with odds); endpoints and parsing come from src/bilyoner_api.py
+  (_build_row / _parse_scores), the same helpers the threaded path uses, so rows are identical
+- `base` is configurable, so the collector can be pointed at a local stub server
+- Uses the ResponseCache passed as `cache=` (src/http_cache.py), including replay mode;
+  claude_scraper passes its active cache explicitly
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from tqdm import tqdm
+
+from src.bilyoner_api import (BASE, DEFAULT_TIMEOUT, EVENT_INFO_PATH, GAMELIST_PARAMS, GAMELIST_PATH, ODDS_PATH,
+                              STATUS_PARAMS, STATUS_PATH, USER_AGENT, _build_row, _event_meta, _meta_complete,
+                              _odds_params, _parse_catalog, _parse_scores)
+
+try:
+    import httpx
+except ImportError:  # optional dependency, only needed for --async
+    httpx = None
+
+RATE_PER_SEC = 20.0     # global request budget
+BURST = 20
+PER_HOST_LIMIT = 16     # concurrent in-flight requests per host
+
+RETRY_TOTAL = 5
+BACKOFF_FACTOR = 0.6
+BACKOFF_MAX = 120.0
+STATUS_FORCELIST = (429, 500, 502, 503, 504)
+RETRY_AFTER_STATUS = (413, 429, 503)
+
+# ------------------------------ Limiter -------------------------------- #
+
+class TokenBucket:
+    """Async token bucket; `pause()` blocks every caller until the given time has passed."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, burst: int = BURST) -> None:
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+def _backoff_time(consecutive_errors: int) -> float:
+    # urllib3 Retry.get_backoff_time: no sleep before the first retry
+    if consecutive_errors <= 1:
+        return 0.0
+    return min(BACKOFF_MAX, BACKOFF_FACTOR * (2 ** (consecutive_errors - 1)))
+
+def _retry_after(headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# ------------------------------ Collector ------------------------------ #
+
+class AsyncCollector:
+    def __init__(self, base: str = BASE, *, rate: float = RATE_PER_SEC, burst: int = BURST,
+                 per_host: int = PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT, cache=None) -> None:
+        if httpx is None:
+            raise ImportError("Async mode needs httpx: pip install 'httpx[http2]'")
+        self.base = base.rstrip("/")
+        self.cache = cache
+        self.bucket = TokenBucket(rate, burst)
+        self.per_host = per_host
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        connect, read = timeout
+        self._client = httpx.AsyncClient(
+            http2=_h2_available(),
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=per_host * 4, max_keepalive_connections=per_host * 4),
+        )
+
+    async def __aenter__(self) -> "AsyncCollector":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_sems:
+            self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return self._host_sems[host]
+
+    async def get(self, url: str, *, params: Optional[dict] = None) -> Optional[dict]:
+        """Async twin of claude_scraper._get: JSON body on 200, otherwise None."""
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(url, params)
+            if entry is not None and (self.cache.replay or self.cache.is_fresh(entry)):
+                self.cache.hits += 1
+                return entry["body"]
+            if self.cache.replay:
+                self.cache.misses += 1
+                return None
+        headers = self.cache.validators(entry) if self.cache is not None else None
+
+        errors = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                async with self._host_sem(url):
+                    r = await self._client.get(url, params=params, headers=headers)
+            except httpx.HTTPError:
+                errors += 1
+                if errors > RETRY_TOTAL:
+                    return None
+                await asyncio.sleep(_backoff_time(errors))
+                continue
+
+            if r.status_code == 304 and entry is not None:
+                self.cache.revalidated += 1
+                self.cache.refresh(entry)
+                return entry["body"]
+            if r.status_code == 200:
+                try:
+                    body = r.json()
+                except ValueError:
+                    return None
+                if self.cache is not None:
+                    self.cache.misses += 1
+                    self.cache.store(url, params, body, r.headers)
+                return body
+            if r.status_code not in STATUS_FORCELIST:
+                return None
+
+            errors += 1
+            if errors > RETRY_TOTAL:
+                return None
+            wait = _retry_after(r.headers) if r.status_code in RETRY_AFTER_STATUS else None
+            if r.status_code == 429:
+                # server-side throttling applies to everyone → pause the shared bucket
+                self.bucket.pause(wait if wait is not None else _backoff_time(max(errors, 2)))
+            await asyncio.sleep(wait if wait is not None else _backoff_time(errors))
+
+    # --------------------------- endpoints --------------------------- #
+
+    async def event_catalog(self) -> Dict[str, Dict[str, Any]]:
+        data = await self.get(self.base + GAMELIST_PATH, params=GAMELIST_PARAMS)
+        return _parse_catalog(data)
+
+    async def match_ids(self, shuffle_ids: bool = True) -> List[str]:
+        ids = list((await self.event_catalog()).keys())
+        if shuffle_ids:
+            random.shuffle(ids)
+        return ids
+
+    async def _event_meta(self, match_id: str, event: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if _meta_complete(event):
+            return event
+        info = await self.get(self.base + EVENT_INFO_PATH.format(match_id=match_id))
+        return _event_meta(info) if info else None
+
+    async def odds_row(self, match_id: str, event: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        meta, odds = await asyncio.gather(
+            self._event_meta(match_id, event),
+            self.get(self.base + ODDS_PATH.format(match_id=match_id), params=_odds_params()),
+        )
+        return _build_row(match_id, meta, odds)
+
+    async def score(self, match_id: str) -> Optional[Tuple[str, Tuple[Optional[int], ...]]]:
+        data = await self.get(self.base + STATUS_PATH.format(match_id=match_id), params=STATUS_PARAMS)
+        parsed = _parse_scores(data or {})
+        if parsed is None:
+            return None
+        return str(match_id), parsed
+
+async def _gather(coros, desc: str) -> list:
+    out = []
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    for fut in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc=desc):
+        try:
+            r = await fut
+        except Exception:
+            # swallow to keep going (same as the threaded path)
+            continue
+        if r:
+            out.append(r)
+    return out
+
+# ---------------------------- Sync wrappers ---------------------------- #
+
+def collect_match_ids(shuffle_ids: bool = True, **kwargs) -> List[str]:
+    async def _run():
+        async with AsyncCollector(**kwargs) as c:
+            return await c.match_ids(shuffle_ids)
+    return asyncio.run(_run())
+
+def collect_event_catalog(**kwargs) -> Dict[str, Dict[str, Any]]:
+    async def _run():
+        async with AsyncCollector(**kwargs) as c:
+            return await c.event_catalog()
+    return asyncio.run(_run())
+
+def collect_odds_rows(match_ids: List[str], catalog: Optional[Dict[str, Dict[str, Any]]] = None,
+                      **kwargs) -> List[Dict[str, Any]]:
+    catalog = catalog or {}
+
+    async def _run():
+        async with AsyncCollector(**kwargs) as c:
+            coros = (c.odds_row(str(mid), catalog.get(str(mid))) for mid in match_ids)
+            return await _gather(coros, "Odds fetch (async)")
+    return asyncio.run(_run())
+
+def collect_scores(match_ids: List[str], **kwargs) -> Dict[str, Tuple[Optional[int], ...]]:
+    async def _run():
+        async with AsyncCollector(**kwargs) as c:
+            return await _gather((c.score(str(mid)) for mid in match_ids), "Score fetch (async)")
+    return dict(asyncio.run(_run()))
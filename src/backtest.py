@@ -0,0 +1,198 @@
+"""
+Walk-forward backtest for the nearest-neighbour value-bet model (predict_gpt.py).
+
+- History is replayed day by day; a match only sees neighbours with an earlier
+  match_date (no look-ahead)
+- Rows are sorted by date once, so "everything before day d" is a prefix view of
+  the same T / T_nan / goal matrices and of their masked copies (prepare_train) —
+  nothing is rebuilt or copied between days
+- Every market label of src/markets.py is settled against the actual goals with
+  the same vectorized predicates that produce the predictions
+- Report: per-strategy ROI / hit rate, Kelly bankroll path, calibration table
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.distance import DEFAULT_BLOCK_MEM_MB, nan_euclidean_topk, prepare_train
+from src.market_registry import canonical_columns, odds_matrix
+from src.markets import MARKET_LABELS, market_counts, market_odds, neighbor_goals, settle_markets
+from src.neighbor_index import GOAL_COLS
+from src.storage import read_table
+
+KEY_COLS = [
+    "match_date", "match_time", "tournament", "match_id",
+    "homeTeam", "awayTeam",
+    "firstHalfHomeGoal", "firstHalfAwayGoal",
+    "totalHomeGoal", "totalAwayGoal",
+    "homeCorner", "awayCorner"
+]
+STRATEGIES = ("all", "by_prob", "by_bankroll")
+CALIBRATION_BINS = 10
+
+
+def _kelly(p, odds):
+    b = odds - 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(np.clip((b * p - (1.0 - p)) / b, 0.0, None))
+
+
+def _pick_best(score, mask):
+    """Satır başına mask içindeki en yüksek skorlu market (yoksa -1)."""
+    masked = np.where(mask, score, -np.inf)
+    best = masked.argmax(axis=1)
+    return np.where(mask.any(axis=1), best, -1)
+
+
+def prepare_history(df, feature_cols=None):
+    """
+    Skoru belli maçları tarihe göre sıralar; gün sınırlarını (start, stop) çıkarır.
+    Bir günün maçları için aday komşular sıralı tablonun [:start] önekidir.
+    """
+    df = df[df[GOAL_COLS].notna().all(axis=1) & df["match_date"].notna()]
+    df = df.sort_values(["match_date", "match_time"], kind="stable").reset_index(drop=True)
+    if feature_cols is None:
+        # alias oran sütunları ("1:0" / "1-0") tek özellik (src/market_registry.py)
+        feature_cols = canonical_columns(c for c in df.columns
+                                         if c not in KEY_COLS and pd.api.types.is_numeric_dtype(df[c]))
+
+    dates = df["match_date"].astype(str).to_numpy()
+    day_starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(df) else np.array([], dtype=np.int64)
+    day_ends = np.r_[day_starts[1:], len(df)].astype(np.int64)
+    return df, feature_cols, list(zip(day_starts, day_ends))
+
+
+def walk_forward_backtest(df, top_k=100, min_ev=1.0, kelly_fraction=0.25, min_history=None,
+                          feature_cols=None, block_mem_mb=DEFAULT_BLOCK_MEM_MB, verbose=True):
+    """
+    Skoru belli maçlar üzerinde gün gün ileri yürüyen backtest.
+
+    min_ev: olasılık * oran eşiği (1.0 → pozitif beklenen kâr)
+    kelly_fraction: bankroll yolunda Kelly payının çarpanı (varsayılan çeyrek Kelly)
+    min_history: ilk tahminden önce gereken geçmiş maç sayısı (varsayılan top_k)
+    Dönüş: {"bets", "summary", "bankroll", "calibration"} DataFrame'leri.
+    """
+    min_history = top_k if min_history is None else min_history
+    df, feature_cols, days = prepare_history(df, feature_cols)
+
+    T = odds_matrix(df, feature_cols)
+    T_nan = np.isnan(T)
+    prepared = prepare_train(T, T_nan)   # günler arasında paylaşılan "indeks"
+    goals = df[GOAL_COLS].to_numpy(dtype=float)
+    odds_all = market_odds(df)
+    won_all, _ = settle_markets(goals)
+
+    dates = df["match_date"].astype(str).to_numpy()
+
+    bets = {s: [] for s in STRATEGIES}
+    cal_n = np.zeros(CALIBRATION_BINS)
+    cal_p = np.zeros(CALIBRATION_BINS)
+    cal_w = np.zeros(CALIBRATION_BINS)
+    n_days = 0
+
+    for start, stop in days:
+        if start < min_history:
+            continue
+        n_days += 1
+        # komşular: yalnızca bu günden önce oynanmış maçlar (sıralı tablonun öneki)
+        top_idx, n_valid = nan_euclidean_topk(T[start:stop], T_nan[start:stop], T[:start], T_nan[:start],
+                                              top_k, block_mem_mb=block_mem_mb,
+                                              prepared=tuple(m[:start] for m in prepared))
+        g, valid = neighbor_goals(goals, top_idx, n_valid)
+        counts = market_counts(g, valid)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prob = counts / n_valid[:, None]
+        odds = odds_all[start:stop]
+        won = won_all[start:stop]
+
+        priced = ~np.isnan(odds) & (n_valid[:, None] > 0)
+        bins = np.minimum((np.nan_to_num(prob) * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)[priced]
+        cal_n += np.bincount(bins, minlength=CALIBRATION_BINS)
+        cal_p += np.bincount(bins, weights=prob[priced], minlength=CALIBRATION_BINS)
+        cal_w += np.bincount(bins, weights=won[priced], minlength=CALIBRATION_BINS)
+
+        with np.errstate(invalid="ignore"):
+            value = priced & (prob * odds > min_ev)
+        kelly = _kelly(prob, odds)
+        exp_bankroll = prob * (1.0 + kelly * (odds - 1.0)) + (1.0 - prob) * (1.0 - kelly)
+
+        picks = {"all": np.nonzero(value)}
+        for name, score in (("by_prob", prob), ("by_bankroll", exp_bankroll)):
+            best = _pick_best(score, value)
+            rows = np.flatnonzero(best >= 0)
+            picks[name] = (rows, best[rows])
+        for name, (ti, mi) in picks.items():
+            bets[name].append(pd.DataFrame({
+                "strategy": name,
+                "match_date": dates[start + ti],
+                "match_id": df["match_id"].to_numpy()[start + ti],
+                "bet_name": np.asarray(MARKET_LABELS, dtype=object)[mi],
+                "probability": prob[ti, mi],
+                "odds": odds[ti, mi],
+                "EV": prob[ti, mi] * odds[ti, mi],
+                "Kelly": kelly[ti, mi],
+                "won": won[ti, mi],
+            }))
+        if verbose and n_days % 25 == 0:
+            print(f"🧭 {dates[start]}: {n_days} gün, {stop} maç işlendi")
+
+    frames = [f for s in STRATEGIES for f in bets[s]]
+    bets = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["strategy", "match_date", "match_id", "bet_name", "probability", "odds", "EV", "Kelly", "won"])
+    bets["profit"] = np.where(bets["won"], bets["odds"] - 1.0, -1.0)
+    f = (bets["Kelly"] * kelly_fraction).clip(upper=1.0)
+    bets["bankroll"] = np.where(bets["won"], 1.0 + f * (bets["odds"] - 1.0), 1.0 - f)
+    bets["bankroll"] = bets.groupby("strategy", sort=False)["bankroll"].cumprod()
+
+    summary = bets.groupby("strategy", sort=False).agg(
+        n_bets=("won", "size"), hit_rate=("won", "mean"), profit=("profit", "sum"),
+        avg_odds=("odds", "mean"), final_bankroll=("bankroll", "last"),
+    ).reindex(list(STRATEGIES))
+    summary["ROI"] = summary["profit"] / summary["n_bets"]
+    peak = bets.groupby("strategy", sort=False)["bankroll"].cummax()
+    summary["max_drawdown"] = (1.0 - bets["bankroll"] / peak).groupby(bets["strategy"]).max()
+
+    bankroll = bets.groupby(["strategy", "match_date"], sort=False)["bankroll"].last().reset_index()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        calibration = pd.DataFrame({
+            "bin_low": np.arange(CALIBRATION_BINS) / CALIBRATION_BINS,
+            "bin_high": np.arange(1, CALIBRATION_BINS + 1) / CALIBRATION_BINS,
+            "n": cal_n.astype(np.int64),
+            "mean_prob": cal_p / cal_n,
+            "hit_rate": cal_w / cal_n,
+        })
+
+    if verbose:
+        print(f"✅ Backtest: {n_days} gün, {len(df)} maç")
+        print(summary.to_string())
+    return {"bets": bets, "summary": summary.reset_index(), "bankroll": bankroll, "calibration": calibration}
+
+
+def save_report(report, out_prefix):
+    for name, frame in report.items():
+        frame.to_csv(f"backtest_{name}_{out_prefix}.csv", index=False)
+    print(f"💾 Backtest raporu kaydedildi → backtest_*_{out_prefix}.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the neighbour value-bet model.")
+    parser.add_argument("--data", default="data/processed/match_odds_cleaned_20250801.csv",
+                        help="Single CSV or match_date-partitioned dataset dir.")
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--min-ev", type=float, default=1.0)
+    parser.add_argument("--kelly-fraction", type=float, default=0.25)
+    parser.add_argument("--block-mem-mb", type=int, default=DEFAULT_BLOCK_MEM_MB)
+    parser.add_argument("--out-prefix", default="walkforward")
+    args = parser.parse_args(argv)
+
+    report = walk_forward_backtest(read_table(args.data), top_k=args.top_k, min_ev=args.min_ev,
+                                   kelly_fraction=args.kelly_fraction, block_mem_mb=args.block_mem_mb)
+    save_report(report, args.out_prefix)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
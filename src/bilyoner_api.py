@@ -0,0 +1,113 @@
+"""
+Bilyoner endpoints and payload parsing, shared by the threaded scraper
+(claude_scraper.py) and the asyncio collector (src/async_collector.py).
+
+- Endpoint paths / params, base URL, user agent and timeouts
+- Payload → row helpers: bulletin catalog, event meta, odds columns
+  ('Tümü' tab, filtered markets), wide match row and score tuple
+- No HTTP here: both fetch paths call these on the JSON they received, so
+  they produce identical rows
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+USER_AGENT = "Mozilla/5.0 (compatible; OddsCollector/1.0; +https://example.local)"
+BASE = "https://www.bilyoner.com"
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+
+ODD_FILTER_EXCLUDES = ("oyuncu", "kart", "korner", "penaltı", "özel", "dakikalar", "nasıl", "aralığ")
+
+GAMELIST_PATH = "/api/v3/mobile/aggregator/gamelist/all/v1"
+GAMELIST_PARAMS = {"tabType": 1, "bulletinType": 2, "liveEventsEnabledForPreBulletin": "true"}
+EVENT_INFO_PATH = "/api/v3/mobile/aggregator/gamelist/events/{match_id}"
+ODDS_PATH = "/api/v3/mobile/aggregator/match-card/{match_id}/odds"
+STATUS_PATH = "/api/mobile/match-card/v2/{match_id}/status"
+STATUS_PARAMS = {"sgSportTypeId": 1}  # soccer
+
+def _odds_params(is_live: bool = True, is_popular: bool = False) -> dict:
+    return {"isLiveEvent": str(is_live).lower(), "isPopular": str(is_popular).lower()}
+
+def _event_meta(event: dict) -> Dict[str, Any]:
+    """Event dict (gamelist entry or gamelist/events/{id}) → date, time, league, teams."""
+    esd: str = event.get("esd") or ""
+    date, time_str = (esd.split("T") + [None])[:2]
+    return {
+        "match_date": date,
+        "match_time": time_str,
+        "tournament": event.get("lgn"),
+        "homeTeam": event.get("htn"),
+        "awayTeam": event.get("atn"),
+    }
+
+def _meta_complete(meta: Optional[Dict[str, Any]]) -> bool:
+    # the per-match info call is only needed when the bulletin lacks kickoff or league
+    return bool(meta) and bool(meta.get("match_date")) and meta.get("tournament") is not None
+
+def _parse_catalog(data: Optional[dict]) -> Dict[str, Dict[str, Any]]:
+    events = (data or {}).get("events", {})
+    return {str(mid): _event_meta(ev or {}) for mid, ev in events.items()}
+
+def _extract_odds_rows(odds_json: dict) -> Dict[str, Any]:
+    """
+    Pulls columns from 'Tümü' tab and filters irrelevant markets.
+    Returns a dict of { "Market :: Selection": odd_value }.
+    """
+    out: Dict[str, Any] = {}
+    for tab in (odds_json or {}).get("oddGroupTabs", []):
+        if tab.get("title") != "Tümü":
+            continue
+        for market in tab.get("matchCardOdds", []):
+            mname = (market.get("name") or "").strip()
+            if any(ex in mname.lower() for ex in ODD_FILTER_EXCLUDES):
+                continue
+            for odd in market.get("oddList", []):
+                name, val = odd.get("n"), odd.get("val")
+                if name is None or val is None:
+                    continue
+                out[f"{mname} :: {name}"] = val
+    return out
+
+def _build_row(match_id: str, meta: Optional[Dict[str, Any]], odds: Optional[dict]) -> Optional[Dict[str, Any]]:
+    """Event meta + odds payload → one wide row (None if either is missing or no odds survive filtering)."""
+    if not meta or not odds:
+        return None
+
+    odds_dict = _extract_odds_rows(odds)
+    if not odds_dict:
+        return None
+
+    row: Dict[str, Any] = {
+        **odds_dict,
+        "match_date": meta["match_date"],
+        "match_time": meta["match_time"],
+        "tournament": meta["tournament"],
+        "match_id": str(match_id),
+        "homeTeam": odds.get("homeTeam"),
+        "awayTeam": odds.get("awayTeam"),
+        "firstHalfHomeGoal": pd.NA,
+        "firstHalfAwayGoal": pd.NA,
+        "totalHomeGoal": pd.NA,
+        "totalAwayGoal": pd.NA,
+        "homeCorner": pd.NA,
+        "awayCorner": pd.NA,
+    }
+    return row
+
+def _parse_scores(score_json: dict) -> Optional[Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]]:
+    if not score_json:
+        return None
+    scores = {s.get("scoreName"): s for s in (score_json.get("score") or [])}
+    try:
+        fh = scores.get("SOCCER_FIRST_HALF")
+        ft = scores.get("SOCCER_END_SCORE")
+        fh_h = int(fh["homeScore"]) if fh and fh.get("homeScore") is not None else None
+        fh_a = int(fh["awayScore"]) if fh and fh.get("awayScore") is not None else None
+        ft_h = int(ft["homeScore"]) if ft and ft.get("homeScore") is not None else None
+        ft_a = int(ft["awayScore"]) if ft and ft.get("awayScore") is not None else None
+        return fh_h, fh_a, ft_h, ft_a
+    except Exception:
+        return None
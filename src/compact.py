@@ -0,0 +1,118 @@
+"""
+Compact in-memory representation of the master odds table.
+
+- Odds ("Market :: Selection") columns → float32, or pandas sparse float32 (NaN fill)
+  for the hundreds of mostly-empty market columns
+- Teams / tournament / date / time → category, scores and corners → Int8
+- `odds_csr()` gives a CSR block keyed by a market-column dictionary (scipy, optional)
+- Bilyoner odds have at most 2 decimals: float32 → float64 with rounding to
+  ODDS_DECIMALS restores the exact float64 value read from CSV, so predictions
+  and written files do not change
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.storage import read_table
+
+SEP = " :: "
+SCORE_COLS = ["firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal", "homeCorner", "awayCorner"]
+CATEGORY_COLS = ["homeTeam", "awayTeam", "tournament", "match_date", "match_time"]
+ODDS_DECIMALS = 4
+ODDS_MODES = ("float32", "sparse")
+
+
+def odds_columns(df):
+    return [c for c in df.columns if SEP in str(c)]
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def compact_frame(df, odds="float32"):
+    """
+    Tabloyu küçük tiplere çevirir (kopya döner). odds: "float32" veya "sparse".
+    """
+    if odds not in ODDS_MODES:
+        raise ValueError(f"Bilinmeyen oran tipi: {odds}")
+    out = df.copy()
+    odd_cols = [c for c in odds_columns(out) if pd.api.types.is_numeric_dtype(out[c])]
+    if odd_cols:
+        block = out[odd_cols].astype(np.float32)
+        if odds == "sparse":
+            block = block.astype(pd.SparseDtype(np.float32, np.nan))
+        out[odd_cols] = block
+    for c in CATEGORY_COLS:
+        if c in out.columns:
+            out[c] = out[c].astype("category")
+    for c in SCORE_COLS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("Int8")
+    return out
+
+
+def _restore_odds(values):
+    return np.round(np.asarray(values, dtype=np.float64), ODDS_DECIMALS)
+
+
+def as_float64(frame):
+    """
+    Sayısal sütunlar → float64 matris. float32 / sparse sütunlar yuvarlanarak CSV'deki
+    değerlerine döndürülür; float64 girdide davranış to_numpy(dtype=float) ile aynı.
+    """
+    compact = [c for c, dtype in frame.dtypes.items()
+               if isinstance(dtype, pd.SparseDtype) or dtype == np.float32]
+    if not compact:
+        return frame.to_numpy(dtype=float, copy=True)
+    dense = frame.copy()
+    for c in compact:
+        dense[c] = _restore_odds(dense[c].to_numpy(dtype=np.float32, na_value=np.nan))
+    return dense.to_numpy(dtype=float, copy=True)
+
+
+def expand_frame(df):
+    """compact_frame'in tersi (küçük alt tablolar için, ör. test maçları)."""
+    out = df.copy()
+    for c in out.columns:
+        dtype = out[c].dtype
+        if isinstance(dtype, pd.SparseDtype) or dtype == np.float32:
+            out[c] = _restore_odds(out[c].to_numpy(dtype=np.float32, na_value=np.nan))
+        elif isinstance(dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype(object)
+        elif c in SCORE_COLS:
+            out[c] = out[c].astype("Int64")
+    return out
+
+
+def odds_csr(df, columns=None):
+    """
+    Oran sütunları → (scipy.sparse.csr_matrix float32, {market etiketi: sütun no}).
+    NaN hücreler saklanmaz.
+    """
+    try:
+        from scipy import sparse
+    except ImportError as e:  # optional dependency
+        raise ImportError("odds_csr needs scipy: pip install scipy") from e
+    columns = list(columns or odds_columns(df))
+    dense = as_float64(df[columns]).astype(np.float32)
+    rows, cols = np.nonzero(~np.isnan(dense))
+    matrix = sparse.csr_matrix((dense[rows, cols], (rows, cols)), shape=dense.shape, dtype=np.float32)
+    return matrix, {c: j for j, c in enumerate(columns)}
+
+
+def memory_report(before, after, label="tablo"):
+    b, a = memory_mb(before), memory_mb(after)
+    print(f"🧮 {label}: {b:.1f} MB → {a:.1f} MB ({b / max(a, 1e-9):.1f}x daha küçük)")
+    return {"before_mb": b, "after_mb": a}
+
+
+def load_compact(path, columns=None, odds="float32", report=True):
+    """
+    read_table + compact_frame. report=True ise ölçülen önce/sonra bellek kullanımı yazdırılır.
+    """
+    raw = read_table(path, columns=columns)
+    df = compact_frame(raw, odds=odds)
+    if report:
+        memory_report(raw, df, label=str(path))
+    return df
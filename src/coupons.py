@@ -0,0 +1,234 @@
+"""
+Exact coupon search over a value-bet list (replaces the random sampling in kuponcu.ipynb).
+
+- Legs are sorted by single-bet EV (p * odds), so the best remaining legs after any
+  position are simply the next ones → cheap upper bounds
+- Depth-first over leg positions; the last leg is evaluated for all candidates at
+  once with NumPy broadcasting
+- Branch-and-bound: a branch is cut when even its best possible completion cannot
+  reach the stake (Kelly) threshold or beat the current N-th best expected bankroll
+- One coupon per match set (the notebook's seen_keys rule): the best expected bankroll
+  among the bet combinations of the same matches; unique_matches=False lists them all
+- Deterministic: ties are broken by leg order, no random sampling
+"""
+
+import heapq
+import json
+
+import numpy as np
+import pandas as pd
+
+EXPECTED_COLS = [
+    "match_date", "match_time", "match_id", "hometeam", "awayteam",
+    "bet_name", "probability", "odds"
+]
+LIST_COLS = ["match_ids", "matches", "bet_names", "component_probs", "component_odds"]
+
+
+def _to_float_odds(x):
+    """Odds sütununda virgüllü yazımları ("1,15") 1.15'e çevirir."""
+    if pd.isna(x):
+        return np.nan
+    s = str(x).strip().replace('"', '').replace("'", "")
+    s = s.replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return np.nan
+
+
+def load_value_bets(path):
+    """
+    value_bets_*.csv → temizlenmiş bahis listesi (kuponcu.ipynb ile aynı kurallar).
+    """
+    raw = pd.read_csv(path)
+    if set(EXPECTED_COLS).issubset(raw.columns):
+        df = raw[EXPECTED_COLS].copy()
+    else:
+        df = raw.iloc[:, :len(EXPECTED_COLS)].copy()
+        df.columns = EXPECTED_COLS
+
+    df["match_id"] = df["match_id"].astype(str)
+    df["probability"] = pd.to_numeric(df["probability"], errors="coerce")
+    df["odds"] = df["odds"].map(_to_float_odds)
+
+    df = df.dropna(subset=["match_id", "probability", "odds"])
+    df = df[df["odds"] > 1.0]
+    df = df[(df["probability"] >= 0.0) & (df["probability"] <= 100.0)].copy()
+    return df.reset_index(drop=True)
+
+
+def coupon_metrics(p, odds):
+    """
+    Kupon olasılığı ve oranından (skaler veya dizi) Kelly ve bankroll metrikleri.
+    Kelly, p <= 0, p >= 1 veya oran <= 1 ise 0.
+    """
+    p = np.asarray(p, dtype=float)
+    odds = np.asarray(odds, dtype=float)
+    b = odds - 1.0
+    ok = (odds > 1.0) & (p > 0.0) & (p < 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        kelly = np.where(ok, np.maximum((b * p - (1.0 - p)) / np.where(ok, b, 1.0), 0.0), 0.0)
+    if_win = 1.0 + kelly * b
+    if_lose = 1.0 - kelly
+    return kelly, if_win, if_lose, p * if_win + (1.0 - p) * if_lose
+
+
+class _TopN:
+    """
+    Beklenen bankroll'a göre en iyi N kupon (eşitlikte leg sırası küçük olan).
+    Aynı anahtarlı (maç kümesi) kuponlardan yalnız en iyisi tutulur; floor N-inci en iyi anahtarın skoru.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.heap = []
+        self.best = {}                      # anahtar → heap'teki geçerli kayıt (eskiler heap'te bayat kalır)
+
+    def _drop_stale(self):
+        while self.heap and self.best.get(self.heap[0][2]) is not self.heap[0]:
+            heapq.heappop(self.heap)
+
+    @property
+    def floor(self):
+        if len(self.best) < self.n:
+            return -np.inf
+        self._drop_stale()
+        return self.heap[0][0]
+
+    def push(self, score, legs, key):
+        item = (score, tuple(-i for i in legs), key)
+        old = self.best.get(key)
+        if old is not None and old >= item:
+            return
+        if old is None and len(self.best) >= self.n:
+            self._drop_stale()
+            if item <= self.heap[0]:
+                return
+        self.best[key] = item
+        heapq.heappush(self.heap, item)
+        if old is None and len(self.best) > self.n:
+            self._drop_stale()
+            del self.best[heapq.heappop(self.heap)[2]]
+
+    def legs(self):
+        ranked = sorted(self.best.values(), reverse=True)
+        return [tuple(-i for i in neg) for _, neg, _ in ranked]
+
+
+def search_coupons(bets, legs=3, top_n=100, stake_min=5.0, unique_matches=True):
+    """
+    Farklı maçlardan `legs` bahisli kuponlar arasında beklenen bankroll'u en yüksek top_n kupon.
+    legs tek sayı (3) veya liste ((2, 3, 4)) olabilir.
+    Geçerlilik: kupon stake'i (Kelly * 100) > stake_min.
+    unique_matches: kuponcu.ipynb'deki seen_keys kuralı — aynı maç kümesinden (sıralı match_id'ler)
+    yalnız beklenen bankroll'u en yüksek kupon tutulur. False: aynı maçların farklı bahis
+    kombinasyonları da ayrı kupon olarak listelenir.
+    bets: load_value_bets çıktısı (probability yüzde olarak).
+    Dönüş: kuponcu.ipynb ile aynı sütunlarda DataFrame.
+    """
+    p = (bets["probability"].to_numpy(dtype=float) / 100.0)
+    o = bets["odds"].to_numpy(dtype=float)
+    e = p * o
+    # EV'ye göre azalan, eşitlikte match_id / bet_name (deterministik sıra)
+    order = np.lexsort((bets["bet_name"].astype(str).to_numpy(), bets["match_id"].astype(str).to_numpy(), -e))
+    bets = bets.iloc[order].reset_index(drop=True)
+    p, o, e = p[order], o[order], e[order]
+    match = pd.factorize(bets["match_id"].astype(str))[0]
+    m = len(bets)
+
+    s = stake_min / 100.0
+    log_e = np.log(np.maximum(e, 1e-300))
+    # best_e[r][i]: sonraki r bacağın (i dahil) en iyi EV çarpımı; sıralı olduğu için ardışık r eleman
+    cum = np.r_[0.0, np.cumsum(log_e)]
+    min_o_suffix = np.minimum.accumulate(o[::-1])[::-1]
+    top = _TopN(top_n)
+
+    def best_e(i, r):
+        if r == 0:
+            return 1.0
+        j = min(i + r, m)
+        return np.exp(cum[j] - cum[i]) if j - i == r else 0.0
+
+    def bound(E, O, i, r):
+        """i'den başlayarak r bacak daha eklenirse ulaşılabilecek en iyi (EV, oran alt sınırı)."""
+        return E * best_e(i, r), O * (min_o_suffix[i] ** r if i < m else np.inf)
+
+    def viable(E_ub, O_lb):
+        if E_ub <= 1.0 + s * (O_lb - 1.0):          # Kelly > s için gerekli: E > 1 + s (O - 1)
+            return False
+        eb_ub = 1.0 + (E_ub - 1.0) ** 2 / max(O_lb - 1.0, 1e-12)  # beklenen bankroll = 1 + (E-1)²/(O-1)
+        return eb_ub > top.floor
+
+    def last_leg(P, O, start, used, chosen):
+        j = np.arange(start, m)
+        if len(j) == 0:
+            return
+        cp, co = P * p[j], O * o[j]
+        kelly, _, _, eb = coupon_metrics(cp, co)
+        ok = (kelly * 100.0 > stake_min) & (kelly > 0) & ~np.isin(match[j], used) & (eb > top.floor)
+        cand = np.flatnonzero(ok)
+        cand = cand[np.argsort(-eb[cand], kind="stable")]
+        if unique_matches:
+            # aynı son maçın bahisleri aynı maç kümesini verir → yalnız en iyisi aday
+            cand = cand[np.unique(match[j[cand]], return_index=True)[1]]
+            cand = cand[np.argsort(-eb[cand], kind="stable")]
+        for c in cand[:top_n]:
+            legs_c = chosen + [int(j[c])]
+            key = tuple(sorted(match[legs_c].tolist())) if unique_matches else tuple(legs_c)
+            top.push(eb[c], legs_c, key)
+
+    def extend(P, O, start, r, used, chosen):
+        if r == 1:
+            last_leg(P, O, start, used, chosen)
+            return
+        for i in range(start, m - r + 1):
+            if P * O * best_e(i, r) <= 1.0:
+                break                               # EV sıralı: sonraki i'ler daha kötü
+            if match[i] in used:
+                continue
+            E_ub, O_lb = bound(P * O * e[i], O * o[i], i + 1, r - 1)
+            if not viable(E_ub, O_lb):
+                continue
+            extend(P * p[i], O * o[i], i + 1, r - 1, used + [match[i]], chosen + [i])
+
+    # 2'li, 3'lü, ... aramalar aynı top-N listesini (ve eşiğini) paylaşır
+    for n_legs in sorted({legs} if np.isscalar(legs) else set(legs)):
+        extend(1.0, 1.0, 0, int(n_legs), [], [])
+    return _coupon_frame(bets, p, o, top.legs())
+
+
+def _coupon_frame(bets, p, o, coupons):
+    rows = []
+    for legs in coupons:
+        idx = list(legs)
+        sample = bets.iloc[idx]
+        p_coupon = float(np.prod(p[idx]))
+        odds_coupon = float(np.prod(o[idx]))
+        kelly, if_win, if_lose, eb = (float(v) for v in coupon_metrics(p_coupon, odds_coupon))
+        rows.append({
+            "match_ids": sorted(sample["match_id"].tolist()),
+            "matches": (sample["hometeam"].astype(str) + " - " + sample["awayteam"].astype(str)).tolist(),
+            "bet_names": sample["bet_name"].tolist(),
+            "component_probs": np.round(p[idx], 6).tolist(),
+            "component_odds": np.round(o[idx], 6).tolist(),
+            "coupon_probability": round(p_coupon, 8),
+            "coupon_odds": round(odds_coupon, 6),
+            "coupon_EV": round(p_coupon * odds_coupon, 6),
+            "coupon_Kelly": round(kelly, 6),
+            "coupon_stake": round(kelly * 100.0, 4),
+            "coupon_bankroll_if_win": round(if_win, 6),
+            "coupon_bankroll_if_lose": round(if_lose, 6),
+            "coupon_expected_bankroll": round(eb, 6),
+        })
+    return pd.DataFrame(rows)
+
+
+def save_coupons(coupons, path):
+    """Liste sütunları JSON string olarak (kuponcu.ipynb çıktısıyla aynı biçim)."""
+    out = coupons.copy()
+    for c in LIST_COLS:
+        if c in out.columns:
+            out[c] = out[c].map(lambda x: json.dumps(x, ensure_ascii=False))
+    out.to_csv(path, index=False, encoding="utf-8-sig")
+    print(f"Kaydedildi: {path} — {len(out)} satır")
@@ -0,0 +1,125 @@
+import numpy as np
+
+from src.utils import timing_logger
+
+DEFAULT_BLOCK_MEM_MB = 256
+# Blok başına tutulan (n_block, N_train) float64 geçici dizi sayısı (tahmini)
+_BLOCK_TEMPORARIES = 6
+
+
+def nan_euclidean_rows(T, T_nan, test_vec, test_nan):
+    """
+    Tek test satırının verilen train satırlarına nan-aware Öklid uzaklığı.
+    Ortak geçerli feature yoksa uzaklık +inf olur.
+    """
+    valid = (~T_nan) & (~test_nan)
+    diff = np.where(valid, T - test_vec, 0.0)
+    ss = np.einsum("ij,ij->i", diff, diff)
+    cnt = valid.sum(axis=1)
+    dist = np.sqrt(ss)
+    dist[cnt == 0] = np.inf
+    return dist
+
+
+def block_rows_for_budget(n_train, block_mem_mb=DEFAULT_BLOCK_MEM_MB):
+    """
+    Bellek bütçesine (MB) sığacak test satırı blok boyunu döndürür.
+    """
+    per_row = max(1, n_train) * 8 * _BLOCK_TEMPORARIES
+    return max(1, int(block_mem_mb * 1024 * 1024) // per_row)
+
+
+def _select_topk(dist, idx, k):
+    # En küçük k uzaklık; eşitlikte küçük train indeksi önce gelir
+    order = np.lexsort((idx, dist))[:k]
+    return idx[order], dist[order]
+
+
+def merge_topk(idx_a, dist_a, idx_b, dist_b, k):
+    """
+    İki (idx, dist) komşu listesini tek bir sıralı top-k listesinde birleştirir.
+    """
+    idx = np.concatenate([idx_a, idx_b])
+    dist = np.concatenate([dist_a, dist_b])
+    keep = np.isfinite(dist)
+    return _select_topk(dist[keep], idx[keep], k)
+
+
+def prepare_train(T, T_nan):
+    """
+    nan_euclidean_topk için maskeli train matrisleri (MT, AT, AT²). Satır bazlı oldukları
+    için önekleri (ör. [:n]) aynı T[:n] için hazırlanmış matrislerle birebir aynıdır.
+    """
+    MT = (~T_nan).astype(np.float64)
+    AT = np.where(T_nan, 0.0, T)
+    return MT, AT, AT * AT
+
+
+def approx_sq_dist(X, X_nan, MT, AT, AT2):
+    """
+    BLAS ile yaklaşık nan-aware d² (test blok × train) ve sayısal hata payı:
+    kesin d² ∈ [approx - tol, approx + tol]. Ortak feature'ı olmayan çiftler +inf.
+    """
+    MX = (~X_nan).astype(np.float64)
+    AX = np.where(X_nan, 0.0, X)
+
+    cnt = MX @ MT.T                       # ortak geçerli feature sayısı
+    sa = (AX * AX) @ MT.T                 # Σ a² (ortak boyutlar)
+    sb = MX @ AT2.T                       # Σ b² (ortak boyutlar)
+    approx = sa + sb - 2.0 * (AX @ AT.T)
+    tol = 4.0 * (MT.shape[1] + 2) * np.finfo(np.float64).eps * (sa + sb)
+    approx[cnt == 0] = np.inf
+    return approx, tol
+
+
+@timing_logger("distance.topk", rows=lambda out: len(out[0]))
+def nan_euclidean_topk(X, X_nan, T, T_nan, k, block_mem_mb=DEFAULT_BLOCK_MEM_MB, return_dist=False,
+                       prepared=None):
+    """
+    Tüm test satırları için train matrisindeki en yakın k komşuyu bloklar halinde bulur.
+
+    ||a-b||² = ||a||² + ||b||² - 2ab özdeşliği maskeli matrislerle matris çarpımına
+    çevrilir; sayısal hata payı içindeki adaylar `nan_euclidean_rows` ile kesin
+    olarak yeniden hesaplanır, böylece sonuç satır satır döngüyle aynı kalır.
+
+    Dönüş: (idx, n_valid)
+      idx: (N_test, k) int64, uzaklığa göre sıralı train indeksleri, eksikler -1
+      n_valid: (N_test,) her satır için bulunan komşu sayısı (0 → karşılaştırılamaz)
+    return_dist=True ise (idx, dist, n_valid) döner; dist eksiklerde +inf.
+    prepared: prepare_train(T, T_nan) çıktısı; tekrar tekrar sorgulanan T için bir kez hazırlanır.
+    """
+    n_test, n_train = X.shape[0], T.shape[0]
+    idx_out = np.full((n_test, k), -1, dtype=np.int64)
+    dist_out = np.full((n_test, k), np.inf)
+    n_valid = np.zeros(n_test, dtype=np.int64)
+    if n_test == 0 or n_train == 0 or k <= 0:
+        return (idx_out, dist_out, n_valid) if return_dist else (idx_out, n_valid)
+
+    # Maskeli train matrisleri bir kez hazırlanır
+    MT, AT, AT2 = prepared if prepared is not None else prepare_train(T, T_nan)
+
+    bs = block_rows_for_budget(n_train, block_mem_mb)
+    for start in range(0, n_test, bs):
+        stop = min(start + bs, n_test)
+        approx, tol = approx_sq_dist(X[start:stop], X_nan[start:stop], MT, AT, AT2)
+
+        for r in range(stop - start):
+            i = start + r
+            row = approx[r]
+            n_fin = int(np.isfinite(row).sum())
+            if n_fin == 0:
+                continue
+            kk = min(k, n_fin)
+
+            # Kesin k. uzaklık için üst sınır; altında kalan herkes aday
+            part = np.argpartition(row, kk - 1)[:kk]
+            upper = (row[part] + tol[r, part]).max()
+            cand = np.flatnonzero(row - tol[r] <= upper)
+
+            dist = nan_euclidean_rows(T[cand], T_nan[cand], X[i], X_nan[i])
+            idx_out[i, :kk], dist_out[i, :kk] = _select_topk(dist, cand, kk)
+            n_valid[i] = kk
+
+    if return_dist:
+        return idx_out, dist_out, n_valid
+    return idx_out, n_valid
@@ -0,0 +1,171 @@
+"""
+Disk-backed JSON response cache for the Bilyoner endpoints.
+
+- Keyed by URL + sorted query params
+- Per-endpoint TTLs; stale entries are revalidated with If-None-Match / If-Modified-Since
+- Size-bounded LRU eviction (file mtime = last use)
+- Replay mode: answers only from the cache, never touches the network
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+# substring of the URL path → seconds an entry is served without revalidation
+ENDPOINT_TTLS = {
+    "/gamelist/all/": 300,
+    "/gamelist/events/": 6 * 3600,
+    "/odds": 600,
+    "/status": 120,
+}
+DEFAULT_TTL = 0
+DEFAULT_MAX_MB = 512
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str, *, ttls: Optional[Dict[str, int]] = None,
+                 max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, replay: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = self.revalidated = self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes = {p: os.path.getsize(p) for p in self._entry_files()}
+        self._total = sum(self._sizes.values())
+
+    # ------------------------------ keys ------------------------------- #
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _entry_files(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for f in files:
+                if f.endswith(".json"):
+                    yield os.path.join(root, f)
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, ttl in self.ttls.items():
+            if pattern in url:
+                return ttl
+        return DEFAULT_TTL
+
+    # ----------------------------- entries ----------------------------- #
+
+    def lookup(self, url: str, params: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+        path = self._path(self.key(url, params))
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # LRU: mtime = last use
+        except OSError:
+            pass            # evicted after the read; the entry we hold is still valid
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl_for(entry["url"])
+
+    @staticmethod
+    def validators(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, params: Optional[dict], body: Any, headers=None) -> None:
+        headers = headers or {}
+        entry = {
+            "url": url,
+            "params": {str(k): str(v) for k, v in (params or {}).items()},
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": body,
+        }
+        self._write(entry)
+
+    def refresh(self, entry: Dict[str, Any]) -> None:
+        """304 Not Modified → the stored body is valid for another TTL."""
+        entry["stored_at"] = time.time()
+        self._write(entry)
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        path = self._path(self.key(entry["url"], entry["params"]))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total += size - self._sizes.get(path, 0)
+            self._sizes[path] = size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # least recently used first, down to 90% of the budget
+        target = int(self.max_bytes * 0.9)
+        by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0.0)
+        for path in by_age:
+            if self._total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._total -= self._sizes.pop(path)
+
+    def stats(self) -> str:
+        return (f"cache: {self.hits} hit, {self.revalidated} revalidated (304), {self.misses} miss, "
+                f"{self._total / 1e6:.2f} MB")
+
+
+def cached_get(cache: ResponseCache, session: requests.Session, url: str, *,
+               params: Optional[dict] = None, timeout=None) -> Optional[dict]:
+    """
+    claude_scraper._get üzerinden önbellekli GET: taze kayıt → ağ yok; bayat kayıt →
+    koşullu istek (304 ise kayıt yenilenir); replay modunda sadece önbellek.
+    """
+    entry = cache.lookup(url, params)
+    if entry is not None and (cache.replay or cache.is_fresh(entry)):
+        cache.hits += 1
+        return entry["body"]
+    if cache.replay:
+        cache.misses += 1
+        return None
+
+    try:
+        r = session.get(url, params=params, timeout=timeout, headers=cache.validators(entry))
+        if r.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            cache.refresh(entry)
+            return entry["body"]
+        if r.status_code == 200:
+            body = r.json()
+            cache.misses += 1
+            cache.store(url, params, body, r.headers)
+            return body
+    except requests.RequestException:
+        return None
+    return None
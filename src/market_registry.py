@@ -0,0 +1,205 @@
+"""
+Persisted registry of "Market :: Selection" odds columns.
+
+- Every raw label scraped from Bilyoner is mapped to a canonical label with a
+  stable integer id; spelling variants ("Maç Skoru :: 1:0" / "1-0", extra
+  spaces) are aliases of the same id
+- Ids are append-only: a new market is one more entry in the registry, existing
+  ids never change
+- Stored next to the data: <csv>.markets.json, or <dataset>/_markets.json
+- Wide tables keep canonical labels as column headers; alias columns already in
+  old files are resolved through the registry (coalesce / odds_matrix), so the
+  predictor's features and market odds see one column per market id
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.compact import as_float64
+from src.storage import is_dataset
+
+SEP = " :: "
+REGISTRY_FILE = "_markets.json"
+_SCORE_RE = re.compile(r"^(\d+)\s*[:\-]\s*(\d+)$")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def canonical_label(label):
+    """
+    Ham etiket → kanonik etiket. Örn. "Maç Skoru :: 1:0" → "Maç Skoru :: 1-0".
+    " :: " içermeyen etiketler (match_id vb.) olduğu gibi döner.
+    """
+    label = str(label)
+    if SEP.strip() not in label:
+        return label
+    market, selection = (_SPACE_RE.sub(" ", part).strip() for part in label.split(SEP.strip(), 1))
+    score = _SCORE_RE.match(selection)
+    if score:
+        selection = f"{score.group(1)}-{score.group(2)}"
+    return f"{market}{SEP}{selection}"
+
+
+def canonical_columns(columns):
+    """Sütun adları → kanonik etiketler (ilk görülme sırasıyla, alias'lar tek etiket)."""
+    return list(dict.fromkeys(canonical_label(c) for c in columns))
+
+
+def odds_matrix(df, labels, registry=None):
+    """
+    (N, len(labels)) float64 matris: " :: " içeren etiketler registry.coalesce ile (alias
+    sütunlardan satır başına ilk dolu değer), diğerleri doğrudan sütundan. Olmayan sütunlar NaN.
+    registry verilmezse geçici bir tane (alias çözümü canonical_label ile aynı).
+    """
+    registry = registry if registry is not None else MarketRegistry()
+    labels = list(labels)
+    out = np.full((len(df), len(labels)), np.nan)
+    odds = [j for j, c in enumerate(labels) if SEP in str(c)]
+    if odds:
+        out[:, odds] = registry.coalesce(df, registry.ids([labels[j] for j in odds]))
+    for j, c in enumerate(labels):
+        if SEP not in str(c) and c in df.columns:
+            out[:, j] = as_float64(df[[c]])[:, 0]
+    return out
+
+
+def registry_path(data_path):
+    """Veri dosyası / klasörü için registry dosyasının yolu."""
+    if is_dataset(data_path):
+        return os.path.join(data_path, REGISTRY_FILE)
+    return str(data_path) + ".markets.json"
+
+
+class MarketRegistry:
+    """
+    Ham etiket ↔ kanonik market id eşlemesi. Yeni etiketler register() ile eklenir,
+    save() yalnızca değişiklik varsa dosyayı (atomik) yeniden yazar.
+    """
+
+    def __init__(self, path=None, labels=(), aliases=None):
+        self.path = path
+        self.labels = list(labels)                      # id → kanonik etiket
+        self._ids = {label: i for i, label in enumerate(self.labels)}
+        self.aliases = dict(aliases or {})              # ham etiket → id
+        self._dirty = False
+
+    @classmethod
+    def open(cls, path):
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, data["markets"], data["aliases"])
+        return cls(path)
+
+    @classmethod
+    def for_data(cls, data_path):
+        return cls.open(registry_path(data_path))
+
+    def save(self):
+        if not self._dirty or not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"markets": self.labels, "aliases": self.aliases}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.labels)
+
+    # ------------------------------ lookup ----------------------------------- #
+
+    def register(self, labels):
+        """
+        Ham etiketleri kaydeder (gerekirse yeni id açar). Dönüş: eklenen yeni kanonik etiketler.
+        """
+        added = []
+        for raw in labels:
+            raw = str(raw)
+            if raw in self.aliases:
+                continue
+            canon = canonical_label(raw)
+            if canon not in self._ids:
+                self._ids[canon] = len(self.labels)
+                self.labels.append(canon)
+                added.append(canon)
+            self.aliases[raw] = self._ids[canon]
+            self._dirty = True
+        return added
+
+    def id_of(self, label):
+        """Ham veya kanonik etiketin id'si (kayıtlı değilse KeyError)."""
+        label = str(label)
+        if label in self.aliases:
+            return self.aliases[label]
+        return self._ids[canonical_label(label)]
+
+    def ids(self, labels, add=True):
+        """Etiket listesi → id dizisi. add=False iken bilinmeyen etiketler -1."""
+        if add:
+            self.register(labels)
+        out = np.empty(len(labels), dtype=np.int64)
+        for j, label in enumerate(labels):
+            try:
+                out[j] = self.id_of(label)
+            except KeyError:
+                out[j] = -1
+        return out
+
+    def label(self, market_id):
+        return self.labels[market_id]
+
+    def columns(self, ids, available):
+        """`available` sütunları içinde verilen id'lere ait tüm ham (alias) sütunlar."""
+        wanted = set(int(i) for i in ids)
+        return [c for c in available if SEP in str(c) and self.aliases.get(str(c), -1) in wanted]
+
+    # ------------------------------ frames ----------------------------------- #
+
+    def canonicalize_rows(self, rows, columns=()):
+        """
+        Maç satırları (dict listesi): oran anahtarları kanonik etikete çevrilir, ilk değer korunur.
+        columns: tablodaki mevcut sütunlar — bir id zaten yalnızca alias adıyla saklanıyorsa
+        o sütun kullanılır (tablo yeniden yazılmaz).
+        """
+        self.register([c for c in columns if SEP in str(c)])
+        stored = {}
+        for c in columns:
+            if SEP in str(c):
+                m = self.id_of(c)
+                if m not in stored or c == self.labels[m]:
+                    stored[m] = c
+        out = []
+        for row in rows:
+            self.register([k for k in row if SEP in str(k)])
+            new = {}
+            for k, v in row.items():
+                if SEP in str(k):
+                    m = self.aliases[str(k)]
+                    k = stored.get(m, self.labels[m])
+                if k not in new:
+                    new[k] = v
+            out.append(new)
+        return out
+
+    def coalesce(self, df, ids):
+        """
+        (N, len(ids)) float oran matrisi: her id için alias sütunlarından satır başına
+        ilk dolu değer (sütun sırasıyla). Tabloda olmayan id'ler NaN.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        pos = {int(m): j for j, m in enumerate(ids)}
+        cols = [c for c in df.columns if SEP in str(c)]
+        col_ids = self.ids(cols)
+        out = np.full((len(df), len(ids)), np.nan)
+        for c, m in zip(cols, col_ids):
+            j = pos.get(int(m))
+            if j is None:
+                continue
+            vals = as_float64(df[[c]])[:, 0]
+            out[:, j] = np.where(np.isnan(out[:, j]), vals, out[:, j])
+        return out
@@ -0,0 +1,263 @@
+import numpy as np
+import pandas as pd
+
+from src.market_registry import odds_matrix
+from src.utils import timing_logger
+
+VALUE_BET_COLS = [
+    "match_date", "match_time", "match_id", "hometeam", "awayteam",
+    "bet_name", "probability", "odds"
+]
+
+
+class Goals:
+    """
+    Komşu maçların gol dizileri ve sık kullanılan türetilmiş diziler.
+    Tüm diziler aynı şekle sahiptir, örn. (N_test, K).
+    """
+
+    def __init__(self, hg, ag, ihg, iag):
+        self.hg, self.ag, self.ihg, self.iag = hg, ag, ihg, iag
+
+        self.shg = hg - ihg
+        self.sag = ag - iag
+        self.tg = hg + ag
+        self.itg = ihg + iag
+        self.stg = self.tg - self.itg
+        self.gd = hg - ag
+
+        self.ms1 = hg > ag
+        self.msx = hg == ag
+        self.ms2 = ag > hg
+        self.kg_var = (hg > 0) & (ag > 0)
+
+        self.iy1 = ihg > iag
+        self.iy2 = iag > ihg
+        self.iyx = ihg == iag
+        self.iy_kg_var = (ihg > 0) & (iag > 0)
+
+
+# --------------------------- market registry --------------------------- #
+# (bahis etiketi, Goals → bool dizi) çiftleri; sıra çıktı satır sırasını belirler.
+
+MARKETS = []
+
+
+def market(label, predicate):
+    MARKETS.append((label, predicate))
+
+
+def _alt_ust(prefix, values, series):
+    for v, s in values:
+        market(prefix.format(s=s, side="Alt"), lambda g, v=v: series(g) < v)
+        market(prefix.format(s=s, side="Üst"), lambda g, v=v: series(g) >= v)
+
+
+def _thr(*values):
+    return [(v, f"{v:.1f}".replace(".", ",")) for v in values]
+
+
+# Maç Sonucu
+market("Maç Sonucu :: MS 1", lambda g: g.ms1)
+market("Maç Sonucu :: MS X", lambda g: g.msx)
+market("Maç Sonucu :: MS 2", lambda g: g.ms2)
+
+# Deplasman
+_alt_ust("Deplasman Gol Alt/Üst :: Dep {s} {side}", _thr(0.5, 1.5, 2.5, 3.5, 4.5, 6.5), lambda g: g.ag)
+market("Deplasman Gol Yemeden Kazanır mı? :: Evet", lambda g: (g.ag > g.hg) & (g.hg == 0))
+market("Deplasman Gol Yemeden Kazanır mı? :: Hayır", lambda g: ~((g.ag > g.hg) & (g.hg == 0)))
+market("Deplasman Hangi Yarıda Daha Fazla Gol Atar? :: 1. Yarı", lambda g: g.iag > g.sag)
+market("Deplasman Hangi Yarıda Daha Fazla Gol Atar? :: 2. Yarı", lambda g: g.sag > g.iag)
+market("Deplasman Hangi Yarıda Daha Fazla Gol Atar? :: Eşit", lambda g: g.iag == g.sag)
+market("Deplasman Her İki Yarıyı da Kazanır mı? :: Evet", lambda g: (g.iag > g.ihg) & (g.sag > g.shg))
+market("Deplasman Her İki Yarıyı da Kazanır mı? :: Hayır", lambda g: ~((g.iag > g.ihg) & (g.sag > g.shg)))
+market("Deplasman Herhangi Bir Yarıyı Kazanır :: Evet", lambda g: (g.iag > g.ihg) | (g.sag > g.shg))
+market("Deplasman Herhangi Bir Yarıyı Kazanır :: Hayır", lambda g: ~((g.iag > g.ihg) | (g.sag > g.shg)))
+_alt_ust("Deplasman İlk Yarı Gol Alt/Üst :: Dep İY {s} {side}", _thr(0.5, 1.5, 2.5), lambda g: g.iag)
+
+# Ev Sahibi
+_alt_ust("Ev Sahibi Gol Alt/Üst :: Ev {s} {side}", _thr(0.5, 1.5, 2.5, 3.5, 4.5), lambda g: g.hg)
+market("Ev Sahibi Gol Yemeden Kazanır mı? :: Evet", lambda g: (g.hg > g.ag) & (g.ag == 0))
+market("Ev Sahibi Gol Yemeden Kazanır mı? :: Hayır", lambda g: ~((g.hg > g.ag) & (g.ag == 0)))
+market("Ev Sahibi Hangi Yarıda Daha Fazla Gol Atar? :: 1. Yarı", lambda g: g.ihg > g.shg)
+market("Ev Sahibi Hangi Yarıda Daha Fazla Gol Atar? :: 2. Yarı", lambda g: g.shg > g.ihg)
+market("Ev Sahibi Hangi Yarıda Daha Fazla Gol Atar? :: Eşit", lambda g: g.shg == g.ihg)
+_alt_ust("Ev Sahibi İlk Yarı Gol Alt/Üst :: Ev İY {s} {side}", _thr(0.5, 1.5, 2.5), lambda g: g.ihg)
+
+# Fark bahisleri
+market("Hangi Takım Kaç Farkla Kazanır :: Berabere", lambda g: g.gd == 0)
+market("Hangi Takım Kaç Farkla Kazanır :: Dep 1 Fark", lambda g: g.gd == -1)
+market("Hangi Takım Kaç Farkla Kazanır :: Dep 2 Fark", lambda g: g.gd == -2)
+market("Hangi Takım Kaç Farkla Kazanır :: Dep 3+ Fark", lambda g: g.gd <= -3)
+market("Hangi Takım Kaç Farkla Kazanır :: Ev 1 Fark", lambda g: g.gd == 1)
+market("Hangi Takım Kaç Farkla Kazanır :: Ev 2 Fark", lambda g: g.gd == 2)
+market("Hangi Takım Kaç Farkla Kazanır :: Ev 3+ Fark", lambda g: g.gd >= 3)
+
+# Hangi yarı daha fazla gol?
+market("Hangi Yarıda Daha Fazla Gol Atılır? :: 1. Yarı", lambda g: g.itg > g.stg)
+market("Hangi Yarıda Daha Fazla Gol Atılır? :: 2. Yarı", lambda g: g.stg > g.itg)
+market("Hangi Yarıda Daha Fazla Gol Atılır? :: Eşit", lambda g: g.itg == g.stg)
+
+# Her iki yarıda 1.5 alt/üst
+market("Her İki Yarıda da 1.5 Gol Alt Olur mu? :: Evet", lambda g: (g.itg < 1.5) & (g.stg < 1.5))
+market("Her İki Yarıda da 1.5 Gol Alt Olur mu? :: Hayır", lambda g: ~((g.itg < 1.5) & (g.stg < 1.5)))
+market("Her İki Yarıda da 1.5 Gol Üst Olur mu? :: Evet", lambda g: (g.itg >= 1.5) & (g.stg >= 1.5))
+market("Her İki Yarıda da 1.5 Gol Üst Olur mu? :: Hayır", lambda g: ~((g.itg >= 1.5) & (g.stg >= 1.5)))
+
+# KG
+market("Karşılıklı Gol :: KG Var", lambda g: g.kg_var)
+market("Karşılıklı Gol :: KG Yok", lambda g: ~g.kg_var)
+market("Karşılıklı Gol ve 2,5 Gol Alt/Üst :: 2,5 Alt ve KG Var", lambda g: (g.tg < 2.5) & g.kg_var)
+market("Karşılıklı Gol ve 2,5 Gol Alt/Üst :: 2,5 Alt ve KG Yok", lambda g: (g.tg < 2.5) & ~g.kg_var)
+market("Karşılıklı Gol ve 2,5 Gol Alt/Üst :: 2,5 Üst ve KG Var", lambda g: (g.tg >= 2.5) & g.kg_var)
+market("Karşılıklı Gol ve 2,5 Gol Alt/Üst :: 2,5 Üst ve KG Yok", lambda g: (g.tg >= 2.5) & ~g.kg_var)
+
+# Toplam gol
+_alt_ust("Toplam Gol Alt/Üst :: {s} {side}", _thr(0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5), lambda g: g.tg)
+market("Toplam Gol Aralığı :: 0-1 Gol", lambda g: g.tg <= 1)
+market("Toplam Gol Aralığı :: 2-3 Gol", lambda g: (g.tg >= 2) & (g.tg <= 3))
+market("Toplam Gol Aralığı :: 4-5 Gol", lambda g: (g.tg >= 4) & (g.tg <= 5))
+market("Toplam Gol Aralığı :: 6+ Gol", lambda g: g.tg >= 6)
+market("Toplam Gol Tek/Çift :: Tek", lambda g: g.tg % 2 == 1)
+market("Toplam Gol Tek/Çift :: Çift", lambda g: g.tg % 2 == 0)
+
+# Çifte Şans
+market("Çifte Şans :: ÇŞ 1-2", lambda g: g.hg != g.ag)
+market("Çifte Şans :: ÇŞ 1-X", lambda g: g.hg >= g.ag)
+market("Çifte Şans :: ÇŞ X-2", lambda g: g.ag >= g.hg)
+
+# 2. yarı KG & sonuç
+market("İkinci Yarı Karşılıklı Gol :: 2.Y KG Var", lambda g: (g.shg > 0) & (g.sag > 0))
+market("İkinci Yarı Karşılıklı Gol :: 2.Y KG Yok", lambda g: ~((g.shg > 0) & (g.sag > 0)))
+market("İkinci Yarı Sonucu :: 2.Y 1", lambda g: g.shg > g.sag)
+market("İkinci Yarı Sonucu :: 2.Y 2", lambda g: g.sag > g.shg)
+market("İkinci Yarı Sonucu :: 2.Y X", lambda g: g.sag == g.shg)
+
+# İlk yarı / maç sonucu
+for _iy, _iy_attr in (("1", "iy1"), ("2", "iy2"), ("X", "iyx")):
+    for _ms, _ms_attr in (("1", "ms1"), ("2", "ms2"), ("X", "msx")):
+        market(f"İlk Yarı / Maç Sonucu :: {_iy}/{_ms}",
+               lambda g, a=_iy_attr, b=_ms_attr: getattr(g, a) & getattr(g, b))
+
+# İlk yarı gol
+_alt_ust("İlk Yarı Gol Alt/Üst :: İY {s} {side}", _thr(0.5, 1.5, 2.5, 4.5), lambda g: g.itg)
+market("İlk Yarı Gol Tek/Çift :: İY Tek", lambda g: g.itg % 2 == 1)
+market("İlk Yarı Gol Tek/Çift :: İY Çift", lambda g: g.itg % 2 == 0)
+market("İlk Yarı Karşılıklı Gol :: İY KG Var", lambda g: g.iy_kg_var)
+market("İlk Yarı Karşılıklı Gol :: İY KG Yok", lambda g: ~g.iy_kg_var)
+
+# İlk yarı skoru
+IY_SCORES = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+for _h, _a in IY_SCORES:
+    market(f"İlk Yarı Skoru :: {_h}-{_a}", lambda g, h=_h, a=_a: (g.ihg == h) & (g.iag == a))
+market("İlk Yarı Skoru :: diğer",
+       lambda g: ~np.logical_or.reduce([(g.ihg == h) & (g.iag == a) for h, a in IY_SCORES]))
+
+# Maç skoru (tablolardaki "1:0" yazımı src/market_registry.py ile "1-0" etiketine düşer)
+MS_SCORES = [
+    (0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6),
+    (1, 0), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5), (1, 6),
+    (2, 0), (2, 1), (2, 2), (2, 3), (2, 4), (2, 5), (2, 6),
+    (3, 0), (3, 1), (3, 2), (3, 3), (3, 4), (3, 5),
+    (4, 0), (4, 1), (4, 2), (4, 3), (4, 4),
+    (5, 0), (5, 1), (5, 2), (5, 3), (5, 4),
+    (6, 0), (6, 1), (6, 2),
+]
+for _h, _a in MS_SCORES:
+    market(f"Maç Skoru :: {_h}-{_a}", lambda g, h=_h, a=_a: (g.hg == h) & (g.ag == a))
+market("Maç Skoru :: diğer",
+       lambda g: ~np.logical_or.reduce([(g.hg == h) & (g.ag == a) for h, a in MS_SCORES]))
+
+# Maç Sonucu + Alt/Üst
+for _v, _s in _thr(1.5, 2.5, 3.5, 4.5):
+    for _ms, _ms_attr in (("1", "ms1"), ("2", "ms2"), ("X", "msx")):
+        market(f"Maç Sonucu ve {_s} Gol Alt/Üst :: MS {_ms} ve {_s} Alt",
+               lambda g, v=_v, m=_ms_attr: getattr(g, m) & (g.tg < v))
+        market(f"Maç Sonucu ve {_s} Gol Alt/Üst :: MS {_ms} ve {_s} Üst",
+               lambda g, v=_v, m=_ms_attr: getattr(g, m) & (g.tg >= v))
+
+# Maç Sonucu + KG
+for _ms, _ms_attr in (("1", "ms1"), ("2", "ms2"), ("X", "msx")):
+    market(f"Maç Sonucu ve Karşılıklı Gol :: MS {_ms} ve Var", lambda g, m=_ms_attr: getattr(g, m) & g.kg_var)
+    market(f"Maç Sonucu ve Karşılıklı Gol :: MS {_ms} ve Yok", lambda g, m=_ms_attr: getattr(g, m) & ~g.kg_var)
+
+MARKET_LABELS = [label for label, _ in MARKETS]
+
+
+# ------------------------------ evaluation ----------------------------- #
+
+def neighbor_goals(goals, top_idx, n_valid):
+    """
+    (N_train, 4) gol matrisinden (GOAL_COLS sırası) komşu gollerini toplar.
+    Dönüş: (Goals, valid) — valid (N_test, K) geçerli komşu maskesi.
+    """
+    K = top_idx.shape[1]
+    valid = np.arange(K)[None, :] < np.asarray(n_valid)[:, None]
+    g = goals[np.where(valid, top_idx, 0)]
+    g[~valid] = np.nan
+    return Goals(hg=g[..., 0], ag=g[..., 1], ihg=g[..., 2], iag=g[..., 3]), valid
+
+
+@timing_logger("markets.counts", rows=len)
+def market_counts(goals, valid, markets=MARKETS):
+    """
+    Her test maçı ve her market için komşular arasında tutan maç sayısı.
+    Dönüş: (N_test, N_markets) int64 sayım matrisi.
+    """
+    counts = np.empty((valid.shape[0], len(markets)), dtype=np.int64)
+    for j, (_, predicate) in enumerate(markets):
+        counts[:, j] = (predicate(goals) & valid).sum(axis=1)
+    return counts
+
+
+def market_counts_by_k(goals, valid, ks, markets=MARKETS):
+    """
+    Komşu sırası bir kez hesaplanmışken birden çok K için sayımlar: komşu ekseninde
+    kümülatif toplam alınır, her K için (K-1). sütun okunur.
+    Dönüş: (len(ks), N_test, N_markets) int64 — ks[i] en yakın komşu içinde tutan maç sayısı.
+    """
+    cols = np.asarray(ks, dtype=np.int64) - 1
+    counts = np.empty((len(cols), valid.shape[0], len(markets)), dtype=np.int64)
+    for j, (_, predicate) in enumerate(markets):
+        counts[:, :, j] = np.cumsum(predicate(goals) & valid, axis=1)[:, cols].T
+    return counts
+
+
+def settle_markets(goals, markets=MARKETS):
+    """
+    Gerçek skorlara göre bahis sonuçları. goals: (N, 4) GOAL_COLS sırası.
+    Dönüş: (won, settled) — won (N, N_markets) bool, settled (N,) skoru tam olan satırlar.
+    """
+    g = np.asarray(goals, dtype=float)
+    settled = ~np.isnan(g).any(axis=1)
+    actual = Goals(hg=g[:, 0:1], ag=g[:, 1:2], ihg=g[:, 2:3], iag=g[:, 3:4])
+    return market_counts(actual, settled[:, None], markets).astype(bool), settled
+
+
+def market_odds(test_df, labels=MARKET_LABELS, registry=None):
+    """
+    Test maçlarının market oranları (N_test, N_markets). Alias sütunlar ("1:0" / "1-0")
+    market id'si üzerinden tek sütunda birleşir (MarketRegistry.coalesce); olmayanlar NaN.
+    """
+    return odds_matrix(test_df, labels, registry)
+
+
+@timing_logger("markets.value_bets", rows=len)
+def value_bet_rows(test_df, counts, odds, labels=MARKET_LABELS):
+    """
+    EV = olasılık(%) * oran / 100 > 0 olan (maç, market) çiftlerinden value bet tablosu üretir.
+    Satırlar maç sırası, ardından market sırasıyla gelir.
+    """
+    with np.errstate(invalid="ignore"):
+        ev = counts * odds / 100.0
+        ti, mi = np.nonzero(ev > 0.0)
+    return pd.DataFrame({
+        "match_date": test_df["match_date"].to_numpy()[ti],
+        "match_time": test_df["match_time"].to_numpy()[ti],
+        "match_id": test_df["match_id"].to_numpy()[ti],
+        "hometeam": test_df["homeTeam"].to_numpy()[ti],
+        "awayteam": test_df["awayTeam"].to_numpy()[ti],
+        "bet_name": np.asarray(labels, dtype=object)[mi],
+        "probability": counts[ti, mi].astype(float),
+        "odds": odds[ti, mi],
+    }, columns=VALUE_BET_COLS)
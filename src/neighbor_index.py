@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.distance import DEFAULT_BLOCK_MEM_MB, merge_topk, nan_euclidean_topk
+from src.market_registry import canonical_columns, odds_matrix
+
+GOAL_COLS = ["totalHomeGoal", "totalAwayGoal", "firstHalfHomeGoal", "firstHalfAwayGoal"]
+
+META_FILE = "meta.json"
+QUERY_CACHE_FILE = "query_cache.json"
+
+
+class NeighborIndex:
+    """
+    Skoru belli maçların oran matrisi üzerinde diskte tutulan komşu indeksi.
+
+    Veri ek-only segmentler halinde saklanır (seg_XXXXX_*.npy). Yeni skorlanan
+    maçlar yeni bir segment olarak eklenir; sorgu sonuçları anahtar (match_id)
+    bazında önbelleğe alınır ve sonraki sorgularda yalnızca yeni segmentler taranır.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.feature_cols = meta["feature_cols"]
+        self.segments = meta["segments"]
+        self._query_cache = self._load_query_cache()
+        self._offsets = np.cumsum([0] + [s["rows"] for s in self.segments])
+        self._features_digest = hashlib.blake2b(json.dumps(self.feature_cols).encode("utf-8"),
+                                                digest_size=16).digest()
+
+    # ----------------------------- build / append ----------------------------- #
+
+    @classmethod
+    def build(cls, df, feature_cols, index_dir):
+        """
+        Skoru belli satırlardan (totalHomeGoal dolu) yeni bir indeks oluşturur.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        meta = {"feature_cols": list(feature_cols), "segments": []}
+        cls._write_meta(index_dir, meta)
+        cache_path = os.path.join(index_dir, QUERY_CACHE_FILE)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        index = cls(index_dir)
+        index.append(df)
+        return index
+
+    @classmethod
+    def open_or_build(cls, index_dir, df, feature_cols):
+        if os.path.exists(os.path.join(index_dir, META_FILE)):
+            index = cls(index_dir)
+            if index.feature_cols == canonical_columns(index.feature_cols):
+                return index
+            # alias sütunları ayrı özellik olarak saklanmış eski indeks → kanonik özelliklerle yeniden
+            print(f"⚠️ İndeks alias oran sütunlarıyla kurulmuş, yeniden kuruluyor → {index_dir}")
+        return cls.build(df, feature_cols, index_dir)
+
+    @staticmethod
+    def _write_meta(index_dir, meta):
+        tmp_path = os.path.join(index_dir, META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(index_dir, META_FILE))
+
+    def _segment_path(self, name, part):
+        return os.path.join(self.index_dir, f"{name}_{part}.npy")
+
+    def match_ids(self):
+        ids = [np.load(self._segment_path(s["name"], "ids")) for s in self.segments]
+        return np.concatenate(ids) if ids else np.array([], dtype=str)
+
+    def append(self, df):
+        """
+        Skoru belli ve indekste olmayan satırları yeni bir segment olarak ekler.
+        Döndürür: eklenen satır sayısı.
+        """
+        scored = df[df["totalHomeGoal"].notna()]
+        existing = set(self.match_ids().tolist())
+        new = scored[~scored["match_id"].astype(str).isin(existing)]
+        new = new.drop_duplicates(subset="match_id")
+        if new.empty:
+            return 0
+
+        name = f"seg_{len(self.segments):05d}"
+        X = odds_matrix(new, self.feature_cols)
+        goals = new[GOAL_COLS].astype(float).to_numpy()
+        ids = new["match_id"].astype(str).to_numpy(dtype=str)
+        np.save(self._segment_path(name, "X"), X)
+        np.save(self._segment_path(name, "goals"), goals)
+        np.save(self._segment_path(name, "ids"), ids)
+
+        self.segments.append({"name": name, "rows": int(len(new))})
+        self._write_meta(self.index_dir, {"feature_cols": self.feature_cols, "segments": self.segments})
+        self._offsets = np.cumsum([0] + [s["rows"] for s in self.segments])
+        print(f"🧭 İndekse {len(new)} maç eklendi → {self.index_dir}")
+        return int(len(new))
+
+    # ------------------------------- access ---------------------------------- #
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def _segment_matrix(self, seg):
+        return np.load(self._segment_path(seg["name"], "X"), mmap_mode="r")
+
+    def goals(self, idx=None):
+        """
+        (N, 4) gol matrisi, sütunlar GOAL_COLS sırasında. idx verilirse yalnız o satırlar.
+        """
+        parts = [np.load(self._segment_path(s["name"], "goals")) for s in self.segments]
+        all_goals = np.concatenate(parts) if parts else np.empty((0, len(GOAL_COLS)))
+        return all_goals if idx is None else all_goals[idx]
+
+    def features(self, df):
+        """
+        DataFrame'i indeksin feature sütunlarına hizalayıp (X, X_nan) döner.
+        """
+        X = odds_matrix(df, self.feature_cols)
+        return X, np.isnan(X)
+
+    # ------------------------------- query ----------------------------------- #
+
+    def _load_query_cache(self):
+        path = os.path.join(self.index_dir, QUERY_CACHE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_query_cache(self):
+        path = os.path.join(self.index_dir, QUERY_CACHE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._query_cache, f)
+        os.replace(path + ".tmp", path)
+
+    def _vector_digest(self, x):
+        # Sorgu vektörü + feature listesi özeti; oranlar değişince önbellek kaydı geçersiz olur
+        x = np.where(np.isnan(x), np.nan, x)          # NaN bit desenleri tek tip
+        h = hashlib.blake2b(self._features_digest, digest_size=16)
+        h.update(np.ascontiguousarray(x, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def query(self, test_vec, k, key=None):
+        """
+        Tek test vektörü için en yakın k komşu: (idx, dist), uzaklığa göre sıralı.
+        """
+        X = np.asarray(test_vec, dtype=float).reshape(1, -1)
+        idx, dist, n_valid = self.query_many(X, k, keys=None if key is None else [key])
+        return idx[0, :n_valid[0]], dist[0, :n_valid[0]]
+
+    def query_many(self, X, k, keys=None, block_mem_mb=DEFAULT_BLOCK_MEM_MB):
+        """
+        Çok sayıda test satırı için top-k komşu: (idx, dist, n_valid).
+
+        keys verilirse (örn. match_id) sonuçlar önbelleğe yazılır; aynı anahtar aynı
+        vektörle tekrar sorgulandığında sadece son sorgudan sonra eklenen segmentler taranır
+        (oranları değişmiş maçın kaydı kullanılmaz, tüm segmentler yeniden taranır).
+        Önbellek değişiklikleri kalıcı olması için `save_query_cache()` çağrılmalıdır.
+        """
+        X = np.asarray(X, dtype=float)
+        X_nan = np.isnan(X)
+        n_test = X.shape[0]
+
+        best_idx = [np.empty(0, dtype=np.int64) for _ in range(n_test)]
+        best_dist = [np.empty(0) for _ in range(n_test)]
+        start_seg = np.zeros(n_test, dtype=np.int64)
+        digests = None
+        if keys is not None:
+            digests = [self._vector_digest(x) for x in X]
+            for i, key in enumerate(map(str, keys)):
+                hit = self._query_cache.get(key)
+                if hit and hit["k"] == k and hit.get("x") == digests[i]:
+                    start_seg[i] = hit["segments"]
+                    best_idx[i] = np.asarray(hit["idx"], dtype=np.int64)
+                    best_dist[i] = np.asarray(hit["dist"], dtype=float)
+
+        for s, seg in enumerate(self.segments):
+            rows = np.flatnonzero(start_seg <= s)
+            if len(rows) == 0:
+                continue
+            T = np.asarray(self._segment_matrix(seg))
+            seg_idx, seg_dist, seg_n = nan_euclidean_topk(
+                X[rows], X_nan[rows], T, np.isnan(T), k, block_mem_mb=block_mem_mb, return_dist=True
+            )
+            seg_idx += self._offsets[s]
+            for r, i in enumerate(rows):
+                n = seg_n[r]
+                best_idx[i], best_dist[i] = merge_topk(best_idx[i], best_dist[i], seg_idx[r, :n], seg_dist[r, :n], k)
+
+        idx_out = np.full((n_test, k), -1, dtype=np.int64)
+        dist_out = np.full((n_test, k), np.inf)
+        n_valid = np.zeros(n_test, dtype=np.int64)
+        for i in range(n_test):
+            n = len(best_idx[i])
+            idx_out[i, :n], dist_out[i, :n], n_valid[i] = best_idx[i], best_dist[i], n
+
+        if keys is not None:
+            for i, key in enumerate(map(str, keys)):
+                self._query_cache[key] = {
+                    "k": k,
+                    "x": digests[i],
+                    "segments": len(self.segments),
+                    "idx": best_idx[i].tolist(),
+                    "dist": best_dist[i].tolist(),
+                }
+        return idx_out, dist_out, n_valid
+
@@ -0,0 +1,135 @@
+"""
+Odds time-series store: every scrape is recorded, not just the first one seen.
+
+- Long format: (match_id, match_date, market, selection, odds, captured_at)
+- Delta encoding: a price is written only when it differs from the latest stored
+  price for the same (match_id, market, selection)
+- match_date-partitioned on disk (src/storage.py), so a scrape only reads the
+  partitions of the matches it touches
+- Queries: latest-as-of T, opening vs closing (last price before kickoff), and a
+  wide "Market :: Selection" frame in the same column layout as the master table
+"""
+
+import pandas as pd
+
+from src.score_scheduler import _now, kickoff_times
+from src.storage import append_data, load_data
+
+KEY = ["match_id", "market", "selection"]
+SNAPSHOT_COLS = ["match_id", "match_date", "market", "selection", "odds", "captured_at"]
+SEP = " :: "
+
+
+def to_long(rows, captured_at=None):
+    """
+    src.bilyoner_api._build_row çıktısı (geniş satırlar) → uzun format snapshot satırları.
+    Oran sütunları "Market :: Selection" adlı sütunlardır.
+    """
+    captured_at = pd.Timestamp(captured_at if captured_at is not None else _now())
+    wide = pd.DataFrame(list(rows))
+    if wide.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLS)
+    odd_cols = [c for c in wide.columns if SEP in c]
+    long = wide.melt(id_vars=["match_id", "match_date"], value_vars=odd_cols,
+                     var_name="label", value_name="odds")
+    long["odds"] = pd.to_numeric(long["odds"], errors="coerce")
+    long = long.dropna(subset=["odds"])
+    parts = long["label"].str.split(SEP, n=1, expand=True)
+    return pd.DataFrame({
+        "match_id": long["match_id"].astype("string"),
+        "match_date": long["match_date"],
+        "market": parts[0],
+        "selection": parts[1],
+        "odds": long["odds"].astype(float),
+        "captured_at": captured_at,
+    }).reset_index(drop=True)
+
+
+def _normalize(df):
+    df = df.reindex(columns=SNAPSHOT_COLS)
+    df["match_id"] = df["match_id"].astype("string")
+    df["odds"] = pd.to_numeric(df["odds"], errors="coerce")
+    df["captured_at"] = pd.to_datetime(df["captured_at"])
+    return df
+
+
+def latest(df, as_of=None):
+    """
+    Her (match_id, market, selection) için as_of anına kadar görülen son oran.
+    """
+    if as_of is not None:
+        df = df[df["captured_at"] <= pd.Timestamp(as_of)]
+    return (df.sort_values("captured_at", kind="stable")
+              .drop_duplicates(subset=KEY, keep="last")
+              .reset_index(drop=True))
+
+
+def to_wide(df, value="odds"):
+    """
+    Uzun snapshot tablosu → match_id başına tek satır, "Market :: Selection" sütunları
+    (ana tablo / predictor özellik matrisi ile aynı sütun düzeni). Bir seçimin birden fazla
+    snapshot'ı varsa son görülen oran alınır (latest); as_of için önce latest(df, as_of).
+    """
+    df = latest(df) if "captured_at" in df.columns else df.drop_duplicates(subset=KEY, keep="last")
+    labels = df["market"] + SEP + df["selection"]
+    wide = df.assign(label=labels).pivot(index="match_id", columns="label", values=value)
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+class SnapshotStore:
+    def __init__(self, root, method="auto"):
+        self.root = root
+        self.method = method
+
+    def load(self, match_ids=None, dates=None):
+        df = _normalize(load_data(self.root, columns=SNAPSHOT_COLS, dates=dates))
+        if match_ids is not None:
+            df = df[df["match_id"].isin(set(map(str, match_ids)))]
+        return df
+
+    def record(self, rows, captured_at=None):
+        """
+        Bir scrape turunun satırlarını ekler; son kayıtlı orandan farklı olmayan fiyatlar atlanır.
+        Döndürür: yazılan satır sayısı.
+        """
+        new = to_long(rows, captured_at)
+        if new.empty:
+            return 0
+        dates = new["match_date"].dropna().astype(str).unique().tolist()
+        prev = latest(self.load(match_ids=new["match_id"].unique(), dates=dates or None))
+
+        merged = new.merge(prev[KEY + ["odds"]], on=KEY, how="left", suffixes=("", "_prev"))
+        changed = merged["odds_prev"].isna() | (merged["odds"] != merged["odds_prev"])
+        delta = merged.loc[changed, SNAPSHOT_COLS]
+        append_data(delta, self.root, method=self.method)
+        return len(delta)
+
+    def as_of(self, as_of, match_ids=None, dates=None):
+        return latest(self.load(match_ids, dates), as_of)
+
+    def opening_closing(self, kickoffs=None, match_ids=None, dates=None):
+        """
+        Açılış (ilk görülen) ve kapanış (başlama saatinden önceki son) oranları.
+        kickoffs: match_id → başlama zamanı (kickoff_map); verilmezse son görülen oran kapanış sayılır.
+        """
+        df = self.load(match_ids, dates).sort_values("captured_at", kind="stable")
+        opening = df.drop_duplicates(subset=KEY, keep="first")
+
+        if kickoffs is not None:
+            kickoffs = pd.Series(kickoffs)
+            kickoffs.index = kickoffs.index.astype("string")
+            ko = df["match_id"].map(kickoffs)
+            df = df[ko.isna() | (df["captured_at"] <= ko)]
+        closing = df.drop_duplicates(subset=KEY, keep="last")
+
+        out = opening[KEY + ["odds", "captured_at"]].merge(
+            closing[KEY + ["odds", "captured_at"]], on=KEY, how="left", suffixes=("_open", "_close"))
+        out["move"] = out["odds_close"] / out["odds_open"] - 1.0
+        return out.reset_index(drop=True)
+
+
+def kickoff_map(df):
+    """Ana tablodan match_id → başlama zamanı (opening_closing için)."""
+    kickoffs = pd.Series(kickoff_times(df).to_numpy(), index=df["match_id"].astype("string"))
+    return kickoffs[~kickoffs.index.duplicated()]
@@ -0,0 +1,94 @@
+"""
+Process-parallel neighbour search + market counting for predict_gpt.py.
+
+- T, T_nan, the goal matrix and the masked matrices of prepare_train (MT, AT, AT²)
+  are written once as .npy files and opened by every worker with mmap_mode="r"
+  (shared page cache, no training DataFrame is pickled, no worker rebuilds MT/AT/AT²)
+- Only test-row chunks (X, X_nan slices) travel to the workers; each returns its
+  (rows, N_markets) count matrix
+- Chunks are stitched back in submission order, so value_bet_rows() sees exactly
+  the same count matrix as the serial path → byte-identical output
+"""
+
+import multiprocessing as mp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.distance import DEFAULT_BLOCK_MEM_MB, nan_euclidean_topk, prepare_train
+from src.markets import MARKETS, market_counts, neighbor_goals
+
+_SHARED = {}
+_ARRAYS = ("T", "T_nan", "goals", "MT", "AT", "AT2")
+PREPARE_BLOCK_ROWS = 50_000
+
+
+def _init_worker(shared_dir, k, block_mem_mb):
+    for name in _ARRAYS:
+        _SHARED[name] = np.load(os.path.join(shared_dir, f"{name}.npy"), mmap_mode="r")
+    _SHARED["k"] = k
+    _SHARED["block_mem_mb"] = block_mem_mb
+
+
+def _count_chunk(X, X_nan):
+    top_idx, n_valid = nan_euclidean_topk(X, X_nan, _SHARED["T"], _SHARED["T_nan"], _SHARED["k"],
+                                          block_mem_mb=_SHARED["block_mem_mb"],
+                                          prepared=(_SHARED["MT"], _SHARED["AT"], _SHARED["AT2"]))
+    goals, valid = neighbor_goals(_SHARED["goals"], top_idx, n_valid)
+    return market_counts(goals, valid)
+
+
+def _mp_context():
+    # fork: workers inherit the imported modules instead of re-importing the caller
+    return mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+
+
+def _save_prepared(shared_dir, T, T_nan, prepared=None):
+    # Hazır matrisler verilmediyse blok blok hesaplanıp doğrudan dosyaya yazılır
+    # (ana süreçte üç tam (N_train, D) kopya tutulmaz; prepare_train satır bazlı)
+    if prepared is not None:
+        for name, arr in zip(("MT", "AT", "AT2"), prepared):
+            np.save(os.path.join(shared_dir, f"{name}.npy"), np.ascontiguousarray(arr, dtype=float))
+        return
+    out = [np.lib.format.open_memmap(os.path.join(shared_dir, f"{name}.npy"), mode="w+",
+                                     dtype=np.float64, shape=T.shape) for name in ("MT", "AT", "AT2")]
+    for s in range(0, T.shape[0], PREPARE_BLOCK_ROWS):
+        rows = slice(s, s + PREPARE_BLOCK_ROWS)
+        for dst, part in zip(out, prepare_train(T[rows], T_nan[rows])):
+            dst[rows] = part
+    for dst in out:
+        dst.flush()
+    del out
+
+
+def parallel_market_counts(X, X_nan, T, T_nan, train_goals, k, workers=None, chunk_rows=None,
+                           block_mem_mb=DEFAULT_BLOCK_MEM_MB, prepared=None):
+    """
+    Seri yoldaki nan_euclidean_topk → neighbor_goals → market_counts zincirinin
+    süreç havuzlu karşılığı. Dönüş: (N_test, N_markets) int64 sayım matrisi.
+    prepared: prepare_train(T, T_nan) çıktısı elde varsa (yoksa bir kez, bloklar halinde hesaplanır).
+    """
+    workers = workers or os.cpu_count() or 1
+    n = X.shape[0]
+    chunk_rows = chunk_rows or max(1, -(-n // (workers * 4)))
+    starts = range(0, n, chunk_rows)
+
+    with tempfile.TemporaryDirectory(prefix="predict_shm_") as shared_dir:
+        np.save(os.path.join(shared_dir, "T.npy"), np.ascontiguousarray(T, dtype=float))
+        np.save(os.path.join(shared_dir, "T_nan.npy"), np.ascontiguousarray(T_nan, dtype=bool))
+        np.save(os.path.join(shared_dir, "goals.npy"), np.ascontiguousarray(train_goals, dtype=float))
+        _save_prepared(shared_dir, T, T_nan, prepared)
+
+        # each worker keeps its own block budget → split the total across them
+        per_worker_mb = max(1, block_mem_mb // workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                 initializer=_init_worker,
+                                 initargs=(shared_dir, k, per_worker_mb)) as ex:
+            futures = [ex.submit(_count_chunk, X[s:s + chunk_rows], X_nan[s:s + chunk_rows]) for s in starts]
+            chunks = [f.result() for f in futures]
+
+    if not chunks:
+        return np.empty((0, len(MARKETS)), dtype=np.int64)
+    return np.concatenate(chunks, axis=0)
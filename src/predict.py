@@ -0,0 +1,241 @@
+"""
+Nearest-neighbour value bets as a library (the model behind predict_gpt.py).
+
+- load_split() reads the table once, shuffles it and splits it into train
+  (scored) and test (unscored) frames; predict_gpt.py is a thin CLI around it
+- TrainSet holds the training matrices (T, T_nan, goal matrix) and is built once;
+  hand it to predict() again and again (backtest, notebook, service) and nothing
+  is re-parsed or rebuilt
+- predict(train, test, config) → {"value_bets", "by_prob", "by_bankroll"}: the
+  same rows predict_gpt.py writes to value_bets_*.csv
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.compact import expand_frame, load_compact
+from src.distance import nan_euclidean_topk, prepare_train
+from src.market_registry import canonical_columns, odds_matrix
+from src.markets import market_counts, market_odds, neighbor_goals, value_bet_rows
+from src.neighbor_index import GOAL_COLS, NeighborIndex
+from src.storage import read_table
+from src.utils import Timer
+from src.value_sink import ValueBetSink
+
+KEY_COLS = [
+    "match_date", "match_time", "tournament", "match_id",
+    "homeTeam", "awayTeam",
+    "firstHalfHomeGoal", "firstHalfAwayGoal",
+    "totalHomeGoal", "totalAwayGoal",
+    "homeCorner", "awayCorner"
+]
+DEFAULT_CONFIG = {
+    "top_k": 100,
+    "block_mem_mb": 256,        # distance motorunda test bloğu başına bellek bütçesi
+    "index_dir": None,          # kalıcı komşu indeksi (yalnızca yeni satırlar taranır)
+    "workers": 1,               # >1 → test parçaları süreç havuzunda (None = tüm çekirdekler)
+    "sink_chunk_rows": 256,     # çıktı parçası başına test maçı
+    "ann_nprobe": None,         # int → yaklaşık komşu arama (src/ann.py): test başına taranan IVF kovası
+    "ann_lists": None,          # IVF kova sayısı (None → ≈ √N_train / 4)
+    "ann_rank": 64,             # kovaların kurulduğu izdüşüm boyutu
+}
+
+
+def resolve_config(config=None):
+    """DEFAULT_CONFIG + verilen değerler; bilinmeyen anahtar ValueError."""
+    config = dict(config or {})
+    unknown = sorted(set(config) - set(DEFAULT_CONFIG))
+    if unknown:
+        raise ValueError(f"Bilinmeyen ayar(lar): {', '.join(unknown)}")
+    return {**DEFAULT_CONFIG, **config}
+
+
+def feature_columns(df):
+    """
+    Sayısal, anahtar olmayan sütunlar (oran sütunları) kanonik etiketleriyle: alias sütunlar
+    ("Maç Skoru :: 1:0" / "1-0") tek özellik olur (src/market_registry.py).
+    """
+    return canonical_columns(c for c in df.columns if c not in KEY_COLS and pd.api.types.is_numeric_dtype(df[c]))
+
+
+def feature_matrix(df, feature_cols):
+    """(N, D) float64 özellik matrisi; her özellik alias sütunlarından birleştirilir (odds_matrix)."""
+    return odds_matrix(df, feature_cols)
+
+
+def load_split(path, seed=None, compact=False):
+    """
+    Tabloyu okur, karıştırır ve (train_df, test_df, feature_cols) döner.
+    train: skoru belli maçlar, test: totalHomeGoal boş olan maçlar.
+    compact=True: float32 oranlar / kategorik takımlar (test satırları CSV tiplerine geri açılır).
+    """
+    with Timer("predict.load") as t:
+        df = load_compact(path) if compact else read_table(path)  # tek CSV ya da match_date bölümlü klasör
+        t.rows = len(df)
+    df = df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    feature_cols = feature_columns(df)
+
+    train_df = df[df["totalHomeGoal"].notna()].reset_index(drop=True)
+    test_df = df[df["totalHomeGoal"].isna()].reset_index(drop=True)
+    if compact:
+        test_df = expand_frame(test_df)  # küçük; çıktı satırları için CSV tiplerine geri
+    return train_df, test_df, feature_cols
+
+
+class TrainSet:
+    """
+    Skoru belli maçların matrisleri: T (N_train, D) float64, T_nan maskesi ve
+    (N_train, 4) gol matrisi (GOAL_COLS sırası). Bir kez kurulur, predict() tekrar kullanır;
+    append() yeni skorlanan maçları ekler (tamponlar büyüyerek, mevcut satırlar kopyalanmadan).
+    ann_index() yaklaşık arama indeksini bir kez kurar; append() onu da uzatır.
+    """
+
+    PREPARED = ("MT", "AT", "AT2")
+
+    def __init__(self, T, T_nan, goals, feature_cols, match_ids=None):
+        self._n = T.shape[0]
+        self._buf = {"T": T, "T_nan": T_nan, "goals": goals}
+        self.feature_cols = list(feature_cols)
+        self.match_ids = match_ids
+        self._ann = None          # ((n_lists, rank), IVFIndex)
+
+    @classmethod
+    def from_frame(cls, train_df, feature_cols=None):
+        feature_cols = feature_cols or feature_columns(train_df)
+        T = feature_matrix(train_df, feature_cols)
+        goals = train_df[GOAL_COLS].to_numpy(dtype=float)
+        return cls(T, np.isnan(T), goals, feature_cols, train_df["match_id"].astype(str).to_numpy())
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def T(self):
+        return self._buf["T"][:self._n]
+
+    @property
+    def T_nan(self):
+        return self._buf["T_nan"][:self._n]
+
+    @property
+    def goals(self):
+        return self._buf["goals"][:self._n]
+
+    def prepared(self):
+        """prepare_train(T, T_nan) çıktısı; ilk sorguda bir kez hesaplanır, append() ile uzar."""
+        if "MT" not in self._buf:
+            self._buf.update(zip(self.PREPARED, prepare_train(self.T, self.T_nan)))
+        return tuple(self._buf[name][:self._n] for name in self.PREPARED)
+
+    def ann_index(self, n_lists=None, rank=64):
+        """IVFIndex (src/ann.py); hazır matrisler zaten varsa örneği onlardan alır (yoksa gerekmez)."""
+        if self._ann is None or self._ann[0] != (n_lists, rank):
+            from src.ann import IVFIndex
+            prepared = self.prepared() if "MT" in self._buf else None
+            self._ann = ((n_lists, rank), IVFIndex.build(self.T, self.T_nan, n_lists=n_lists, rank=rank,
+                                                         prepared=prepared))
+        return self._ann[1]
+
+    def append(self, T, T_nan, goals, match_ids=None):
+        """Satır ekler (T sütunları feature_cols sırasında). Dönüş: eklenen satır sayısı."""
+        m = T.shape[0]
+        if m == 0:
+            return 0
+        rows = {"T": T, "T_nan": T_nan, "goals": goals}
+        if "MT" in self._buf:
+            rows.update(zip(self.PREPARED, prepare_train(T, T_nan)))
+        n, end = self._n, self._n + m
+        for name, new in rows.items():
+            buf = self._buf[name]
+            if end > buf.shape[0]:
+                grown = np.empty((max(end, int(buf.shape[0] * 1.25) + 1024),) + buf.shape[1:], dtype=buf.dtype)
+                grown[:n] = buf[:n]
+                self._buf[name] = buf = grown
+            buf[n:end] = new
+        self._n = end
+        if self._ann is not None:
+            self._ann[1].add(T, T_nan)
+        if self.match_ids is not None:
+            self.match_ids = np.concatenate([self.match_ids, np.asarray(match_ids, dtype=str)])
+        return m
+
+
+def _neighbor_counts(train, test_df, config, feature_cols=None):
+    """
+    Test satırları → chunk_counts(rows) fonksiyonu: (rows, N_markets) isabet sayıları;
+    karşılaştırılabilir train satırı olmayan maçlar 0 sayar.
+    """
+    k = config["top_k"]
+    if config["ann_nprobe"] and (config["index_dir"] or config["workers"] != 1):
+        raise ValueError("ann_nprobe, index_dir ve workers != 1 ile birlikte kullanılamaz.")
+    if config["index_dir"]:
+        if not isinstance(train, pd.DataFrame):
+            raise ValueError("index_dir için train DataFrame olarak verilmeli.")
+        index = NeighborIndex.open_or_build(config["index_dir"], train, feature_cols or feature_columns(train))
+        X_idx, _ = index.features(test_df)
+        top_idx, _, n_valid = index.query_many(
+            X_idx, k, keys=test_df["match_id"].astype(str), block_mem_mb=config["block_mem_mb"]
+        )
+        index.save_query_cache()
+        goals = index.goals()
+    else:
+        X = feature_matrix(test_df, train.feature_cols)
+        X_nan = np.isnan(X)
+        goals = train.goals
+        if config["workers"] != 1:
+            # T / T_nan / goals shared via memmap, test chunks fanned out, counts merged in order
+            from src.parallel_predict import parallel_market_counts
+            counts = parallel_market_counts(X, X_nan, train.T, train.T_nan, goals, k,
+                                            workers=config["workers"], block_mem_mb=config["block_mem_mb"],
+                                            prepared=train.prepared() if "MT" in train._buf else None)
+            return lambda rows: counts[rows]
+        if config["ann_nprobe"]:
+            index = train.ann_index(config["ann_lists"], config["ann_rank"])
+            top_idx, n_valid = index.search(X, X_nan, train.T, train.T_nan, k, nprobe=config["ann_nprobe"],
+                                            block_mem_mb=config["block_mem_mb"])
+        else:
+            top_idx, n_valid = nan_euclidean_topk(X, X_nan, train.T, train.T_nan, k,
+                                                  block_mem_mb=config["block_mem_mb"], prepared=train.prepared())
+
+    def chunk_counts(rows):
+        g, valid = neighbor_goals(goals, top_idx[rows], n_valid[rows])
+        return market_counts(g, valid)
+    return chunk_counts
+
+
+def predict(train, test, config=None, feature_cols=None, raw_path=None):
+    """
+    Value bet tahmini.
+      train: skoru belli maçlar — DataFrame ya da hazır TrainSet (yeniden kurulmaz)
+      test: tahmin edilecek maçlar (DataFrame; anahtar sütunlar + oranlar)
+      config: DEFAULT_CONFIG anahtarlarından istenenler
+      feature_cols: train DataFrame ise kullanılacak oran sütunları (verilmezse sayısal sütunları)
+      raw_path: verilirse ham value-bet satırları dosyaya parça parça yazılır (bellekte tutulmaz)
+    Dönüş: {"value_bets": ham satırlar (raw_path verildiyse None),
+            "by_prob": maç başına en olası, "by_bankroll": maç başına en iyi beklenen bankroll}
+    """
+    config = resolve_config(config)
+    if len(test) == 0:
+        raise RuntimeError("Test set is empty. No rows with missing totalHomeGoal/totalAwayGoal.")
+    if not isinstance(train, TrainSet) and config["index_dir"] is None:
+        train = TrainSet.from_frame(train, feature_cols)
+    chunk_counts = _neighbor_counts(train, test, config, feature_cols)
+
+    # value bet'ler akış halinde: ham satırlar + maç başına en iyiler, her seferinde bir parça maç
+    sink = ValueBetSink(raw_path)
+    step = config["sink_chunk_rows"]
+    for start in range(0, len(test), step):
+        rows = slice(start, start + step)
+        chunk_df = test.iloc[rows]
+        sink.add(value_bet_rows(chunk_df, chunk_counts(rows), market_odds(chunk_df)))
+    by_prob, by_bankroll = sink.close()
+    return {"value_bets": None if raw_path else sink.raw_frame(), "by_prob": by_prob, "by_bankroll": by_bankroll}
+
+
+def save_predictions(result, out_prefix):
+    """predict() çıktısı → value_bets[_by_prob|_by_bankroll]_{out_prefix}.csv (tarih sıralı)."""
+    with Timer("output.write", rows=len(result["by_prob"]) + len(result["by_bankroll"])):
+        if result["value_bets"] is not None:
+            result["value_bets"].to_csv(f"value_bets_{out_prefix}.csv", index=False)
+        result["by_prob"].to_csv(f"value_bets_by_prob_{out_prefix}.csv", index=False)
+        result["by_bankroll"].to_csv(f"value_bets_by_bankroll_{out_prefix}.csv", index=False)
@@ -0,0 +1,370 @@
+"""
+Long-running prediction service: the training matrix stays in memory between requests.
+
+- Start-up does the cold part once (read, shuffle, split, TrainSet + prepared
+  distance matrices); a request only runs the neighbour search for the asked
+  match_ids against the hot matrices
+- Incremental reload: a watcher checks the data signature (file size/mtime, or
+  per-partition part files); on a change only match_id + goal columns are read
+  (or only the changed date partitions), newly scored matches move from the
+  test set into the TrainSet (append, no rebuild) and only the rows of new
+  matches are parsed and added; new odds columns need a full reload (POST /reload?full=1)
+- HTTP on localhost or on a Unix socket (stdlib http.server, no extra deps):
+    GET  /predict?match_id=1&match_id=2   (no id → every unscored match)
+    POST /predict  {"match_ids": [...]}
+    GET  /stats    request count, p50 / p99 latency, table sizes
+    POST /reload   (?full=1 → full reload)
+  Responses carry the value_bets / by_prob / by_bankroll rows predict_gpt.py
+  writes, plus this request's latency and the running p50 / p99
+
+Usage:
+    python -m src.predict_service --data data/processed/match_odds_cleaned_20250801.csv --port 8765
+    python -m src.predict_service --data data/processed/odds --socket /tmp/predict.sock
+    curl --unix-socket /tmp/predict.sock "http://localhost/predict?match_id=123"
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.neighbor_index import GOAL_COLS
+from src.predict import TrainSet, feature_matrix, load_split, predict, resolve_config
+from src.storage import file_signature, is_dataset, load_data, partition_signatures
+from src.utils import Timer
+
+LATENCY_WINDOW = 10_000       # p50 / p99 son bu kadar istek üzerinden
+REFRESH_INTERVAL = 10.0       # saniye; veri imzası kontrol aralığı
+FRAMES = ("value_bets", "by_prob", "by_bankroll")
+
+
+class LatencyStats:
+    """Son `window` isteğin süreleri (ms) → p50 / p99."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._ms = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, ms):
+        with self._lock:
+            self._ms.append(ms)
+            self.count += 1
+
+    def percentiles(self):
+        with self._lock:
+            if not self._ms:
+                return {"p50_ms": None, "p99_ms": None}
+            p50, p99 = np.percentile(np.fromiter(self._ms, dtype=float), [50, 99])
+        return {"p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+
+
+class PredictionService:
+    """
+    Tahmin durumu: TrainSet (sıcak), skoru henüz belli olmayan maçlar (test_df) ve veri imzası.
+    predict_ids() ve refresh() aynı kilidi kullanır; okuma/ayrıştırma kilit dışında yapılır.
+    """
+
+    def __init__(self, data_path, config=None, seed=None, compact=False):
+        config = resolve_config(config)
+        if config["index_dir"] or config["workers"] != 1:
+            raise ValueError("Servis tek süreçli, bellekteki TrainSet ile çalışır (index_dir / workers kullanılamaz).")
+        self.data_path = data_path
+        self.config = config
+        self.seed = seed
+        self.compact = compact
+        self.latency = LatencyStats()
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()     # watcher ile POST /reload aynı anda çalışmasın
+        self.reload(full=True)
+
+    # ------------------------------- state ----------------------------------- #
+
+    def _signature(self):
+        if is_dataset(self.data_path):
+            return partition_signatures(self.data_path)
+        return file_signature([self.data_path])
+
+    def reload(self, full=False):
+        """full=True: tablo baştan okunur (yeni oran sütunları da dahil olur); aksi halde refresh()."""
+        if not full:
+            return self.refresh()
+        with self._refresh_lock, Timer("service.load"):
+            signature = self._signature()
+            train_df, test_df, feature_cols = load_split(self.data_path, seed=self.seed, compact=self.compact)
+            train = TrainSet.from_frame(train_df, feature_cols)
+            if self.config["ann_nprobe"]:
+                train.ann_index(self.config["ann_lists"], self.config["ann_rank"])
+            else:
+                train.prepared()
+        with self._lock:
+            self.train, self.loaded_at = train, time.time()
+            self._set_test(test_df)
+            self._sig = signature
+        print(f"🔥 Servis hazır: {len(train):,} skorlu maç, {len(test_df):,} tahmin edilecek maç")
+        return {"moved": 0, "added_train": len(train), "added_test": len(test_df)}
+
+    def _set_test(self, test_df):
+        # copy(): sütun başına ayrı blok yerine tek blok → istek başına satır seçimi ucuz
+        self.test_df = test_df.reset_index(drop=True).copy()
+        self._test_key = self.test_df["match_id"].astype(str)
+
+    def _changes(self, signature):
+        """(anahtar/skor tablosu, id kümesi → tam satırlar) — yalnızca değişen kısım okunur."""
+        if is_dataset(self.data_path):
+            dates = [d for d, sig in signature.items() if self._sig.get(d) != sig]
+            rows = load_data(self.data_path, dates=dates)
+            if rows.empty:
+                return None, None
+            key = rows["match_id"].astype(str)
+            return rows[["match_id"] + GOAL_COLS].assign(match_id=key), lambda ids: rows[key.isin(ids)]
+
+        keys = pd.read_csv(self.data_path, usecols=["match_id"] + GOAL_COLS, dtype={"match_id": "string"})
+        keys = keys.assign(match_id=keys["match_id"].astype(str))
+
+        def full_rows(ids):
+            # yalnızca istenen satırlar ayrıştırılır (satır numaraları anahtar tablosundan)
+            wanted = set(np.flatnonzero(keys["match_id"].isin(ids).to_numpy()) + 1)
+            return pd.read_csv(self.data_path, skiprows=lambda i: i > 0 and i not in wanted)
+        return keys, full_rows
+
+    def refresh(self):
+        """
+        Veri değiştiyse artımlı güncelleme: skoru gelen test maçları TrainSet'e taşınır,
+        tabloya yeni eklenen maçlar (skorlu → TrainSet, skorsuz → test) eklenir.
+        Dönüş: {"moved", "added_train", "added_test"} ya da değişiklik yoksa None.
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        signature = self._signature()
+        if signature == self._sig:
+            return None
+        with Timer("service.refresh") as t:
+            keys, full_rows = self._changes(signature)
+            stats = {"moved": 0, "added_train": 0, "added_test": 0}
+            if keys is None:
+                self._sig = signature
+                return stats
+            keys = keys.drop_duplicates(subset="match_id", keep="last").set_index("match_id")
+            scored = keys.index[keys["totalHomeGoal"].notna()]
+
+            with self._lock:
+                known = set(self.train.match_ids.tolist()) | set(self._test_key)
+                test_df, test_key = self.test_df, self._test_key
+            new_ids = set(keys.index) - known
+            new_rows = full_rows(new_ids) if new_ids else test_df.iloc[:0]
+            test_df, new_rows = _align_match_ids(test_df, new_rows)
+
+            # skoru gelen test maçları: oranlar zaten bellekte, yalnızca goller eklenir
+            moved_mask = test_key.isin(scored)
+            moved = test_df[moved_mask.to_numpy()].copy()
+            for c in GOAL_COLS:
+                moved[c] = keys.loc[moved["match_id"].astype(str), c].to_numpy()
+            new_scored = new_rows["totalHomeGoal"].notna().to_numpy()
+            to_train = pd.concat([moved, new_rows[new_scored]], ignore_index=True)
+            rest = test_df[~moved_mask.to_numpy()]
+            to_test = pd.concat([rest, new_rows[~new_scored]], ignore_index=True) if (~new_scored).any() else rest
+
+            T = feature_matrix(to_train, self.train.feature_cols)
+            with self._lock:
+                self.train.append(T, np.isnan(T), to_train[GOAL_COLS].to_numpy(dtype=float),
+                                  to_train["match_id"].astype(str).to_numpy())
+                self._set_test(to_test)
+                self._sig = signature
+            stats = {"moved": int(moved_mask.sum()), "added_train": int(new_scored.sum()),
+                     "added_test": int((~new_scored).sum())}
+            t.rows = len(to_train) + stats["added_test"]
+        print(f"🔄 Yenilendi: {stats['moved']} maç skorlandı, {stats['added_train']} skorlu / "
+              f"{stats['added_test']} yeni maç eklendi")
+        return stats
+
+    # ------------------------------- predict --------------------------------- #
+
+    def predict_ids(self, match_ids=None):
+        """
+        match_ids (None → tüm test maçları) için predict_gpt.py satırları.
+        Dönüş: {"value_bets", "by_prob", "by_bankroll"} DataFrame'leri + bulunmayan id'ler.
+        """
+        with self._lock:
+            if match_ids is None:
+                rows = self.test_df
+                missing = []
+            else:
+                wanted = list(dict.fromkeys(map(str, match_ids)))
+                mask = self._test_key.isin(wanted).to_numpy()
+                rows = self.test_df[mask]
+                missing = sorted(set(wanted) - set(self._test_key[mask]))
+            if rows.empty:
+                result = {name: pd.DataFrame() for name in FRAMES}
+            else:
+                result = predict(self.train, rows, self.config)
+        return result, missing
+
+    def stats(self):
+        with self._lock:
+            out = {"requests": self.latency.count, **self.latency.percentiles(),
+                   "train_rows": len(self.train), "test_rows": len(self.test_df),
+                   "features": len(self.train.feature_cols), "loaded_at": self.loaded_at}
+        return out
+
+    def watch(self, interval=REFRESH_INTERVAL):
+        """Arka planda veri imzasını kontrol eden thread (daemon)."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️ Yenileme başarısız: {e}")
+        thread = threading.Thread(target=loop, name="predict-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+def _align_match_ids(resident, new_rows):
+    """
+    Yeni satırlar yalnızca kendi alt kümeleriyle okunduğundan match_id tipi (ör. int64) bellektekinden
+    farklı olabilir; tablo baştan okunsa ikisi de str olurdu → tipler uyuşmazsa iki taraf da str.
+    """
+    if new_rows.empty or resident["match_id"].dtype == new_rows["match_id"].dtype:
+        return resident, new_rows
+    return (resident.assign(match_id=resident["match_id"].astype(str)),
+            new_rows.assign(match_id=new_rows["match_id"].astype(str)))
+
+
+# -------------------------------- HTTP --------------------------------------- #
+
+def _frame_json(df):
+    return df.to_json(orient="records", force_ascii=False) if not df.empty else "[]"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+    quiet = False
+
+    def address_string(self):
+        # Unix soketinde client_address boş string
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, extra_headers=()):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False))
+
+    def _predict(self, match_ids):
+        t0 = time.perf_counter()
+        result, missing = self.service.predict_ids(match_ids)
+        parts = [f'"{name}": {_frame_json(result[name])}' for name in FRAMES]
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.service.latency.record(ms)
+        head = {"missing": missing, "latency_ms": round(ms, 3), **self.service.latency.percentiles()}
+        body = json.dumps(head, ensure_ascii=False)[:-1] + ", " + ", ".join(parts) + "}"
+        self._send(200, body, [("X-Latency-Ms", f"{ms:.3f}")])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/predict":
+            ids = query.get("match_id", []) + [i for v in query.get("match_ids", []) for i in v.split(",") if i]
+            return self._predict(ids or None)
+        if url.path == "/stats":
+            return self._send(200, json.dumps(self.service.stats()))
+        if url.path == "/health":
+            return self._send(200, '{"ok": true}')
+        self._error(404, f"unknown path: {url.path}")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._error(400, "body is not valid JSON")
+        if url.path == "/predict":
+            ids = payload.get("match_ids")
+            if ids is not None and not isinstance(ids, list):
+                return self._error(400, "match_ids must be a list")
+            return self._predict(ids)
+        if url.path == "/reload":
+            full = parse_qs(url.query).get("full", ["0"])[0] in ("1", "true") or bool(payload.get("full"))
+            return self._send(200, json.dumps({"reload": self.service.reload(full=full)}))
+        self._error(404, f"unknown path: {url.path}")
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None, quiet=False):
+    """HTTP sunucusu (TCP ya da socket_path verilirse Unix soketi); serve_forever() ile çalıştırılır."""
+    handler = type("PredictHandler", (_Handler,), {"service": service, "quiet": quiet})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction daemon: keeps the training matrix hot.")
+    parser.add_argument("--data", default="data/processed/match_odds_cleaned_20250801.csv",
+                        help="Single CSV or match_date-partitioned dataset dir.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Serve on this Unix socket instead of TCP.")
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--block-mem-mb", type=int, default=256)
+    parser.add_argument("--ann-nprobe", type=int, default=None,
+                        help="Approximate neighbour search: IVF buckets scanned per match (see src/ann.py).")
+    parser.add_argument("--ann-lists", type=int, default=None, help="IVF buckets (default ≈ sqrt(N_train) / 4).")
+    parser.add_argument("--ann-rank", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=None, help="Shuffle seed (same as predict_gpt.py --seed).")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--refresh-interval", type=float, default=REFRESH_INTERVAL,
+                        help="Seconds between data change checks (0 = only POST /reload).")
+    parser.add_argument("--quiet", action="store_true", help="No per-request access log.")
+    args = parser.parse_args(argv)
+
+    service = PredictionService(args.data, {"top_k": args.top_k, "block_mem_mb": args.block_mem_mb,
+                                            "ann_nprobe": args.ann_nprobe, "ann_lists": args.ann_lists,
+                                            "ann_rank": args.ann_rank},
+                                seed=args.seed, compact=args.compact)
+    if args.refresh_interval > 0:
+        service.watch(args.refresh_interval)
+    server = make_server(service, args.host, args.port, socket_path=args.socket, quiet=args.quiet)
+    print(f"🛰️ Dinleniyor → {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,18 @@
+import re
+
+import numpy as np
 import pandas as pd
 
+from src.market_registry import MarketRegistry, canonical_label
+
+SEP = " :: "
+LONG_ID_COLS = ["match_id", "match_date", "match_time", "homeTeam", "awayTeam"]
+
+# seçenekleri örtüşen marketler: adil olasılıkların toplamı 1 değil
+MARKET_GROUP_TOTALS = {"Çifte Şans": 2.0}
+_LINE_RE = re.compile(r"\d+,\d+")
+
+
 def calculate_ev(probability, odds):
     """
     Beklenen Değer (EV) = (olasılık * oran) - (1 - olasılık)
@@ -21,16 +34,108 @@ def run_value_analysis(df, target_columns):
     """
     Verilen oran sütunları için implied probability, EV ve value bet etiketi hesaplar.
     target_columns: Örn. ["Maç Sonucu :: MS 1", "Maç Sonucu :: MS 2", "Maç Sonucu :: MS X"]
+    calculate_ev / implied_probability ile aynı değerler, sütun bazında vektörel.
     """
     for col in target_columns:
         ev_col = f"EV :: {col}"
         prob_col = f"Implied Prob :: {col}"
         is_value_col = f"is_value :: {col}"
 
-        df[prob_col] = df[col].apply(implied_probability)
-        df[ev_col] = df.apply(lambda row: calculate_ev(row[prob_col], row[col]), axis=1)
+        odds = pd.to_numeric(df[col], errors="coerce").replace(0, np.nan)
+        df[prob_col] = (1 / odds).round(4)
+        df[ev_col] = ((df[prob_col] * odds) - (1 - df[prob_col])).round(4)
         df[is_value_col] = df[ev_col] > 0
 
         print(f"📊 Value analizi işlendi: {col}")
 
     return df
+
+def odds_columns(df):
+    """Tablodaki tüm "Market :: Selection" oran sütunları."""
+    return [c for c in df.columns if SEP in str(c)]
+
+def market_group(label):
+    """
+    De-vig (marj temizleme) grubu: market adı + varsa Alt/Üst çizgisi.
+    Örn. "Toplam Gol Alt/Üst :: 2,5 Alt" → "Toplam Gol Alt/Üst :: 2,5"
+    """
+    market, selection = label.split(SEP, 1)
+    line = _LINE_RE.search(selection) if "Alt/Üst" in market else None
+    return f"{market}{SEP}{line.group(0)}" if line else market
+
+def run_value_analysis_by_market(df, target_columns=None, probabilities=None, id_cols=LONG_ID_COLS,
+                                 registry=None):
+    """
+    Tüm marketler için tek seferde (NumPy dizileriyle) value analizi — D2/D3.
+
+    - implied_prob = 1 / oran
+    - overround    = market grubundaki implied olasılıkların toplamı / grubun beklenen toplamı
+    - fair_prob    = implied_prob / overround (grubun tüm seçenekleri fiyatlıysa, yoksa NaN);
+                     target_columns bir grubun yalnız bir kısmını içerse de tamlık ve toplam,
+                     grubun tabloda bulunan tüm sütunlarıyla hesaplanır
+    - probability  = `probabilities` (N, C) verilirse model olasılığı (0-1), yoksa fair_prob
+    - EV           = probability * oran - 1 (birim bahis başına beklenen kâr)
+
+    registry: src/market_registry.py MarketRegistry (verilmezse geçici bir tane);
+    alias sütunlar ("Maç Skoru :: 1:0" / "1-0") aynı market id'sine düşer.
+
+    Dönüş: oranı olan her (maç, seçenek) için bir satır (uzun format).
+    """
+    cols = list(target_columns) if target_columns is not None else odds_columns(df)
+    n_out = len(cols)
+    if target_columns is not None:
+        # kısmi grup (örn. yalnız MS 1 / MS X) eksik toplamla de-vig edilmesin: kardeş sütunlar eklenir
+        wanted = {market_group(canonical_label(c)) for c in cols}
+        chosen = set(cols)
+        cols += [c for c in odds_columns(df) if c not in chosen and market_group(canonical_label(c)) in wanted]
+    odds = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, copy=True)
+    odds[odds <= 0] = np.nan
+    implied = 1.0 / odds
+
+    # alias sütunlar (1-0 / 1:0) tek seçenek: satır başına ilk dolu değer
+    registry = registry if registry is not None else MarketRegistry()
+    canon_codes, canon_ids = pd.factorize(registry.ids(cols))
+    canon_labels = [registry.label(i) for i in canon_ids]
+    implied_canon = np.full((len(df), len(canon_labels)), np.nan)
+    for j in range(len(cols)):
+        c = canon_codes[j]
+        implied_canon[:, c] = np.where(np.isnan(implied_canon[:, c]), implied[:, j], implied_canon[:, c])
+
+    groups = [market_group(c) for c in canon_labels]
+    group_codes, group_labels = pd.factorize(pd.Index(groups))
+    onehot = np.zeros((len(canon_labels), len(group_labels)))
+    onehot[np.arange(len(canon_labels)), group_codes] = 1.0
+
+    priced = ~np.isnan(implied_canon)
+    group_sum = np.nan_to_num(implied_canon) @ onehot                 # (N, G)
+    complete = (priced.astype(float) @ onehot) == onehot.sum(axis=0)  # (N, G)
+    totals = np.array([MARKET_GROUP_TOTALS.get(g.split(SEP, 1)[0], 1.0) for g in group_labels])
+    overround = np.where(complete, group_sum / totals, np.nan)
+
+    col_group = group_codes[canon_codes]
+    # çıktı yalnız istenen sütunlar için (kardeşler sadece grup toplamına girer)
+    cols, odds, implied = cols[:n_out], odds[:, :n_out], implied[:, :n_out]
+    overround_cols = overround[:, col_group[:n_out]]
+    fair = implied / overround_cols
+
+    prob = fair if probabilities is None else np.asarray(probabilities, dtype=float)
+    ev = prob * odds - 1.0
+
+    ti, ci = np.nonzero(~np.isnan(odds))
+    out = {c: df[c].to_numpy()[ti] for c in id_cols if c in df.columns}
+    # etiketler kategorik: uzun tabloda her satır için string kopyası yok
+    out.update({
+        "market": pd.Categorical([c.split(SEP, 1)[0] for c in cols])[ci],
+        "selection": pd.Categorical([c.split(SEP, 1)[1] for c in cols])[ci],
+        "bet_name": pd.Categorical.from_codes(ci, categories=pd.Index(cols)),
+        "odds": odds[ti, ci],
+        "implied_prob": implied[ti, ci],
+        "overround": overround_cols[ti, ci],
+        "fair_prob": fair[ti, ci],
+        "probability": prob[ti, ci],
+        "EV": ev[ti, ci],
+    })
+    result = pd.DataFrame(out)
+    result["is_value"] = result["EV"] > 0
+    print(f"📊 Value analizi işlendi: {len(cols)} seçenek, {len(group_labels)} market grubu")
+    return result
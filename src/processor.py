@@ -2,12 +2,19 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from src.profiler import ColumnProfile, profile_frame
+from src.utils import Timer, timing_logger
+
+MS_COLS = ["Maç Sonucu :: MS 1", "Maç Sonucu :: MS 2", "Maç Sonucu :: MS X"]
+CHUNK_ROWS = 50_000
+
+@timing_logger("processor.filter_ms", rows=len)
 def filter_missing_ms(df, snapshot_dir="data/processed/"):
     """
     'Maç Sonucu :: MS 1', 'MS 2', 'MS X' oranlarının tamamı NaN olan maçları siler.
     Geri kalanları snapshot olarak kaydeder.
     """
-    required_cols = ["Maç Sonucu :: MS 1", "Maç Sonucu :: MS 2", "Maç Sonucu :: MS X"]
+    required_cols = MS_COLS
 
     for col in required_cols:
         if col not in df.columns:
@@ -28,36 +35,37 @@ def filter_missing_ms(df, snapshot_dir="data/processed/"):
 
     return filtered_df
 
-def detect_useless_columns(df, threshold_null=0.99, threshold_unique=1):
+@timing_logger("processor.detect_useless")
+def detect_useless_columns(df, threshold_null=0.99, threshold_unique=1, profile=None):
     """
     Yüksek oranda null olan veya tüm satırlarda aynı değeri içeren sütunları tespit eder.
     threshold_null: % olarak null oranı sınırı (0.99 = %99 ve üzeri null ise "gereksiz")
     threshold_unique: benzersiz değer sayısı (1 = sabit sütun)
+    profile: src/profiler.py çıktısı (ör. profile_table ile önbellekten); verilmezse
+    tüm sütunlar tek vektörel geçişte profillenir. df=None ise profildeki tüm sütunlar.
     """
-    total_rows = len(df)
-    report = []
-
-    for col in df.columns:
-        null_ratio = df[col].isna().mean()
-        unique_count = df[col].nunique(dropna=True)
-
-        if null_ratio >= threshold_null or unique_count <= threshold_unique:
-            report.append({
-                "column": col,
-                "null_ratio": round(null_ratio, 4),
-                "unique_count": unique_count
-            })
-
-    useless_df = pd.DataFrame(report)
+    if profile is None:
+        profile = profile_frame(df).to_frame()
+    if df is not None:
+        profile = profile[profile["column"].isin(df.columns)]
+
+    useless = profile[(profile["null_ratio"] >= threshold_null) | (profile["distinct"] <= threshold_unique)]
+    useless_df = pd.DataFrame({
+        "column": useless["column"].tolist(),
+        "null_ratio": useless["null_ratio"].round(4).tolist(),
+        "unique_count": useless["distinct"].tolist(),
+    }, columns=["column", "null_ratio", "unique_count"])
     useless_df.sort_values(by="null_ratio", ascending=False, inplace=True)
 
     print(f"🔍 Tespit edilen gereksiz/sabit sütun sayısı: {len(useless_df)}")
     return useless_df
 
+@timing_logger("processor.nullify", rows=len)
 def nullify_empty_markets(df, useless_df, threshold=0.95):
     """
     Sütun büyük oranda NaN ama tamamen boş değilse, veri olmayan hücreleri NaN yapar.
     Sütun kalır, ama hücreler temizlenmiş olur.
+    Sayısal sütunlarda boş hücre zaten NaN: yalnızca metin sütunları yeniden yazılır.
     """
     columns_to_nullify = useless_df[
         (useless_df["null_ratio"] >= threshold) &
@@ -65,11 +73,13 @@ def nullify_empty_markets(df, useless_df, threshold=0.95):
     ]["column"].tolist()
 
     for col in columns_to_nullify:
-        df[col] = df[col].where(df[col].notna(), None)
+        if col in df.columns and df[col].dtype == object and df[col].isna().any():
+            df[col] = df[col].where(df[col].notna(), None)
 
     print(f"🧽 Hücresel temizleme yapıldı: {len(columns_to_nullify)} sütun")
     return df
 
+@timing_logger("processor.drop_useless", rows=len)
 def drop_useless_columns(df, useless_df, threshold=0.99):
     """
     Sütun %99+ NaN ise veya sadece tek bir unique değer taşıyorsa sütunu tamamen siler.
@@ -83,14 +93,56 @@ def drop_useless_columns(df, useless_df, threshold=0.99):
     print(f"🚹 Tamamen silinen sütun sayısı: {len(columns_to_drop)}")
     return df_cleaned
 
-if __name__ == "__main__":
-    df = pd.read_csv("data/processed/match_odds_wide_20250801.csv")
-    df = filter_missing_ms(df)
-    useless = detect_useless_columns(df)
-    df = nullify_empty_markets(df, useless)
-    df = drop_useless_columns(df, useless)
+def clean_csv_chunked(input_path, output_path=None, snapshot_dir="data/processed/", chunksize=CHUNK_ROWS,
+                      threshold_null=0.99, threshold_unique=1):
+    """
+    filter_missing_ms → detect_useless_columns → drop_useless_columns adımlarının
+    satır parçalarıyla çalışan hali; bellek kullanımı parça boyutuyla sınırlı.
+      1. geçiş: MS oranı olan satırların sütun profili (atılacak sütunlar buradan)
+      2. geçiş: filtrelenmiş snapshot ve temizlenmiş çıktı birlikte yazılır
+    2. geçişte hücreler metin olarak okunup aynen yazılır (sayı biçimleri değişmez).
+    nullify_empty_markets'in CSV çıktısına etkisi yok (boş hücre yine boş yazılır).
+    """
+    header = pd.read_csv(input_path, nrows=0).columns
+    for col in MS_COLS:
+        if col not in header:
+            raise ValueError(f"'{col}' kolonu bulunamadı.")
 
+    # 1. geçiş: profil
+    profile, before = ColumnProfile.empty(header), 0
+    with Timer("processor.profile_pass") as t:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            before += len(chunk)
+            profile = profile.merge(profile_frame(chunk.dropna(subset=MS_COLS, how="all")))
+        t.rows = before
+    useless = detect_useless_columns(None, threshold_null=threshold_null, threshold_unique=threshold_unique,
+                                     profile=profile.to_frame())
+    columns_to_drop = set(useless[(useless["null_ratio"] >= threshold_null) |
+                                  (useless["unique_count"] <= 1)]["column"])
+    keep = [c for c in header if c not in columns_to_drop]
+
+    # 2. geçiş: snapshot + temiz çıktı
     today = datetime.today().strftime("%Y%m%d")
-    output_path = f"data/processed/match_odds_cleaned_{today}.csv"
-    df.to_csv(output_path, index=False)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    snapshot_path = os.path.join(snapshot_dir, f"match_odds_filtered_ms_{today}.csv")
+    output_path = output_path or f"data/processed/match_odds_cleaned_{today}.csv"
+    first = True
+    with Timer("processor.write_pass", rows=profile.rows):
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=str):
+            chunk = chunk.dropna(subset=MS_COLS, how="all")
+            if chunk.empty and not first:
+                continue
+            mode = "w" if first else "a"
+            chunk.to_csv(snapshot_path, index=False, header=first, mode=mode)
+            chunk[keep].to_csv(output_path, index=False, header=first, mode=mode)
+            first = False
+
+    print(f"✅ MS oranı olmayan {before - profile.rows} maç silindi. Kalan: {profile.rows}")
+    print(f"📆 Kaydedildi: {snapshot_path}")
+    print(f"🚹 Tamamen silinen sütun sayısı: {len(columns_to_drop)}")
     print(f"📅 Temizlenmiş veri kaydedildi: {output_path}")
+    return output_path
+
+if __name__ == "__main__":
+    # iki geçişli, parça parça: tüm tablo belleğe alınmaz
+    clean_csv_chunked("data/processed/match_odds_wide_20250801.csv")
@@ -0,0 +1,280 @@
+"""
+Single-pass column profiler for the wide odds table (src/processor.py).
+
+- Null ratio, distinct count, min / max and a HyperLogLog cardinality sketch for
+  every column, computed for the whole numeric block at once (one sort, one hash)
+- Profiles are mergeable, so a larger-than-memory CSV is profiled in row chunks
+  and a match_date-partitioned dataset partition by partition
+- Distinct counts stay exact while a column has at most EXACT_LIMIT values (or the
+  profile comes from a single chunk); above that the sketch estimate is used
+- Cache next to the data: <csv>.profile.npz, or <dataset>/_profile/<date>.npz per
+  partition — only partitions whose part files changed are recomputed
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.storage import _list_partitions, _part_files, _read_part, file_signature, is_dataset
+
+HLL_P = 10                      # 2^10 register → ~%3 hata
+HLL_M = 1 << HLL_P
+EXACT_LIMIT = 256               # sütun başına tutulan en fazla farklı değer
+CHUNK_ROWS = 50_000
+PROFILE_DIR = "_profile"
+PROFILE_COLS = ["column", "rows", "null_count", "null_ratio", "distinct", "distinct_approx", "min", "max"]
+
+
+def _hll_rank(hashes):
+    """64 bit hash → (register no, ilk 1 bitinin sırası)."""
+    reg = (hashes >> np.uint64(64 - HLL_P)).astype(np.int64)
+    rest = (hashes << np.uint64(HLL_P)) >> np.uint64(11)          # float64'e kayıpsız sığan 53 bit
+    bit_len = np.frexp(rest.astype(np.float64))[1]
+    rank = np.minimum(53 - bit_len + 1, 64 - HLL_P + 1)
+    return reg, rank.astype(np.uint8)
+
+
+def _hll_estimate(registers):
+    """Register matrisinden (sütun × m) sütun başına kardinalite tahmini."""
+    m = registers.shape[1]
+    alpha = 0.7213 / (1.0 + 1.079 / m)
+    raw = alpha * m * m / np.sum(2.0 ** -registers.astype(np.float64), axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class ColumnProfile:
+    """
+    Birleştirilebilir sütun istatistikleri: satır sayısı, dolu hücre sayısı, min/max,
+    küçük farklı-değer kümeleri ve HLL register'ları.
+    """
+
+    def __init__(self, columns, rows, non_null, vmin, vmax, small, exact, registers):
+        self.columns = list(columns)
+        self.rows = int(rows)
+        self.non_null = np.asarray(non_null, dtype=np.int64)
+        self.min = np.asarray(vmin, dtype=object)
+        self.max = np.asarray(vmax, dtype=object)
+        self.small = list(small)        # set veya None (EXACT_LIMIT aşıldı)
+        self.exact = np.asarray(exact, dtype=np.int64)   # -1: kesin sayı bilinmiyor
+        self.registers = np.asarray(registers, dtype=np.uint8)
+
+    @classmethod
+    def empty(cls, columns=()):
+        n = len(columns)
+        return cls(columns, 0, np.zeros(n), [None] * n, [None] * n, [set() for _ in range(n)],
+                   np.zeros(n), np.zeros((n, HLL_M)))
+
+    def _aligned(self, columns):
+        """Sütunları verilen sıraya getirir; olmayan sütunlar tümüyle boş sayılır."""
+        pos = {c: i for i, c in enumerate(self.columns)}
+        idx = np.array([pos.get(c, -1) for c in columns], dtype=np.int64)
+        have = idx >= 0
+        take = np.where(have, idx, 0)
+        n = len(columns)
+        regs = np.zeros((n, HLL_M), dtype=np.uint8)
+        if len(self.columns):
+            regs[have] = self.registers[take[have]]
+        pick = lambda arr, fill: [arr[i] if i >= 0 else fill for i in idx]  # noqa: E731
+        return (np.where(have, self.non_null[take] if len(self.columns) else 0, 0),
+                pick(self.min, None), pick(self.max, None), pick(self.small, set()),
+                np.where(have, self.exact[take] if len(self.columns) else 0, 0), regs)
+
+    def merge(self, other):
+        columns = self.columns + [c for c in other.columns if c not in set(self.columns)]
+        a, b = self._aligned(columns), other._aligned(columns)
+        small, exact = [], []
+        for sa, sb, ea, eb in zip(a[3], b[3], a[4], b[4]):
+            s = None if sa is None or sb is None else sa | sb
+            if s is not None and len(s) > EXACT_LIMIT:
+                s = None
+            small.append(s)
+            if s is not None:
+                exact.append(len(s))
+            elif eb == 0 and ea >= 0:
+                exact.append(ea)          # diğer taraf bu sütunda boş
+            elif ea == 0 and eb >= 0:
+                exact.append(eb)
+            else:
+                exact.append(-1)
+        return ColumnProfile(columns, self.rows + other.rows, a[0] + b[0],
+                             [_pick(x, y, min) for x, y in zip(a[1], b[1])],
+                             [_pick(x, y, max) for x, y in zip(a[2], b[2])],
+                             small, exact, np.maximum(a[5], b[5]))
+
+    def to_frame(self):
+        approx = np.rint(_hll_estimate(self.registers)) if len(self.columns) else np.zeros(0)
+        approx = np.where(self.non_null > 0, np.maximum(approx, 1), 0).astype(np.int64)
+        distinct = np.where(self.exact >= 0, self.exact, approx)
+        null_count = self.rows - self.non_null
+        with np.errstate(invalid="ignore", divide="ignore"):
+            null_ratio = null_count / self.rows if self.rows else np.full(len(self.columns), np.nan)
+        return pd.DataFrame({
+            "column": self.columns, "rows": self.rows, "null_count": null_count, "null_ratio": null_ratio,
+            "distinct": distinct, "distinct_approx": approx, "min": self.min, "max": self.max,
+        }, columns=PROFILE_COLS)
+
+    # ------------------------------- cache ------------------------------------ #
+
+    def save(self, path, signature=""):
+        tmp_path = path + ".tmp.npz"
+        meta = {
+            "columns": self.columns, "rows": self.rows, "signature": signature,
+            "min": [_jsonable(v) for v in self.min], "max": [_jsonable(v) for v in self.max],
+            "small": [None if s is None else sorted(map(_jsonable, s), key=repr) for s in self.small],
+        }
+        np.savez(tmp_path, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                 non_null=self.non_null, exact=self.exact, registers=self.registers)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Dönüş: (profil, imza)."""
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            profile = cls(meta["columns"], meta["rows"], z["non_null"], meta["min"], meta["max"],
+                          [None if s is None else set(s) for s in meta["small"]], z["exact"], z["registers"])
+        return profile, meta["signature"]
+
+
+def _pick(x, y, fn):
+    if x is None:
+        return y
+    if y is None:
+        return x
+    try:
+        return fn(x, y)
+    except TypeError:                # aynı sütunda sayı/metin karışmışsa metin olarak kıyasla
+        return fn(str(x), str(y))
+
+
+def _jsonable(v):
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def profile_frame(df):
+    """
+    Tek vektörel geçiş: sayısal sütunlar birlikte sıralanır (farklı sayısı, min/max)
+    ve hash'lenir (HLL); yalnızca metin sütunları tek tek işlenir.
+    """
+    columns = list(df.columns)
+    n = len(columns)
+    non_null = np.zeros(n, dtype=np.int64)
+    vmin, vmax = [None] * n, [None] * n
+    small, exact = [None] * n, np.zeros(n, dtype=np.int64)
+    registers = np.zeros((n, HLL_M), dtype=np.uint8)
+    if not len(df):
+        return ColumnProfile(columns, 0, non_null, vmin, vmax, [set() for _ in range(n)], exact, registers)
+
+    dtypes = df.dtypes.tolist()
+    num = [j for j, dt in enumerate(dtypes)
+           if pd.api.types.is_numeric_dtype(dt) and not pd.api.types.is_bool_dtype(dt)]
+    if num:
+        S = np.sort(df.iloc[:, num].to_numpy(dtype=np.float64, na_value=np.nan), axis=0)   # NaN'lar sona
+        cnt = (~np.isnan(S)).sum(axis=0)
+        first = np.empty(S.shape, dtype=bool)
+        first[0] = cnt > 0
+        np.not_equal(S[1:], S[:-1], out=first[1:])
+        first[1:] &= np.arange(1, len(S))[:, None] < cnt[None, :]
+        n_distinct = first.sum(axis=0)
+        non_null[num] = cnt
+        exact[num] = n_distinct
+        last = S[np.maximum(cnt - 1, 0), np.arange(len(num))]
+        for k, j in enumerate(num):
+            if cnt[k]:
+                vmin[j], vmax[j] = float(S[0, k]), float(last[k])
+            if n_distinct[k] <= EXACT_LIMIT:
+                small[j] = set(S[first[:, k], k].tolist())
+
+        # HLL için her farklı değeri bir kez hash'lemek yeterli
+        rows, cols = np.nonzero(first)
+        reg, rank = _hll_rank(pd.util.hash_array(S[rows, cols]))
+        np.maximum.at(registers, (np.asarray(num)[cols], reg), rank)
+
+    for j in sorted(set(range(n)) - set(num)):
+        s = df.iloc[:, j]
+        vals = s[s.notna()].astype(str)
+        non_null[j] = len(vals)
+        if not len(vals):
+            small[j] = set()
+            continue
+        uniq = pd.unique(vals.to_numpy(dtype=object))
+        exact[j] = len(uniq)
+        vmin[j], vmax[j] = min(uniq), max(uniq)
+        small[j] = set(uniq.tolist()) if len(uniq) <= EXACT_LIMIT else None
+        reg, rank = _hll_rank(pd.util.hash_array(uniq))
+        np.maximum.at(registers[j], reg, rank)
+
+    return ColumnProfile(columns, len(df), non_null, vmin, vmax, small, exact, registers)
+
+
+def profile_csv(path, chunksize=CHUNK_ROWS, **read_kwargs):
+    """Tek CSV, satır parçaları halinde: bellek parça boyutuyla sınırlı."""
+    profile = None
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_kwargs):
+        part = profile_frame(chunk)
+        profile = part if profile is None else profile.merge(part)
+    return profile if profile is not None else ColumnProfile.empty(pd.read_csv(path, nrows=0).columns)
+
+
+def _profile_partition(part_dir):
+    profile = None
+    for path in _part_files(part_dir):
+        if path.endswith(".parquet"):
+            part = profile_frame(_read_part(path))
+        else:
+            part = profile_csv(path, dtype={"match_id": "string"})
+        profile = part if profile is None else profile.merge(part)
+    return profile or ColumnProfile.empty()
+
+
+def profile_table(path, chunksize=CHUNK_ROWS, cache=True, verbose=True):
+    """
+    Tek CSV veya bölümlenmiş veri klasörünün profili (DataFrame, PROFILE_COLS).
+    cache=True: sonuçlar verinin yanında saklanır; klasörde yalnızca part dosyaları
+    değişen tarih bölümleri yeniden hesaplanır.
+    """
+    if not is_dataset(path):
+        cache_path = str(path) + ".profile.npz"
+        signature = file_signature([path])
+        if cache and os.path.exists(cache_path):
+            profile, old = ColumnProfile.load(cache_path)
+            if old == signature:
+                if verbose:
+                    print(f"📦 Profil önbellekten: {cache_path}")
+                return profile.to_frame()
+        profile = profile_csv(path, chunksize=chunksize)
+        if cache:
+            profile.save(cache_path, signature)
+        return profile.to_frame()
+
+    cache_dir = os.path.join(path, PROFILE_DIR)
+    if cache:
+        os.makedirs(cache_dir, exist_ok=True)
+    partitions = _list_partitions(path)
+    profile, recomputed = ColumnProfile.empty(), 0
+    for date, part_dir in partitions.items():
+        cache_path = os.path.join(cache_dir, f"{date}.npz")
+        signature = file_signature(_part_files(part_dir))
+        part = None
+        if cache and os.path.exists(cache_path):
+            part, old = ColumnProfile.load(cache_path)
+            if old != signature:
+                part = None
+        if part is None:
+            part = _profile_partition(part_dir)
+            recomputed += 1
+            if cache:
+                part.save(cache_path, signature)
+        profile = profile.merge(part)
+    if cache:
+        for name in os.listdir(cache_dir):
+            if name.endswith(".npz") and name[:-4] not in partitions:
+                os.remove(os.path.join(cache_dir, name))   # silinmiş bölüm
+    if verbose:
+        print(f"🧮 Profil: {len(partitions)} bölüm, {recomputed} tanesi yeniden hesaplandı")
+    return profile.to_frame()
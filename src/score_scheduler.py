@@ -0,0 +1,111 @@
+"""
+Score-poll scheduler: only asks the status endpoint for matches that can have finished.
+
+- A match becomes due `first_poll_after` (default 2h) after kickoff (match_date + match_time,
+  bulletin local time = Europe/Istanbul)
+- Every poll that returns no final score doubles the wait (base_backoff … max_backoff)
+- After `horizon` (default 7 days) past kickoff the match is given up on
+- State (misses / next poll per match_id) lives in a small JSON file between runs
+- A match is done once its full-time score is in (has_final_score); a missing first-half
+  score alone does not keep it in the poll set
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    from zoneinfo import ZoneInfo
+    BULLETIN_TZ = ZoneInfo("Europe/Istanbul")
+except Exception:  # tzdata missing → fall back to the machine's local time
+    BULLETIN_TZ = None
+
+FIRST_POLL_AFTER = timedelta(hours=2)
+BASE_BACKOFF = timedelta(minutes=30)
+MAX_BACKOFF = timedelta(hours=24)
+HORIZON = timedelta(days=7)
+
+FINAL_SCORE_COLS = ["totalHomeGoal", "totalAwayGoal"]
+
+
+def _now() -> datetime:
+    return datetime.now(BULLETIN_TZ).replace(tzinfo=None) if BULLETIN_TZ else datetime.now()
+
+
+def kickoff_times(df: pd.DataFrame) -> pd.Series:
+    """match_date + match_time → naive datetime (NaT if unparseable; missing time → 00:00)."""
+    date = df["match_date"].astype("string").fillna("")
+    time_ = df["match_time"].astype("string").fillna("00:00:00") if "match_time" in df else "00:00:00"
+    return pd.to_datetime(date + " " + time_, errors="coerce")
+
+
+def has_final_score(scores) -> bool:
+    """_parse_scores çıktısı (fh_h, fh_a, ft_h, ft_a) maç sonu skorunu içeriyor mu? due() ile aynı kural."""
+    return scores is not None and scores[2] is not None and scores[3] is not None
+
+
+class ScorePollScheduler:
+    def __init__(self, state_path: str, *, first_poll_after: timedelta = FIRST_POLL_AFTER,
+                 base_backoff: timedelta = BASE_BACKOFF, max_backoff: timedelta = MAX_BACKOFF,
+                 horizon: timedelta = HORIZON) -> None:
+        self.state_path = state_path
+        self.first_poll_after = first_poll_after
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.horizon = horizon
+        self.state: Dict[str, Dict] = {}
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def due(self, df: pd.DataFrame, now: Optional[datetime] = None) -> List[str]:
+        """
+        Maç sonu skoru eksik ve şu an sorgulanması anlamlı olan match_id'ler.
+        Başlama saati okunamayan maçlar her zaman sorgulanır (eski davranış).
+        """
+        now = now or _now()
+        need = df[FINAL_SCORE_COLS].isna().any(axis=1)
+        kickoff = kickoff_times(df)
+        since = now - kickoff
+        window = kickoff.isna() | ((since >= self.first_poll_after) & (since <= self.horizon))
+
+        ids = df.loc[need & window, "match_id"].astype("string").dropna().unique().tolist()
+        now_iso = now.isoformat()
+        return [mid for mid in ids if self.state.get(mid, {}).get("next_poll", "") <= now_iso]
+
+    def record(self, polled: Iterable[str], found: Iterable[str], now: Optional[datetime] = None) -> None:
+        """
+        Poll sonuçlarını işler: found = maç sonu skoru gelenler (has_final_score) durumdan silinir,
+        gelmeyenin bekleme süresi ikiye katlanır.
+        """
+        now = now or _now()
+        found = set(map(str, found))
+        for mid in map(str, polled):
+            if mid in found:
+                self.state.pop(mid, None)
+                continue
+            misses = self.state.get(mid, {}).get("misses", 0) + 1
+            wait = min(self.max_backoff, self.base_backoff * (2 ** (misses - 1)))
+            self.state[mid] = {"misses": misses, "next_poll": (now + wait).isoformat()}
+
+    def prune(self, df: pd.DataFrame, now: Optional[datetime] = None) -> None:
+        """Ufku geçmiş veya artık tabloda olmayan maçları durum dosyasından atar."""
+        now = now or _now()
+        kickoff = pd.Series(kickoff_times(df).to_numpy(), index=df["match_id"].astype("string"))
+        kickoff = kickoff[~kickoff.index.duplicated()]
+        for mid in list(self.state):
+            k = kickoff.get(mid, pd.NaT)
+            if mid not in kickoff.index or (pd.notna(k) and now - k > self.horizon):
+                del self.state[mid]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
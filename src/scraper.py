@@ -6,6 +6,9 @@ from datetime import datetime
 from tqdm import tqdm
 from random import shuffle
 
+from src.market_registry import MarketRegistry
+from src.storage import append_data, is_dataset, load_data, update_partitions
+
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -16,9 +19,10 @@ KEY_COLS = ["match_date", "match_time", "tournament", "match_id", "homeTeam", "a
 
 headers = {"User-Agent": "Mozilla/5.0"}
 
-def get_match_ids():
+def get_event_catalog():
     """
-    Günlük maç bülteninden match_id listesi döner.
+    Günlük maç bültenini çekip {match_id: event} sözlüğü döner.
+    Bülten kaydı esd/lgn içeriyorsa maç başına events/{id} isteğine gerek kalmaz.
     """
     url = "https://www.bilyoner.com/api/v3/mobile/aggregator/gamelist/all/v1"
     params = {"tabType": 1, "bulletinType": 2, "liveEventsEnabledForPreBulletin": "true"}
@@ -26,20 +30,30 @@ def get_match_ids():
     resp = requests.get(url, params=params, headers=headers)
     resp.raise_for_status()
     data = resp.json()
-    match_ids = list(data.get("events", {}).keys())
+    return {str(mid): ev or {} for mid, ev in data.get("events", {}).items()}
+
+def get_match_ids(catalog=None):
+    """
+    Günlük maç bülteninden match_id listesi döner.
+    """
+    match_ids = list((catalog if catalog is not None else get_event_catalog()).keys())
     shuffle(match_ids)  # Rastgele sırala
     return match_ids
 
-def fetch_match_odds(match_id, is_live=True, is_popular=False):
+def fetch_match_odds(match_id, is_live=True, is_popular=False, event=None):
     """
     Tek maç için tüm geçerli oranları ve temel bilgileri döner.
+    event: bülten kaydı (get_event_catalog); esd ve lgn varsa bilgi isteği atlanır.
     """
     info_url = f"https://www.bilyoner.com/api/v3/mobile/aggregator/gamelist/events/{match_id}"
     odds_url = f"https://www.bilyoner.com/api/v3/mobile/aggregator/match-card/{match_id}/odds"
     params = {"isLiveEvent": str(is_live).lower(), "isPopular": str(is_popular).lower()}
 
     try:
-        info = requests.get(info_url, headers=headers).json()
+        if event and event.get("esd") and event.get("lgn") is not None:
+            info = event
+        else:
+            info = requests.get(info_url, headers=headers).json()
         odds = requests.get(odds_url, params=params, headers=headers).json()
     except:
         return None
@@ -81,17 +95,24 @@ def fetch_match_odds(match_id, is_live=True, is_popular=False):
 
     return pd.DataFrame([row_dict])
 
-def append_matches_to_csv(match_ids, csv_path=CSV_PATH):
+def append_matches_to_csv(match_ids, csv_path=CSV_PATH, method="auto", catalog=None):
     """
     Yeni match_id'leri çekip CSV’ye ekler. 
     Eğer match_id zaten varsa tekrar eklenmez.
+    csv_path bir veri klasörüyse (match_date bölümlü) sadece yeni part dosyaları yazılır.
+    catalog verilirse maç bilgisi bültenden alınır.
     """
+    catalog = catalog or {}
+    if is_dataset(csv_path):
+        return _append_matches_to_dataset(match_ids, csv_path, method, catalog)
+
     if os.path.exists(csv_path):
         master_df = pd.read_csv(csv_path, dtype={"match_id": str})
     else:
         master_df = pd.DataFrame(columns=KEY_COLS)
 
     existing_ids = set(master_df["match_id"].astype(str)) if not master_df.empty else set()
+    registry = MarketRegistry.for_data(csv_path)
 
     new_rows = []
 
@@ -102,23 +123,16 @@ def append_matches_to_csv(match_ids, csv_path=CSV_PATH):
         if mid in existing_ids:
             continue
 
-        df = fetch_match_odds(mid)
+        df = fetch_match_odds(mid, event=catalog.get(mid))
         if df is None:
             continue
 
-        # Kolon tamamlama
-        for col in df.columns:
-            if col not in master_df.columns:
-                master_df[col] = pd.NA
-        for col in master_df.columns:
-            if col not in df.columns:
-                df[col] = pd.NA
-
         new_rows.append(df)
 
     if new_rows:
-        # Yeni maçları ekle
-        new_data = pd.concat(new_rows, ignore_index=True)
+        # Yeni maçları tek seferde ekle: kolon birleşimi concat'te, alias etiketler (1:0 / 1-0) registry ile tek sütun
+        records = registry.canonicalize_rows([r for df in new_rows for r in df.to_dict("records")], master_df.columns)
+        new_data = pd.DataFrame(records)
         master_df = pd.concat([master_df, new_data], ignore_index=True)
 
         # Kolon sıralama
@@ -126,15 +140,51 @@ def append_matches_to_csv(match_ids, csv_path=CSV_PATH):
         master_df = master_df[KEY_COLS + sorted(other_cols)]
 
         master_df.to_csv(csv_path, index=False)
+        registry.save()
         print(f"\n✅ {len(new_rows)} yeni maç eklendi → {csv_path}")
     else:
         print("\nℹ️ Eklenebilecek yeni maç bulunamadı.")
 
-def update_scores_in_csv(csv_path=CSV_PATH):
+def _append_matches_to_dataset(match_ids, root, method="auto", catalog=None):
+    """
+    Bölümlü veri klasörü için ekleme: sadece match_id sütunu okunur,
+    yeni maçlar tarih bölümlerine yeni dosya olarak yazılır.
+    """
+    existing_ids = set(load_data(root, columns=["match_id"])["match_id"].astype(str))
+    registry = MarketRegistry.for_data(root)
+
+    new_rows = []
+    for mid in tqdm(match_ids):
+        mid = str(mid)
+        if mid in existing_ids:
+            continue
+        df = fetch_match_odds(mid, event=(catalog or {}).get(mid))
+        if df is not None:
+            new_rows.append(df)
+
+    if new_rows:
+        new_data = pd.DataFrame(registry.canonicalize_rows([r for df in new_rows for r in df.to_dict("records")]))
+        other_cols = [c for c in new_data.columns if c not in KEY_COLS]
+        append_data(new_data[KEY_COLS + sorted(other_cols)], root, method=method)
+        registry.save()
+        print(f"\n✅ {len(new_rows)} yeni maç eklendi → {root}")
+    else:
+        print("\nℹ️ Eklenebilecek yeni maç bulunamadı.")
+
+def update_scores_in_csv(csv_path=CSV_PATH, method="auto"):
     """
     CSV'deki eksik skorları Bilyoner'den çekerek doldurur.
+    csv_path bir veri klasörüyse sadece skor sütunları okunur ve
+    sadece skoru güncellenen tarih bölümleri yeniden yazılır.
     """
-    df = pd.read_csv(csv_path)
+    score_cols = ["firstHalfHomeGoal", "firstHalfAwayGoal", "totalHomeGoal", "totalAwayGoal"]
+    dataset = is_dataset(csv_path)
+    if dataset:
+        df = load_data(csv_path, columns=["match_id", "match_date"] + score_cols)
+        df = df.reindex(columns=["match_id", "match_date"] + score_cols)
+    else:
+        df = pd.read_csv(csv_path)
+    updated = []
     for idx, row in tqdm(df.iterrows(), total=len(df)):
         if pd.isna(row["firstHalfHomeGoal"]) and pd.isna(row["firstHalfAwayGoal"]):
             match_id = row["match_id"]
@@ -147,10 +197,14 @@ def update_scores_in_csv(csv_path=CSV_PATH):
                 df.at[idx, "firstHalfAwayGoal"] = int(scores["SOCCER_FIRST_HALF"]["awayScore"])
                 df.at[idx, "totalHomeGoal"] = int(scores["SOCCER_END_SCORE"]["homeScore"])
                 df.at[idx, "totalAwayGoal"] = int(scores["SOCCER_END_SCORE"]["awayScore"])
+                updated.append(idx)
             except:
                 continue
 
-    df.to_csv(csv_path, index=False)
+    if dataset:
+        update_partitions(csv_path, df.loc[updated], score_cols, method=method)
+    else:
+        df.to_csv(csv_path, index=False)
     print("✅ Skorlar güncellendi ve CSV’ye yazıldı.")
 
 if __name__ == "__main__":
@@ -171,6 +225,7 @@ if __name__ == "__main__":
     #         break
     #     time.sleep(1)  # Her 10 saniyede bir kontrol et
 
-    ids = get_match_ids()
-    append_matches_to_csv(ids)
+    catalog = get_event_catalog()
+    ids = get_match_ids(catalog)
+    append_matches_to_csv(ids, catalog=catalog)
     update_scores_in_csv()
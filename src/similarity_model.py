@@ -10,10 +10,9 @@ def find_similar_matches(df, target_row, feature_cols, k=100):
     target_vector = target_row[feature_cols].fillna(0).astype(float).values.reshape(1, -1)
 
     similarities = cosine_similarity(feature_matrix, target_vector).flatten()
-    df["similarity_score"] = similarities
-
-    top_matches = df.sort_values(by="similarity_score", ascending=False).head(k)
-    return top_matches.drop(columns=["similarity_score"])
+    # girdi DataFrame'ine similarity_score sütunu yazılmaz
+    order = np.argsort(-similarities, kind="stable")[:k]
+    return df.iloc[order]
 
 
 def estimate_probabilities(similar_matches):
@@ -99,3 +98,108 @@ def run_similarity_prediction(df, match_id, feature_cols, k=100):
             "is_value": is_val
         }
     return results
+
+
+# ------------------------------ batch API ------------------------------ #
+
+OUTCOMES = ["MS1", "MS2", "MS X"]
+
+
+def normalize_features(df, feature_cols):
+    """
+    Özellik matrisini bir kez hazırlar: NaN → 0, satırlar L2 normuna bölünür
+    (sıfır vektörler sıfır kalır, sklearn cosine_similarity ile aynı).
+    """
+    F = df[feature_cols].to_numpy(dtype=float, na_value=np.nan)
+    F = np.nan_to_num(F, nan=0.0)
+    norms = np.linalg.norm(F, axis=1, keepdims=True)
+    np.divide(F, norms, out=F, where=norms > 0)
+    return F
+
+
+def top_k_similar(F, target_idx, k=100, exclude_self=False, block_rows=1024, n_candidates=None):
+    """
+    Çok sayıda hedef için kosinüs benzerliği tek matris çarpımıyla (blok blok) hesaplanır.
+    n_candidates verilirse yalnızca F[:n_candidates] satırları aday olur (ör. tarihe göre
+    sıralı tabloda hedeften önceki maçlar).
+    Dönüş: (len(target_idx), k) satır indeksleri, benzerliğe göre azalan (eşitlikte düşük indeks önce).
+    """
+    target_idx = np.asarray(target_idx, dtype=np.int64)
+    n = F.shape[0] if n_candidates is None else n_candidates
+    k_eff = min(k, n - 1 if exclude_self else n)
+    out = np.empty((len(target_idx), k_eff), dtype=np.int64)
+
+    for start in range(0, len(target_idx), block_rows):
+        rows = target_idx[start:start + block_rows]
+        sims = F[rows] @ F[:n].T                               # (B, N)
+        if exclude_self:
+            own = np.flatnonzero(rows < n)
+            sims[own, rows[own]] = -np.inf
+        if k_eff < n:
+            # argpartition k. sıradaki eşitlerden keyfi birini seçer → k. değere eşit tüm adaylar alınır
+            kth = -np.partition(-sims, k_eff - 1, axis=1)[:, k_eff - 1]
+        else:
+            kth = np.full(len(rows), -np.inf)
+        for r in range(len(rows)):
+            cand = np.flatnonzero(sims[r] >= kth[r])
+            order = np.lexsort((cand, -sims[r, cand]))[:k_eff]
+            out[start + r] = cand[order]
+    return out
+
+
+def estimate_probabilities_batch(home_goals, away_goals, top_idx):
+    """
+    estimate_probabilities'in vektörel karşılığı: (N_targets, 3) MS1 / MS2 / MS X olasılıkları.
+    Komşularının hiçbirinde skor yoksa satır NaN.
+    """
+    home = np.asarray(home_goals, dtype=float)[top_idx]
+    away = np.asarray(away_goals, dtype=float)[top_idx]
+    valid = ~(np.isnan(home) | np.isnan(away))
+    counts = np.stack([
+        ((home > away) & valid).sum(axis=1),
+        ((home < away) & valid).sum(axis=1),
+        ((home == away) & valid).sum(axis=1),
+    ], axis=1).astype(float)
+    total = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        probs = np.where(total > 0, counts / total, np.nan)
+    return np.round(probs, 2)
+
+
+def run_similarity_prediction_batch(df, match_ids, feature_cols, k=100, odds_cols=None, exclude_self=False):
+    """
+    run_similarity_prediction'ın çok maçlı hali. Özellik matrisi bir kez normalize edilir,
+    girdi DataFrame'i değiştirilmez.
+    Dönüş: hedef maç başına 3 satır (match_id, outcome, prob, odds, ev, is_value).
+    odds_cols verilmezse tekli fonksiyondaki gibi feature_cols'un ilk üç sütunu (MS1, MS2, MS X).
+    """
+    odds_cols = list(odds_cols or feature_cols[:3])
+    ids = df["match_id"].to_numpy()
+    first_pos = pd.Series(np.arange(len(ids)), index=ids)
+    first_pos = first_pos[~first_pos.index.duplicated()]  # tekli fonksiyon gibi ilk satır
+    pos = first_pos.reindex(list(match_ids)).fillna(-1).to_numpy(dtype=np.int64)
+    missing = pos < 0
+    if missing.any():
+        print(f"⛔ {int(missing.sum())} match_id veri setinde bulunamadı.")
+    pos = pos[~missing]
+
+    F = normalize_features(df, feature_cols)
+    top_idx = top_k_similar(F, pos, k=k, exclude_self=exclude_self)
+    probs = estimate_probabilities_batch(df["totalHomeGoal"], df["totalAwayGoal"], top_idx)   # (T, 3)
+
+    odds = df[odds_cols].to_numpy(dtype=float, na_value=np.nan)[pos]                          # (T, 3)
+    odds = np.where(odds == 0, np.nan, odds)
+    ev = np.round(probs * odds, 2)
+    has_probs = ~np.isnan(probs).any(axis=1)
+
+    t = np.repeat(np.arange(len(pos)), len(OUTCOMES))
+    o = np.tile(np.arange(len(OUTCOMES)), len(pos))
+    out = pd.DataFrame({
+        "match_id": ids[pos][t],
+        "outcome": np.asarray(OUTCOMES, dtype=object)[o],
+        "prob": probs[t, o],
+        "odds": odds[t, o],
+        "ev": ev[t, o],
+        "is_value": ev[t, o] > 1,
+    })
+    return out[has_probs[t]].reset_index(drop=True)
@@ -0,0 +1,203 @@
+import os
+import shutil
+import time
+
+import pandas as pd
+
+PARTITION_COL = "match_date"
+NO_DATE = "unknown"
+METHODS = ("csv", "parquet")
+
+
+def resolve_method(method="auto"):
+    """
+    "auto" → pyarrow kuruluysa "parquet", değilse "csv".
+    """
+    if method == "auto":
+        try:
+            import pyarrow  # noqa: F401
+            return "parquet"
+        except ImportError:
+            return "csv"
+    if method not in METHODS:
+        raise ValueError(f"Bilinmeyen depolama yöntemi: {method}")
+    return method
+
+
+def is_dataset(path):
+    """
+    Tek dosya CSV değil de match_date'e göre bölünmüş bir veri klasörü mü?
+    """
+    return not str(path).lower().endswith(".csv")
+
+
+def _partition_dir(root, date):
+    return os.path.join(root, f"{PARTITION_COL}={date}")
+
+
+def _partition_key(date):
+    return NO_DATE if pd.isna(date) or date == "" else str(date)
+
+
+def _list_partitions(root):
+    if not os.path.isdir(root):
+        return {}
+    out = {}
+    for name in sorted(os.listdir(root)):
+        if name.startswith(f"{PARTITION_COL}="):
+            out[name.split("=", 1)[1]] = os.path.join(root, name)
+    return out
+
+
+def _part_files(part_dir):
+    return sorted(
+        os.path.join(part_dir, f) for f in os.listdir(part_dir)
+        if f.startswith("part-") and f.endswith((".csv", ".parquet"))
+    )
+
+
+def file_signature(paths):
+    """Dosya adı + boyut + mtime; dosyalar değişti mi kontrolü için (içerik okunmaz)."""
+    return "|".join(f"{os.path.basename(p)}:{os.path.getsize(p)}:{os.stat(p).st_mtime_ns}" for p in paths)
+
+
+def partition_signatures(root):
+    """Tarih bölümü → part dosyalarının imzası (file_signature)."""
+    return {date: file_signature(_part_files(part_dir)) for date, part_dir in _list_partitions(root).items()}
+
+
+def _write_part(df, part_dir, method):
+    os.makedirs(part_dir, exist_ok=True)
+    name = f"part-{time.time_ns()}.{method}"
+    tmp_path = os.path.join(part_dir, "." + name)
+    if method == "parquet":
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(part_dir, name))
+
+
+def _read_part(path, columns=None):
+    if path.endswith(".parquet"):
+        if columns is None:
+            return pd.read_parquet(path)
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        return pd.read_parquet(path, columns=[c for c in columns if c in available])
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    return pd.read_csv(path, usecols=usecols, dtype={"match_id": "string"})
+
+
+def _read_partition(part_dir, columns=None):
+    frames = [_read_part(p, columns) for p in _part_files(part_dir)]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def save_data(df, root, method="auto"):
+    """
+    Tabloyu match_date'e göre bölümlenmiş olarak (yeniden) yazar.
+    method: "csv", "parquet" veya "auto".
+    """
+    method = resolve_method(method)
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    append_data(df, root, method=method)
+    print(f"💾 Veri kaydedildi ({method}) → {root}")
+
+
+def append_data(df, root, method="auto"):
+    """
+    Yeni satırları sadece ilgili tarih bölümlerine yeni bir part dosyası olarak ekler.
+    Mevcut dosyalar okunmaz ve yeniden yazılmaz.
+    """
+    method = resolve_method(method)
+    if df.empty:
+        return
+    keys = df[PARTITION_COL].map(_partition_key)
+    for date, part in df.groupby(keys, sort=True):
+        _write_part(part, _partition_dir(root, date), method)
+
+
+def update_partitions(root, updates, columns, key="match_id", method="auto", overwrite=False):
+    """
+    `updates` içindeki (key, match_date, columns) değerlerini sadece etkilenen
+    bölümleri yeniden yazarak uygular. overwrite=False ise sadece boş hücreler doldurulur.
+    Döndürür: yeniden yazılan bölüm sayısı.
+    """
+    method = resolve_method(method)
+    if updates.empty:
+        return 0
+
+    partitions = _list_partitions(root)
+    updates = updates.assign(**{key: updates[key].astype("string")})
+    keys = updates[PARTITION_COL].map(_partition_key)
+    rewritten = 0
+    for date, upd in updates.groupby(keys, sort=True):
+        part_dir = partitions.get(date)
+        if part_dir is None:
+            continue
+        old_files = _part_files(part_dir)
+        df = _read_partition(part_dir)
+        df[key] = df[key].astype("string")
+
+        upd = upd.drop_duplicates(subset=key, keep="last").set_index(key)
+        for col in columns:
+            new_vals = df[key].map(upd[col])
+            mask = new_vals.notna() if overwrite else (df[col].isna() & new_vals.notna())
+            if mask.any():
+                df.loc[mask, col] = new_vals[mask]
+
+        _write_part(df, part_dir, method)
+        for path in old_files:
+            os.remove(path)
+        rewritten += 1
+    return rewritten
+
+
+def load_data(root, columns=None, dates=None):
+    """
+    Bölümlenmiş veriyi okur. columns verilirse sadece o sütunlar (ör. gereken oran
+    sütunları) yüklenir; dates verilirse sadece o tarih bölümleri okunur.
+    """
+    frames = []
+    for date, part_dir in _list_partitions(root).items():
+        if dates is not None and date not in set(map(str, dates)):
+            continue
+        part = _read_partition(part_dir, columns)
+        if not part.empty:
+            frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    if "match_id" in df.columns:
+        df["match_id"] = df["match_id"].astype("string")
+    return df
+
+
+def load_columns(root):
+    """
+    Veri klasöründeki tüm sütun adlarının birleşimi (veri okumadan, sadece başlıklar).
+    """
+    cols = {}
+    for part_dir in _list_partitions(root).values():
+        for path in _part_files(part_dir):
+            if path.endswith(".parquet"):
+                import pyarrow.parquet as pq
+                names = pq.read_schema(path).names
+            else:
+                names = pd.read_csv(path, nrows=0).columns.tolist()
+            cols.update(dict.fromkeys(names))
+    return list(cols)
+
+
+def read_table(path, columns=None):
+    """
+    Tek dosya CSV veya bölümlenmiş veri klasörü — ikisini de aynı şekilde okur.
+    """
+    if is_dataset(path):
+        return load_data(path, columns=columns)
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    return pd.read_csv(path, usecols=usecols)
@@ -0,0 +1,155 @@
+"""
+Parameter sweep for the neighbour value-bet model: TOP_K × EV threshold × stake
+threshold × distance, evaluated walk-forward (src/backtest.py) in a single pass.
+
+- Neighbour order is computed once per match up to max(K) for each distance
+  (nan-Euclidean as in predict_gpt.py, cosine as in src/similarity_model.py)
+- All K values come from prefix sums of the per-neighbour outcome indicators
+  (markets.market_counts_by_k)
+- All EV / stake thresholds are evaluated together: the threshold masks are
+  multiplied against the per-bet won / profit vectors
+- Output: one results-grid row per (distance, K, min_ev, min_stake)
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import prepare_history
+from src.distance import DEFAULT_BLOCK_MEM_MB, nan_euclidean_topk, prepare_train
+from src.market_registry import odds_matrix
+from src.markets import Goals, market_counts_by_k, market_odds, settle_markets
+from src.neighbor_index import GOAL_COLS
+from src.similarity_model import normalize_features, top_k_similar
+from src.storage import read_table
+
+KS = (10, 25, 50, 75, 100, 150, 200)
+MIN_EVS = (1.0, 1.05, 1.1, 1.2, 1.3)
+MIN_STAKES = (0.0, 0.01, 0.02, 0.05, 0.1)
+DISTANCES = ("nan_euclidean", "cosine")
+CHUNK_ROWS = 256          # test rows per prefix-sum chunk: (rows, max K, N_markets) indicators
+
+
+def _neighbors(distance, state, start, stop, k, block_mem_mb):
+    if distance == "nan_euclidean":
+        T, T_nan, prepared = state
+        return nan_euclidean_topk(T[start:stop], T_nan[start:stop], T[:start], T_nan[:start], k,
+                                  block_mem_mb=block_mem_mb, prepared=tuple(m[:start] for m in prepared))
+    F = state
+    idx = top_k_similar(F, np.arange(start, stop), k=k, n_candidates=start)
+    n_valid = np.full(stop - start, idx.shape[1], dtype=np.int64)
+    if idx.shape[1] < k:
+        idx = np.pad(idx, ((0, 0), (0, k - idx.shape[1])), constant_values=-1)
+    return idx, n_valid
+
+
+def run_sweep(df, ks=KS, min_evs=MIN_EVS, min_stakes=MIN_STAKES, distances=DISTANCES,
+              min_history=None, feature_cols=None, block_mem_mb=DEFAULT_BLOCK_MEM_MB, verbose=True):
+    """
+    Tüm (distance, K, min_ev, min_stake) kombinasyonları için tek geçişte walk-forward sonuçları.
+    Bahis kuralı: olasılık * oran > min_ev ve Kelly payı >= min_stake; sabit 1 birim stake.
+    Dönüş: sonuç ızgarası (n_bets, hit_rate, profit, ROI, brier).
+    """
+    ks = np.asarray(sorted(ks), dtype=np.int64)
+    min_evs = np.asarray(min_evs, dtype=float)
+    min_stakes = np.asarray(min_stakes, dtype=float)
+    k_max = int(ks[-1])
+    min_history = k_max if min_history is None else min_history
+
+    df, feature_cols, days = prepare_history(df, feature_cols)
+    goals = df[GOAL_COLS].to_numpy(dtype=float)
+    odds_all = market_odds(df)
+    won_all, _ = settle_markets(goals)
+
+    shape = (len(distances), len(ks), len(min_evs), len(min_stakes))
+    n_bets, n_won, profit = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    brier_sum, brier_n = np.zeros(shape[:2]), np.zeros(shape[:2])
+
+    for d, distance in enumerate(distances):
+        if distance == "nan_euclidean":
+            T = odds_matrix(df, feature_cols)
+            T_nan = np.isnan(T)
+            state = (T, T_nan, prepare_train(T, T_nan))
+        elif distance == "cosine":
+            F = pd.DataFrame(odds_matrix(df, feature_cols), columns=feature_cols)
+            state = normalize_features(F, feature_cols)
+        else:
+            raise ValueError(f"Bilinmeyen uzaklık: {distance}")
+
+        for start, stop in days:
+            if start < min_history:
+                continue
+            top_idx, n_valid = _neighbors(distance, state, start, stop, k_max, block_mem_mb)
+            for c in range(0, stop - start, CHUNK_ROWS):
+                rows = slice(c, min(c + CHUNK_ROWS, stop - start))
+                valid = np.arange(k_max)[None, :] < n_valid[rows, None]
+                g = goals[np.where(valid, top_idx[rows], 0)]
+                g[~valid] = np.nan
+                counts = market_counts_by_k(Goals(g[..., 0], g[..., 1], g[..., 2], g[..., 3]), valid, ks)
+
+                odds = odds_all[start:stop][rows]
+                won = won_all[start:stop][rows]
+                n_eff = np.minimum(ks[:, None], n_valid[rows][None, :])          # (nK, rows)
+                priced = ~np.isnan(odds)
+                o, w = odds[priced], won[priced].astype(float)
+                bet_profit = np.where(w > 0, o - 1.0, -1.0)
+
+                for ki in range(len(ks)):
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        prob = (counts[ki] / n_eff[ki][:, None])[priced]
+                    ok = ~np.isnan(prob)
+                    p, oo, ww, bp = prob[ok], o[ok], w[ok], bet_profit[ok]
+                    b = oo - 1.0
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        kelly = np.nan_to_num(np.clip((b * p - (1.0 - p)) / b, 0.0, None))
+
+                    ev_mask = (p * oo)[None, :] > min_evs[:, None]                # (nE, n)
+                    stake_mask = (kelly[None, :] >= min_stakes[:, None]).astype(float).T  # (n, nS)
+                    n_bets[d, ki] += ev_mask.astype(float) @ stake_mask
+                    n_won[d, ki] += (ev_mask * ww) @ stake_mask
+                    profit[d, ki] += (ev_mask * bp) @ stake_mask
+                    brier_sum[d, ki] += ((p - ww) ** 2).sum()
+                    brier_n[d, ki] += len(p)
+        if verbose:
+            print(f"✅ {distance}: {len(days)} gün tarandı")
+
+    grid = pd.DataFrame(list(itertools.product(distances, ks, min_evs, min_stakes)),
+                        columns=["distance", "K", "min_ev", "min_stake"])
+    grid["n_bets"] = n_bets.ravel().astype(np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grid["hit_rate"] = (n_won / n_bets).ravel()
+        grid["profit"] = profit.ravel()
+        grid["ROI"] = (profit / n_bets).ravel()
+        grid["brier"] = np.repeat((brier_sum / brier_n).ravel(), len(min_evs) * len(min_stakes))
+    return grid
+
+
+def _floats(text):
+    return [float(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward sweep over K, EV/stake thresholds and distance.")
+    parser.add_argument("--data", default="data/processed/match_odds_cleaned_20250801.csv",
+                        help="Single CSV or match_date-partitioned dataset dir.")
+    parser.add_argument("--ks", default=",".join(map(str, KS)))
+    parser.add_argument("--min-evs", default=",".join(map(str, MIN_EVS)))
+    parser.add_argument("--min-stakes", default=",".join(map(str, MIN_STAKES)))
+    parser.add_argument("--distances", default=",".join(DISTANCES))
+    parser.add_argument("--block-mem-mb", type=int, default=DEFAULT_BLOCK_MEM_MB)
+    parser.add_argument("--out-prefix", default="walkforward")
+    args = parser.parse_args(argv)
+
+    grid = run_sweep(read_table(args.data), ks=[int(k) for k in _floats(args.ks)],
+                     min_evs=_floats(args.min_evs), min_stakes=_floats(args.min_stakes),
+                     distances=[d for d in args.distances.split(",") if d], block_mem_mb=args.block_mem_mb)
+    grid.to_csv(f"sweep_{args.out_prefix}.csv", index=False)
+    print(grid.sort_values("ROI", ascending=False).head(10).to_string(index=False))
+    print(f"💾 Sweep sonuçları kaydedildi → sweep_{args.out_prefix}.csv ({len(grid)} ayar)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
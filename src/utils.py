@@ -0,0 +1,222 @@
+"""
+Stage timing and resource instrumentation (project_tasks B3).
+
+- `with Timer("stage", rows=n)` / `@timing_logger` record wall time, CPU time,
+  peak RSS and row counts per named stage; nested stages keep their parent
+- Disabled by default: a disabled Timer / decorated call costs one flag check
+- Enabled with configure_timing(...) or the TIMING_LOG / TIMING_PROM environment
+  variables: every finished stage is appended to a JSON-lines trace, and at exit
+  per-stage totals go to a Prometheus text file (node_exporter textfile format)
+  and a one-line summary is printed
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not recorded
+    resource = None
+
+
+class _TimingState:
+    def __init__(self):
+        self.enabled = False
+        self.log_path = None
+        self.prom_path = None
+        self.run_id = None
+        self.stack = []
+        self.totals = {}          # stage → [çağrı, wall, cpu, rows]
+        self.order = []           # üst seviye stage'ler, ilk görülme sırası
+        self._file = None
+        self._atexit = False
+
+
+_STATE = _TimingState()
+
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB); ölçülemiyorsa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def configure_timing(log_path=None, prom_path=None, enabled=True, summary=True):
+    """
+    Ölçümü açar/kapatır. log_path: JSONL iz dosyası, prom_path: Prometheus metin dosyası.
+    summary=True ise çıkışta tek satırlık özet yazdırılır.
+    """
+    _close_log()
+    _STATE.enabled = enabled
+    _STATE.log_path = log_path
+    _STATE.prom_path = prom_path
+    _STATE.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+    _STATE.stack, _STATE.totals, _STATE.order = [], {}, []
+    if enabled and summary and not _STATE._atexit:
+        atexit.register(_finish)
+        _STATE._atexit = True
+
+
+def timing_enabled():
+    return _STATE.enabled
+
+
+def _close_log():
+    if _STATE._file is not None:
+        _STATE._file.close()
+        _STATE._file = None
+
+
+def _write_record(rec):
+    if not _STATE.log_path:
+        return
+    if _STATE._file is None:
+        os.makedirs(os.path.dirname(_STATE.log_path) or ".", exist_ok=True)
+        _STATE._file = open(_STATE.log_path, "a", encoding="utf-8", buffering=1)
+    _STATE._file.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+class Timer:
+    """
+    Adlı bir aşamanın süresini ölçer:
+
+        with Timer("scraper.fetch") as t:
+            rows = fetch(...)
+            t.rows = len(rows)
+
+    Ölçüm kapalıyken hiçbir şey yapmaz.
+    """
+
+    __slots__ = ("stage", "rows", "_wall", "_cpu", "_active")
+
+    def __init__(self, stage, rows=None):
+        self.stage = stage
+        self.rows = rows
+        self._active = False
+
+    def __enter__(self):
+        if _STATE.enabled:
+            self._active = True
+            _STATE.stack.append(self.stage)
+            self._cpu = time.process_time()
+            self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._active:
+            return False
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._active = False
+        _STATE.stack.pop()
+        parent = "/".join(_STATE.stack) or None
+        rows = None if self.rows is None else int(self.rows)
+
+        tot = _STATE.totals.setdefault(self.stage, [0, 0.0, 0.0, 0])
+        tot[0] += 1
+        tot[1] += wall
+        tot[2] += cpu
+        tot[3] += rows or 0
+        if parent is None and self.stage not in _STATE.order:
+            _STATE.order.append(self.stage)
+
+        _write_record({
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "run": _STATE.run_id,
+            "stage": self.stage,
+            "parent": parent,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "rows": rows,
+            "peak_rss_mb": peak_rss_mb(),
+            "error": None if exc_type is None else exc_type.__name__,
+        })
+        return False
+
+
+def timing_logger(stage=None, rows=None):
+    """
+    Fonksiyon süresini Timer ile ölçen dekoratör. `@timing_logger` veya
+    `@timing_logger("processor.filter_ms", rows=len)`; rows dönüş değerinden satır sayısı.
+    """
+    def decorate(fn):
+        name = stage if isinstance(stage, str) else f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _STATE.enabled:
+                return fn(*args, **kwargs)
+            with Timer(name) as t:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    t.rows = rows(result)
+            return result
+        return wrapper
+
+    if callable(stage):          # @timing_logger (parantezsiz)
+        return decorate(stage)
+    return decorate
+
+
+def timing_summary():
+    """Üst seviye aşamaların tek satırlık özeti."""
+    if not _STATE.totals:
+        return "⏱️ zamanlama kaydı yok"
+    parts = []
+    total = 0.0
+    for stage in _STATE.order:
+        n, wall, cpu, rows = _STATE.totals[stage]
+        total += wall
+        parts.append(f"{stage} {wall:.2f}s" + (f" ({rows:,} satır)" if rows else ""))
+    peak = peak_rss_mb()
+    tail = f" | toplam {total:.2f}s" + (f", tepe RSS {peak:.0f} MB" if peak is not None else "")
+    return "⏱️ " + " | ".join(parts) + tail
+
+
+def write_prometheus(path=None):
+    """Aşama toplamlarını Prometheus metin biçiminde (atomik) yazar."""
+    path = path or _STATE.prom_path
+    if not path:
+        return None
+    lines = []
+    metrics = (
+        ("bilyoner_stage_calls_total", "counter", "Completed calls per stage.", 0),
+        ("bilyoner_stage_wall_seconds_total", "counter", "Wall-clock seconds per stage.", 1),
+        ("bilyoner_stage_cpu_seconds_total", "counter", "CPU seconds per stage.", 2),
+        ("bilyoner_stage_rows_total", "counter", "Rows processed per stage.", 3),
+    )
+    for name, kind, help_text, j in metrics:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for stage, tot in _STATE.totals.items():
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{name}{{stage="{label}"}} {tot[j]}')
+    peak = peak_rss_mb()
+    if peak is not None:
+        lines += ["# HELP bilyoner_peak_rss_bytes Peak resident set size of the run.",
+                  "# TYPE bilyoner_peak_rss_bytes gauge", f"bilyoner_peak_rss_bytes {int(peak * 1024 * 1024)}"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _finish():
+    if not _STATE.enabled:
+        return
+    write_prometheus()
+    _close_log()
+    if _STATE.totals:
+        print(timing_summary())
+
+
+if os.environ.get("TIMING_LOG") or os.environ.get("TIMING_PROM"):
+    configure_timing(log_path=os.environ.get("TIMING_LOG") or None, prom_path=os.environ.get("TIMING_PROM") or None)
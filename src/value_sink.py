@@ -0,0 +1,93 @@
+"""
+Streaming output for predict_gpt.py value bets.
+
+- Raw value-bet rows are appended to the CSV chunk by chunk (one chunk = a block of
+  finished matches), so the whole slate is never held as one DataFrame
+- EV / Kelly / bankroll columns are computed per chunk with the same formulas
+- Per-match best-by-probability and best-by-expected-bankroll are kept online
+  (one row per match); ties keep the earlier row, i.e. market order
+"""
+
+import pandas as pd
+
+from src.markets import VALUE_BET_COLS
+from src.utils import Timer
+
+
+def add_bankroll_columns(vb):
+    """EV, Kelly, stake ve bankroll sütunları (predict_gpt.py post-processing ile aynı)."""
+    svb = vb.copy()
+    svb["EV"] = (svb["probability"] * svb["odds"]) / 100.0
+
+    p = svb["probability"] / 100.0
+    b = svb["odds"] - 1.0
+    q = 1.0 - p
+    svb["Kelly"] = ((b * p - q) / b).clip(lower=0.0).fillna(0.0)
+    svb["stake"] = svb["Kelly"] * 100.0
+    svb["bankroll_if_win"]  = 1.0 + svb["Kelly"] * (svb["odds"] - 1.0)
+    svb["bankroll_if_lose"] = 1.0 - svb["Kelly"]
+    svb["expected_bankroll"] = p * svb["bankroll_if_win"] + q * svb["bankroll_if_lose"]
+    return svb
+
+
+class ValueBetSink:
+    """
+    value_bet_rows parçalarını alır: ham satırları dosyaya ekler, maç başına en iyi
+    satırları (olasılık / beklenen bankroll) bellekte tutar.
+    raw_path=None ise ham satırlar dosya yerine bellekte toplanır (raw_frame()).
+    """
+
+    def __init__(self, raw_path=None):
+        self.raw_path = raw_path
+        self.n_rows = 0
+        self._header = True
+        self._chunks = []
+        self._best = {"probability": {}, "expected_bankroll": {}}
+
+    def add(self, value_rows):
+        if value_rows.empty and not self._header:
+            return
+        if self.raw_path is None:
+            self._chunks.append(value_rows)
+        else:
+            with Timer("output.write", rows=len(value_rows)):
+                value_rows.to_csv(self.raw_path, index=False, header=self._header, mode="w" if self._header else "a")
+        self._header = False
+        self.n_rows += len(value_rows)
+        if value_rows.empty:
+            return
+
+        svb = add_bankroll_columns(value_rows)
+        for col, best in self._best.items():
+            # parça içindeki en iyi satır (eşitlikte ilk), sonra önceki parçalarla kıyas
+            top = svb.loc[svb.groupby("match_id", sort=False)[col].idxmax()]
+            for row in top.itertuples(index=False):
+                rec = row._asdict()
+                prev = best.get(rec["match_id"])
+                if prev is None or rec[col] > prev[col]:
+                    best[rec["match_id"]] = rec
+
+    def close(self):
+        """
+        Dönüş: (by_prob, by_bankroll) — maç başına tek satır, tarih/saat sıralı
+        (predict_gpt.py'deki groupby(...).first() çıktısıyla aynı sütun düzeni).
+        """
+        if self._header and self.raw_path is not None:
+            pd.DataFrame(columns=VALUE_BET_COLS).to_csv(self.raw_path, index=False)
+        self._header = False
+        out = []
+        for col in ("probability", "expected_bankroll"):
+            best = pd.DataFrame(list(self._best[col].values()))
+            if best.empty:
+                out.append(best)
+                continue
+            cols = ["match_id"] + [c for c in best.columns if c != "match_id"]
+            best = best[cols].sort_values("match_id", kind="stable").reset_index(drop=True)
+            out.append(best.sort_values(["match_date", "match_time"], ascending=True))
+        return tuple(out)
+
+    def raw_frame(self):
+        """raw_path=None iken toplanan ham value-bet satırları (dosyadaki satırların aynısı)."""
+        if not self._chunks:
+            return pd.DataFrame(columns=VALUE_BET_COLS)
+        return pd.concat(self._chunks, ignore_index=True)
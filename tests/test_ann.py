@@ -0,0 +1,66 @@
+"""
+src/ann.py: IVFIndex.search against a row-by-row nan-euclidean scan — exact when
+every bucket is probed, and exact over the probed buckets' rows otherwise.
+"""
+
+import numpy as np
+import pytest
+
+from src.ann import IVFIndex
+from src.distance import nan_euclidean_rows, nan_euclidean_topk
+
+K = 10
+
+
+def _odds(n, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(1.0, 4.0, (n, 24)).round(1)      # tek decimal → eşit uzaklıklar çok
+    X[rng.random(X.shape) < 0.3] = np.nan
+    X[:3] = np.nan                                    # hiç ortak feature'ı olmayan satırlar
+    return X, np.isnan(X)
+
+
+def _reference(X, X_nan, T, T_nan, k, allowed):
+    # satır satır: izinli train satırlarına uzaklık, eşitlikte küçük indeks önce
+    idx = np.full((len(X), k), -1)
+    dist = np.full((len(X), k), np.inf)
+    n_valid = np.zeros(len(X), dtype=np.int64)
+    for i in range(len(X)):
+        rows = allowed[i]
+        d = nan_euclidean_rows(T[rows], T_nan[rows], X[i], X_nan[i])
+        rows, d = rows[np.isfinite(d)], d[np.isfinite(d)]
+        order = np.lexsort((rows, d))[:k]
+        n_valid[i] = len(order)
+        idx[i, :len(order)], dist[i, :len(order)] = rows[order], d[order]
+    return idx, dist, n_valid
+
+
+@pytest.fixture(scope="module")
+def data():
+    T, T_nan = _odds(800, seed=0)
+    X, X_nan = _odds(60, seed=1)
+    return X, X_nan, T, T_nan, IVFIndex.build(T, T_nan, n_lists=6, rank=16)
+
+
+@pytest.mark.parametrize("extra", [0, 5])
+def test_all_buckets_is_exact(data, extra):
+    X, X_nan, T, T_nan, index = data
+    exact = nan_euclidean_topk(X, X_nan, T, T_nan, K, return_dist=True)
+    expected = _reference(X, X_nan, T, T_nan, K, [np.arange(len(T))] * len(X))
+    for got, want in zip(exact, expected):
+        np.testing.assert_allclose(got, want)
+    found = index.search(X, X_nan, T, T_nan, K, nprobe=index.n_lists + extra, return_dist=True)
+    for got, want in zip(found, exact):
+        np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("nprobe", [1, 3])
+def test_probed_buckets_are_exact(data, nprobe):
+    X, X_nan, T, T_nan, index = data
+    probes = index.probe(X, X_nan, nprobe)
+    allowed = [np.flatnonzero(np.isin(index.assign, p)) for p in probes]
+    expected = _reference(X, X_nan, T, T_nan, K, allowed)
+    found = index.search(X, X_nan, T, T_nan, K, nprobe=nprobe, return_dist=True)
+    np.testing.assert_array_equal(found[0], expected[0])
+    np.testing.assert_allclose(found[1], expected[1])
+    np.testing.assert_array_equal(found[2], expected[2])
@@ -0,0 +1,130 @@
+"""
+src/async_collector.py against a local stub of the Bilyoner endpoints: the async
+rows must equal the rows the threaded path builds from the same payloads.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from src import async_collector  # noqa: E402
+from src.async_collector import collect_event_catalog, collect_odds_rows, collect_scores  # noqa: E402
+from src.bilyoner_api import (EVENT_INFO_PATH, GAMELIST_PATH, ODDS_PATH, STATUS_PATH, _build_row,  # noqa: E402
+                              _event_meta, _extract_odds_rows, _parse_catalog)
+
+EVENTS = {
+    "101": {"esd": "2025-10-01T20:00", "lgn": "Süper Lig", "htn": "A", "atn": "B"},
+    "102": {"htn": "C", "atn": "D"},                       # eksik meta → events/{id} isteği
+    "103": {"esd": "2025-10-02T18:00", "lgn": "Premier League", "htn": "E", "atn": "F"},
+    "104": {"esd": "2025-10-02T19:00", "lgn": "La Liga", "htn": "G", "atn": "H"},
+}
+EVENT_INFO = {"102": {"esd": "2025-10-01T21:00", "lgn": "Serie A", "htn": "C", "atn": "D"}}
+
+
+def _odds(i):
+    return {
+        "homeTeam": f"Home {i}", "awayTeam": f"Away {i}",
+        "oddGroupTabs": [
+            {"title": "Popüler", "matchCardOdds": [{"name": "Maç Sonucu", "oddList": [{"n": "MS 1", "val": 9.9}]}]},
+            {"title": "Tümü", "matchCardOdds": [
+                {"name": "Maç Sonucu", "oddList": [{"n": "MS 1", "val": 1.5 + i / 10}, {"n": "MS X", "val": 3.2},
+                                                   {"n": "MS 2", "val": None}]},
+                {"name": " 2,5 Alt/Üst ", "oddList": [{"n": "Alt", "val": 1.8}, {"n": "Üst", "val": 1.9 + i / 100}]},
+                {"name": "Korner Sayısı", "oddList": [{"n": "Alt", "val": 1.7}]},
+            ]},
+        ],
+    }
+
+
+ODDS = {mid: _odds(i) for i, mid in enumerate(EVENTS)}
+ODDS["104"] = {"homeTeam": "G", "awayTeam": "H", "oddGroupTabs": []}     # filtre sonrası oran yok → satır yok
+STATUS = {
+    "101": {"score": [{"scoreName": "SOCCER_FIRST_HALF", "homeScore": 1, "awayScore": 0},
+                      {"scoreName": "SOCCER_END_SCORE", "homeScore": 2, "awayScore": 1}]},
+    "103": {"score": [{"scoreName": "SOCCER_END_SCORE", "homeScore": 0, "awayScore": 0}]},
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    throttled = set()                 # ilk istekte 429 dönen yollar
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, body, status=200, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path.endswith("/101/odds") and path not in self.throttled:
+            self.throttled.add(path)
+            return self._json({}, status=429, headers={"Retry-After": "0"})
+        if path == GAMELIST_PATH:
+            return self._json({"events": EVENTS})
+        for mid in EVENTS:
+            if path == EVENT_INFO_PATH.format(match_id=mid) and mid in EVENT_INFO:
+                return self._json(EVENT_INFO[mid])
+            if path == ODDS_PATH.format(match_id=mid):
+                return self._json(ODDS[mid])
+            if path == STATUS_PATH.format(match_id=mid) and mid in STATUS:
+                return self._json(STATUS[mid])
+        self._json({}, status=404)
+
+
+@pytest.fixture()
+def stub_base():
+    _StubHandler.throttled = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _expected_rows(catalog):
+    rows = {}
+    for mid in EVENTS:
+        meta = catalog[mid] if mid not in EVENT_INFO else _event_meta(EVENT_INFO[mid])
+        row = _build_row(mid, meta, ODDS[mid])
+        if row:
+            rows[mid] = row
+    return rows
+
+
+def test_odds_rows_match_threaded_parsing(stub_base):
+    catalog = collect_event_catalog(base=stub_base)
+    assert catalog == _parse_catalog({"events": EVENTS})
+
+    rows = collect_odds_rows(list(EVENTS), catalog=catalog, base=stub_base)
+    by_id = {r["match_id"]: r for r in rows}
+    assert set(by_id) == {"101", "102", "103"}
+    assert by_id == _expected_rows(catalog)
+    for mid, row in by_id.items():
+        odds_cols = {k: v for k, v in row.items() if " :: " in k}
+        assert odds_cols == _extract_odds_rows(ODDS[mid])
+    assert by_id["102"]["tournament"] == "Serie A"           # meta events/{id} isteğinden
+
+
+def test_scores(stub_base):
+    scores = collect_scores(list(EVENTS), base=stub_base)
+    assert scores == {"101": (1, 0, 2, 1), "103": (None, None, 0, 0)}
+
+
+def test_429_is_retried(stub_base, monkeypatch):
+    monkeypatch.setattr(async_collector, "BACKOFF_FACTOR", 0.0)
+    rows = collect_odds_rows(["101"], catalog=_parse_catalog({"events": EVENTS}), base=stub_base)
+    assert [r["match_id"] for r in rows] == ["101"]
+    assert _StubHandler.throttled == {ODDS_PATH.format(match_id="101")}
@@ -0,0 +1,33 @@
+"""
+src/backtest.py ↔ src/sweep.py: the walk-forward backtest's "all" strategy must
+count the same bets, hits and profit as the sweep cell with the same K and thresholds.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.generator import make_wide_table
+from src.backtest import walk_forward_backtest
+from src.sweep import run_sweep
+
+
+@pytest.fixture(scope="module")
+def table():
+    return make_wide_table(1500, seed=2)
+
+
+@pytest.mark.parametrize("k, ks, min_ev", [
+    (30, [30], 1.0),
+    (10, [10, 30], 1.1),     # sweep K listesinin küçüğü: komşular k_max listesinin öneki
+])
+def test_all_strategy_matches_sweep_cell(table, k, ks, min_ev):
+    # sweep'in geçmiş eşiği en büyük K; backtest aynı günlerden başlasın
+    report = walk_forward_backtest(table, top_k=k, min_ev=min_ev, min_history=max(ks), verbose=False)
+    row = report["summary"].set_index("strategy").loc["all"]
+
+    grid = run_sweep(table, ks=ks, min_evs=[min_ev], min_stakes=[0.0], distances=("nan_euclidean",),
+                     verbose=False)
+    cell = grid[grid["K"] == k].iloc[0]
+    assert row["n_bets"] == cell["n_bets"] > 0
+    np.testing.assert_allclose([row["hit_rate"], row["profit"], row["ROI"]],
+                               [cell["hit_rate"], cell["profit"], cell["ROI"]], rtol=1e-9)
@@ -0,0 +1,69 @@
+"""
+src/coupons.py: the branch-and-bound search_coupons against a brute-force
+enumeration of every coupon on a small value-bet list.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.coupons import coupon_metrics, search_coupons
+
+
+def _bets(n_matches=8, bets_per_match=3, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for m in range(n_matches):
+        for b in range(bets_per_match):
+            rows.append({
+                "match_date": "2025-10-01", "match_time": "20:00:00", "match_id": str(100 + m),
+                "hometeam": f"H{m}", "awayteam": f"A{m}", "bet_name": f"Bet {b}",
+                "probability": rng.uniform(35.0, 80.0), "odds": rng.uniform(1.4, 3.2),
+            })
+    return pd.DataFrame(rows)
+
+
+def _brute_force(bets, legs, top_n, stake_min, unique_matches):
+    p = bets["probability"].to_numpy() / 100.0
+    o = bets["odds"].to_numpy()
+    match = bets["match_id"].to_numpy()
+    best = {}
+    for n_legs in ([legs] if np.isscalar(legs) else legs):
+        for combo in itertools.combinations(range(len(bets)), n_legs):
+            if len(set(match[list(combo)])) < n_legs:
+                continue
+            kelly, _, _, eb = (float(v) for v in coupon_metrics(np.prod(p[list(combo)]), np.prod(o[list(combo)])))
+            if not (kelly * 100.0 > stake_min and kelly > 0):
+                continue
+            key = tuple(sorted(match[list(combo)])) if unique_matches else combo
+            if key not in best or eb > best[key][0]:
+                best[key] = (eb, combo)
+    ranked = sorted(best.values(), key=lambda item: -item[0])[:top_n]
+    return [(round(eb, 6), sorted(match[list(combo)]), sorted(bets["bet_name"].to_numpy()[list(combo)]))
+            for eb, combo in ranked]
+
+
+def _found(coupons):
+    return [(eb, ids, sorted(names)) for eb, ids, names in
+            zip(coupons["coupon_expected_bankroll"], coupons["match_ids"], coupons["bet_names"])]
+
+
+@pytest.mark.parametrize("legs", [3, (2, 3)])
+@pytest.mark.parametrize("unique_matches", [True, False])
+def test_matches_brute_force(legs, unique_matches):
+    bets = _bets()
+    coupons = search_coupons(bets, legs=legs, top_n=15, stake_min=5.0, unique_matches=unique_matches)
+    assert _found(coupons) == _brute_force(bets, legs, 15, 5.0, unique_matches)
+
+
+def test_one_coupon_per_match_set():
+    coupons = search_coupons(_bets(), legs=3, top_n=40)
+    keys = coupons["match_ids"].map(tuple)
+    assert len(coupons) == 40 and keys.is_unique
+    assert coupons["coupon_expected_bankroll"].is_monotonic_decreasing
+    # aynı maçların farklı bahis kombinasyonları ayrı kupon olmaz, yalnız en iyisi kalır
+    every = search_coupons(_bets(), legs=3, top_n=10_000, unique_matches=False)
+    best = every.groupby(every["match_ids"].map(tuple))["coupon_expected_bankroll"].max()
+    np.testing.assert_array_equal(coupons["coupon_expected_bankroll"], best.sort_values(ascending=False)[:40])
@@ -0,0 +1,58 @@
+"""
+src/market_registry.py: alias labels ↔ canonical ids (also after a save / reopen),
+and the predictor's features / market odds coalescing alias columns into one id.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.market_registry import MarketRegistry, canonical_label, odds_matrix, registry_path
+from src.markets import MARKET_LABELS, market_odds
+from src.predict import feature_columns
+
+
+def test_alias_round_trip_and_persistence(tmp_path):
+    path = registry_path(str(tmp_path / "odds.csv"))
+    registry = MarketRegistry.open(path)
+    added = registry.register(["Maç Skoru :: 1:0", "Maç Sonucu :: MS 1", " Maç Skoru  ::  1 - 0 "])
+    assert added == ["Maç Skoru :: 1-0", "Maç Sonucu :: MS 1"]
+    assert canonical_label("Maç Skoru :: 1 : 0") == "Maç Skoru :: 1-0"
+
+    score_id = registry.id_of("Maç Skoru :: 1-0")
+    assert registry.id_of("Maç Skoru :: 1:0") == registry.id_of(" Maç Skoru  ::  1 - 0 ") == score_id
+    assert registry.label(score_id) == "Maç Skoru :: 1-0"
+    registry.save()
+
+    reopened = MarketRegistry.open(path)
+    assert reopened.labels == registry.labels
+    assert reopened.aliases == registry.aliases
+    # ids append-only: yeni market sona eklenir, eskiler değişmez
+    reopened.register(["Karşılıklı Gol :: Var"])
+    assert reopened.id_of("Maç Skoru :: 1:0") == score_id
+    assert reopened.id_of("Karşılıklı Gol :: Var") == len(registry)
+    assert list(reopened.ids(["Bilinmeyen :: X"], add=False)) == [-1]
+
+
+def test_canonicalize_rows_keeps_stored_alias_column():
+    registry = MarketRegistry()
+    rows = registry.canonicalize_rows([{"match_id": "1", "Maç Skoru :: 1-0": 7.5, "Maç Skoru :: 1:0": 9.0}],
+                                      columns=["match_id", "Maç Skoru :: 1:0"])
+    assert rows == [{"match_id": "1", "Maç Skoru :: 1:0": 7.5}]
+
+
+def test_features_and_market_odds_coalesce_aliases():
+    df = pd.DataFrame({
+        "match_id": ["1", "2", "3"],
+        "Maç Sonucu :: MS 1": [1.5, 2.0, np.nan],
+        "Maç Skoru :: 1-0": [7.0, np.nan, np.nan],
+        "Maç Skoru :: 1:0": [np.nan, 8.0, np.nan],
+    })
+    cols = feature_columns(df)
+    assert cols == ["Maç Sonucu :: MS 1", "Maç Skoru :: 1-0"]
+    expected = np.array([[1.5, 7.0], [2.0, 8.0], [np.nan, np.nan]])
+    np.testing.assert_array_equal(odds_matrix(df, cols), expected)
+
+    assert "Maç Skoru :: 1:0" not in MARKET_LABELS
+    odds = market_odds(df)
+    np.testing.assert_array_equal(odds[:, MARKET_LABELS.index("Maç Skoru :: 1-0")], [7.0, 8.0, np.nan])
+    assert np.isnan(odds[:, MARKET_LABELS.index("Maç Skoru :: 2-0")]).all()
@@ -0,0 +1,55 @@
+"""
+src/predict_service.py: an incremental refresh() must leave the service in the
+same state as a cold reload of the changed table (same rows, same dtypes).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generator import SCORE_COLS, make_wide_table
+from src.predict_service import FRAMES, PredictionService
+
+CONFIG = {"top_k": 20}
+
+
+def _table(new_ids):
+    df = make_wide_table(600, seed=5)
+    odds = [c for c in df.columns if " :: " in c]
+    # iki decimal oranlarda eşit uzaklıklar olur; train sırası iki yolda farklı → eşitlik bozulur
+    df[odds] = df[odds] + np.random.default_rng(0).uniform(0.0, 1e-3, (len(df), len(odds)))
+    df.loc[500:, "match_id"] = new_ids
+    return df
+
+
+def _sorted(df):
+    return df.sort_values(list(df.columns[:3]), kind="stable").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("new_ids", [
+    [str(2_000_000 + i) for i in range(100)],     # sayısal id'ler
+    [f"x{i}" for i in range(100)],                # sayısal olmayan id'ler (tip değişir)
+])
+def test_refresh_matches_cold_reload(tmp_path, new_ids):
+    df = _table(new_ids)
+    before = df.iloc[:500].copy()
+    before.loc[400:, SCORE_COLS] = pd.NA          # 100 skorsuz maç
+    after = df.copy()
+    after.loc[450:499, SCORE_COLS] = pd.NA        # 400-449 skorlandı → train'e taşınır
+    after.loc[550:, SCORE_COLS] = pd.NA           # 500-599 yeni: yarısı skorlu
+    path = str(tmp_path / "odds.csv")
+
+    before.to_csv(path, index=False)
+    service = PredictionService(path, CONFIG, seed=1)
+    after.to_csv(path, index=False)
+    assert service.refresh() == {"moved": 50, "added_train": 50, "added_test": 50}
+
+    cold = PredictionService(path, CONFIG, seed=1)
+    assert len(service.train) == len(cold.train)
+    assert sorted(service.train.match_ids) == sorted(cold.train.match_ids)
+    assert service.test_df["match_id"].dtype == cold.test_df["match_id"].dtype
+
+    warm_out, _ = service.predict_ids()
+    cold_out, _ = cold.predict_ids()
+    for name in FRAMES:
+        pd.testing.assert_frame_equal(_sorted(warm_out[name]), _sorted(cold_out[name]))
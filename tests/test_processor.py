@@ -0,0 +1,53 @@
+"""
+src/processor.py: the two-pass clean_csv_chunked must write the same snapshot and
+cleaned CSV as the old in-memory flow (filter → detect → nullify → drop).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import make_wide_table
+from src.processor import (MS_COLS, clean_csv_chunked, detect_useless_columns, drop_useless_columns,
+                           filter_missing_ms, nullify_empty_markets)
+
+
+def _table(n=300):
+    df = make_wide_table(n, seed=3)
+    rng = np.random.default_rng(3)
+    df.loc[rng.choice(n, 40, replace=False), MS_COLS] = np.nan   # MS oranı olmayan maçlar
+    df["Sabit :: X"] = 1.5                                        # sabit sütun
+    df["Metin :: X"] = np.where(rng.random(n) < 0.5, "a", "b")
+    df["Seyrek :: X"] = np.nan                                    # %99+ boş
+    df.loc[7, "Seyrek :: X"] = 2.25
+    df["Az :: X"] = np.nan                                        # boş ama eşiğin altında
+    df.loc[rng.choice(n, 20, replace=False), "Az :: X"] = rng.uniform(2.0, 4.0, 20).round(2)
+    return df
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_chunked_matches_in_memory_flow(tmp_path):
+    source = str(tmp_path / "wide.csv")
+    _table().to_csv(source, index=False)
+
+    # eski akış: tüm tablo bellekte
+    old_dir = str(tmp_path / "old")
+    df = filter_missing_ms(pd.read_csv(source), snapshot_dir=old_dir)
+    useless = detect_useless_columns(df)
+    df = nullify_empty_markets(df, useless)
+    df = drop_useless_columns(df, useless)
+    df.to_csv(os.path.join(old_dir, "cleaned.csv"), index=False)
+
+    new_dir = str(tmp_path / "new")
+    out = clean_csv_chunked(source, output_path=str(tmp_path / "cleaned.csv"), snapshot_dir=new_dir, chunksize=64)
+
+    [snapshot] = os.listdir(new_dir)
+    assert _read(os.path.join(new_dir, snapshot)) == _read(os.path.join(old_dir, snapshot))
+    assert _read(out) == _read(os.path.join(old_dir, "cleaned.csv"))
+    header = pd.read_csv(out, nrows=0).columns
+    assert "Az :: X" in header and not {"Sabit :: X", "Seyrek :: X"} & set(header)